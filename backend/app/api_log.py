@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from .config import settings
+
+
+_logger = logging.getLogger("yclients_api")
+
+_BATCH_SIZE = 200
+_FLUSH_INTERVAL = 1.0
+
+
+class ApiLogWriter:
+    """Background JSON-lines writer with a bounded queue and file rotation.
+
+    Callers only enqueue; a daemon thread appends entries in batches. The live
+    file rotates to ``<name>.1`` when it exceeds ``max_bytes`` or is older
+    than ``rotate_seconds``, older files shift up to ``backups`` and are
+    gzipped when ``compress`` is set. Entries that do not fit into the queue
+    are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        backups: int,
+        rotate_seconds: int,
+        compress: bool,
+        queue_size: int,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = max(1, backups)
+        self.rotate_seconds = rotate_seconds
+        self.compress = compress
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(maxsize=queue_size)
+        self._io_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._dropped_lock = threading.Lock()
+        self._period_start = self._file_started()
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="yclients-api-log", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, entry: dict[str, Any]) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            batch: list[dict[str, Any]] = []
+            stop = False
+            try:
+                item = self._queue.get(timeout=_FLUSH_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is None:
+                stop = True
+            else:
+                batch.append(item)
+            while not stop and len(batch) < _BATCH_SIZE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(entry, ensure_ascii=False, default=str) + "\n" for entry in batch)
+        try:
+            with self._io_lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self._needs_rotation():
+                    self._rotate()
+                with self.path.open("a", encoding="utf-8") as handle:
+                    handle.write(lines)
+            self.written += len(batch)
+        except Exception:  # noqa: BLE001
+            _logger.warning("Failed to write API debug log")
+
+    def _file_started(self) -> float:
+        """When the live file was started, so restarts do not reset the rotation clock.
+
+        That is the time of its first entry; the file's mtime when the entry
+        has none. A missing file starts now.
+        """
+        try:
+            started = self.path.stat().st_mtime
+            with self.path.open("r", encoding="utf-8") as handle:
+                first = json.loads(handle.readline() or "{}")
+        except OSError:
+            return time.time()
+        except ValueError:
+            return started
+        try:
+            ts = datetime.fromisoformat(first["ts"])
+        except (KeyError, TypeError, ValueError):
+            return started
+        if ts.tzinfo is None:
+            # Entries carry naive UTC timestamps.
+            ts = ts.replace(tzinfo=timezone.utc)
+        return min(started, ts.timestamp())
+
+    def _needs_rotation(self) -> bool:
+        if not self.path.exists():
+            self._period_start = time.time()
+            return False
+        if self.max_bytes and self.path.stat().st_size >= self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._period_start >= self.rotate_seconds
+
+    def _backup_path(self, index: int) -> Path:
+        suffix = f".{index}.gz" if self.compress else f".{index}"
+        return self.path.with_name(self.path.name + suffix)
+
+    def _rotate(self) -> None:
+        oldest = self._backup_path(self.backups)
+        if oldest.exists():
+            oldest.unlink()
+        for index in range(self.backups - 1, 0, -1):
+            src = self._backup_path(index)
+            if src.exists():
+                src.replace(self._backup_path(index + 1))
+        target = self._backup_path(1)
+        if self.compress:
+            with self.path.open("rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            self.path.unlink()
+        else:
+            self.path.replace(target)
+        self._period_start = time.time()
+        self.rotations += 1
+
+    def files(self) -> list[Path]:
+        """Live file first, then rotated files from newest to oldest."""
+        candidates = [self.path]
+        for index in range(1, self.backups + 1):
+            # Rotated files written with the other compression setting are still readable.
+            other = self.path.with_name(f"{self.path.name}.{index}{'' if self.compress else '.gz'}")
+            candidates += [self._backup_path(index), other]
+        return [path for path in candidates if path.exists()]
+
+    @staticmethod
+    def _read_lines(path: Path) -> list[str]:
+        if path.suffix == ".gz":
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                return handle.readlines()
+        with path.open("r", encoding="utf-8") as handle:
+            return handle.readlines()
+
+    def tail(self, limit: int) -> list[str]:
+        """Last ``limit`` lines across the live and rotated files, oldest first."""
+        limit = max(1, limit)
+        collected: list[str] = []
+        with self._io_lock:
+            for path in self.files():
+                lines = [line for line in self._read_lines(path) if line.strip()]
+                collected = lines[-(limit - len(collected)):] + collected
+                if len(collected) >= limit:
+                    break
+        return collected
+
+    def iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Parsed entries across the rotated and live files, oldest first."""
+        with self._io_lock:
+            paths = list(reversed(self.files()))
+        for path in paths:
+            for line in self._read_lines(path):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def clear(self) -> int:
+        with self._io_lock:
+            paths = self.files()
+            for path in paths:
+                path.unlink()
+            self._period_start = time.time()
+        return len(paths)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Stop the writer after draining everything queued so far."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._dropped_lock:
+            dropped = self.dropped
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": dropped,
+            "rotations": self.rotations,
+            "files": [path.name for path in self.files()],
+        }
+
+
+api_log = ApiLogWriter(
+    settings.data_dir / "yclients_api_debug.log",
+    max_bytes=settings.api_log_max_bytes,
+    backups=settings.api_log_backups,
+    rotate_seconds=settings.api_log_rotate_seconds,
+    compress=settings.api_log_gzip,
+    queue_size=settings.api_log_queue_size,
+)
+atexit.register(api_log.flush)
@@ -66,6 +66,13 @@ class Settings:
     yclients_base_url: str
     yclients_timeout: int
     yclients_retries: int
+    yclients_retry_deadline: float
+    yclients_pool_size: int
+    yclients_rate_limit: float
+    yclients_rate_burst: int
+    yclients_cache_enabled: bool
+    yclients_cache_path: Path
+    yclients_cache_max_stale: int
     admin_user: str
     admin_pass: str
     admin2_user: str
@@ -77,6 +84,23 @@ class Settings:
     historical_excel_path: Path
     historical_db_path: Path
     enable_scheduler: bool
+    etl_fetch_concurrency: int
+    api_log_max_bytes: int
+    api_log_backups: int
+    api_log_rotate_seconds: int
+    api_log_gzip: bool
+    api_log_queue_size: int
+    api_log_all: bool
+    etl_incremental_minutes: int
+    etl_branch_concurrency: int
+    etl_chunk_days: int
+    etl_window_records: int
+    etl_window_concurrency: int
+    etl_resume_on_start: bool
+    etl_progress_seconds: float
+    sqlite_maintenance_minutes: int
+    db_copy_threshold: int
+    group_load_sparse: bool
 
 
 def load_settings() -> Settings:
@@ -132,6 +156,13 @@ def load_settings() -> Settings:
         yclients_base_url=os.getenv("YCLIENTS_BASE_URL", "https://api.yclients.com"),
         yclients_timeout=int(os.getenv("YCLIENTS_TIMEOUT", "30")),
         yclients_retries=int(os.getenv("YCLIENTS_RETRIES", "3")),
+        yclients_retry_deadline=float(os.getenv("YCLIENTS_RETRY_DEADLINE", "60")),
+        yclients_pool_size=max(1, int(os.getenv("YCLIENTS_POOL_SIZE", "10"))),
+        yclients_rate_limit=float(os.getenv("YCLIENTS_RATE_LIMIT", "5")),
+        yclients_rate_burst=int(os.getenv("YCLIENTS_RATE_BURST", "5")),
+        yclients_cache_enabled=_parse_bool(os.getenv("YCLIENTS_CACHE"), default=True),
+        yclients_cache_path=Path(os.getenv("YCLIENTS_CACHE_PATH", db_path.parent / "yclients_cache.db")),
+        yclients_cache_max_stale=int(os.getenv("YCLIENTS_CACHE_MAX_STALE", str(7 * 24 * 60 * 60))),
         admin_user=admin_user,
         admin_pass=admin_pass,
         admin2_user=admin2_user,
@@ -143,6 +174,23 @@ def load_settings() -> Settings:
         historical_excel_path=historical_excel_path,
         historical_db_path=historical_db_path,
         enable_scheduler=enable_scheduler,
+        etl_fetch_concurrency=max(1, int(os.getenv("ETL_FETCH_CONCURRENCY", "4"))),
+        api_log_max_bytes=int(os.getenv("API_LOG_MAX_BYTES", str(5 * 1024 * 1024))),
+        api_log_backups=int(os.getenv("API_LOG_BACKUPS", "5")),
+        api_log_rotate_seconds=int(os.getenv("API_LOG_ROTATE_SECONDS", str(24 * 60 * 60))),
+        api_log_gzip=_parse_bool(os.getenv("API_LOG_GZIP"), default=True),
+        api_log_queue_size=int(os.getenv("API_LOG_QUEUE_SIZE", "10000")),
+        api_log_all=_parse_bool(os.getenv("API_LOG_ALL"), default=False),
+        etl_incremental_minutes=max(0, int(os.getenv("ETL_INCREMENTAL_MINUTES", "0"))),
+        etl_branch_concurrency=max(1, int(os.getenv("ETL_BRANCH_CONCURRENCY", "3"))),
+        etl_chunk_days=max(1, int(os.getenv("ETL_CHUNK_DAYS", "31"))),
+        etl_window_records=max(50, int(os.getenv("ETL_WINDOW_RECORDS", "2000"))),
+        etl_window_concurrency=max(1, int(os.getenv("ETL_WINDOW_CONCURRENCY", "2"))),
+        etl_resume_on_start=_parse_bool(os.getenv("ETL_RESUME_ON_START"), default=True),
+        etl_progress_seconds=max(0.0, float(os.getenv("ETL_PROGRESS_SECONDS", "5"))),
+        sqlite_maintenance_minutes=max(0, int(os.getenv("SQLITE_MAINTENANCE_MINUTES", "60"))),
+        db_copy_threshold=max(1, int(os.getenv("DB_COPY_THRESHOLD", "1000"))),
+        group_load_sparse=_parse_bool(os.getenv("GROUP_LOAD_SPARSE"), default=False),
     )
 
 
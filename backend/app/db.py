@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import io
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable, Sequence
+
+from src.shared.db_async import get_db_executor
+from src.shared.db_pool import get_pool, tune_sqlite
+from src.shared.db_settings import db_settings
 
 from .config import settings
+from .migrations import Migration, migrate
 
 DB_URL = os.getenv("DATABASE_URL", "").strip()
 USE_POSTGRES = DB_URL.startswith("postgres")
@@ -57,7 +65,15 @@ class DBConn:
             return cur
         return self._conn.execute(sql, params)
 
+    def copies(self, count: int) -> bool:
+        """Whether an upsert_sql batch of ``count`` rows goes through COPY."""
+        return self._kind == "postgres" and count >= settings.db_copy_threshold
+
     def executemany(self, sql: str, seq: Iterable[Iterable]):
+        if self._kind == "postgres" and isinstance(sql, UpsertSQL):
+            seq = seq if isinstance(seq, list) else list(seq)
+            if self.copies(len(seq)):
+                return self._copy_upsert(sql, seq)
         sql = self._prepare(sql)
         if self._kind == "postgres":
             cur = self._conn.cursor()
@@ -65,6 +81,33 @@ class DBConn:
             return cur
         return self._conn.executemany(sql, seq)
 
+    def _copy_upsert(self, sql: "UpsertSQL", rows: list) -> Any:
+        """COPY rows into a temp staging table, then merge them with one INSERT ... SELECT.
+
+        ``_seq`` keeps the input order so a key repeated in ``rows`` ends
+        with its last values, as it would with executemany.
+        """
+        staging = f"_copy_{sql.table}"
+        cols = ", ".join(sql.columns)
+        keys = ", ".join(sql.conflict_cols)
+        cur = self._conn.cursor()
+        cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {sql.table} INCLUDING DEFAULTS, _seq BIGSERIAL)")
+        cur.execute(f"TRUNCATE {staging}")
+        copy_sql = f"COPY {staging} ({cols}) FROM STDIN"
+        if PG_DRIVER == "psycopg2":
+            cur.copy_expert(copy_sql, io.StringIO("".join(_copy_text_line(row) for row in rows)))
+        else:
+            with cur.copy(copy_sql) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        cur.execute(
+            f"INSERT INTO {sql.table} ({cols}) "
+            f"SELECT DISTINCT ON ({keys}) {cols} FROM {staging} ORDER BY {keys}, _seq DESC "
+            f"{sql.on_conflict}"
+        )
+        cur.execute(f"TRUNCATE {staging}")
+        return cur
+
     def commit(self):
         self._conn.commit()
 
@@ -76,6 +119,30 @@ def db_source_label() -> str:
     return "Postgres" if USE_POSTGRES else "SQLite"
 
 
+class UpsertSQL(str):
+    """upsert_sql output that remembers its target, so large Postgres
+    executemany batches can be bulk-loaded with COPY instead."""
+
+    table: str
+    columns: list[str]
+    conflict_cols: list[str]
+    on_conflict: str
+
+
+def _copy_text_line(row: Sequence) -> str:
+    """One row in COPY text format (psycopg2 has no row writer)."""
+    fields = []
+    for value in row:
+        if value is None:
+            fields.append("\\N")
+            continue
+        text = str(value)
+        for char, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+            text = text.replace(char, escaped)
+        fields.append(text)
+    return "\t".join(fields) + "\n"
+
+
 def upsert_sql(table: str, columns: list[str], conflict_cols: list[str]) -> str:
     cols = ", ".join(columns)
     placeholders = ", ".join("?" for _ in columns)
@@ -85,8 +152,106 @@ def upsert_sql(table: str, columns: list[str], conflict_cols: list[str]) -> str:
     update_cols = [c for c in columns if c not in conflict_cols]
     if update_cols:
         updates = ", ".join(f"{c}=EXCLUDED.{c}" for c in update_cols)
-        return f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
-    return f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) ON CONFLICT ({conflict}) DO NOTHING"
+        on_conflict = f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+    else:
+        on_conflict = f"ON CONFLICT ({conflict}) DO NOTHING"
+    sql = UpsertSQL(f"INSERT INTO {table} ({cols}) VALUES ({placeholders}) {on_conflict}")
+    sql.table, sql.columns, sql.conflict_cols, sql.on_conflict = table, list(columns), list(conflict_cols), on_conflict
+    return sql
+
+
+@dataclass
+class ChangeCounts:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def add(self, other: "ChangeCounts") -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.deleted += other.deleted
+        self.unchanged += other.unchanged
+
+
+def _row_hash(values: Sequence) -> int:
+    # REAL is single precision on Postgres; stored values have two decimals,
+    # so rounding makes a read-back float compare equal to the computed one.
+    return hash(tuple(round(v, 4) if isinstance(v, float) else v for v in values))
+
+
+def apply_changes(
+    conn: DBConn,
+    table: str,
+    columns: list[str],
+    key_cols: list[str],
+    rows: list[tuple],
+    branch_id: int,
+    date_from: str,
+    date_to: str,
+    where: dict[str, Sequence] | None = None,
+) -> ChangeCounts:
+    """Make the branch's rows of ``table`` for ``date_from..date_to`` equal ``rows``, writing only the difference.
+
+    ``rows`` follow ``columns``; the key must contain ``branch_id`` and
+    ``date``. Existing rows of the affected dates are read once and reduced
+    to a hash of their values per key: new keys are inserted, keys whose
+    hash changed are updated and keys of the range that are no longer
+    produced are deleted. Rows outside the range are inserted or updated
+    but never deleted. ``where`` narrows the compared rows further
+    (``column IN values``), e.g. to some groups of the branch. Does not commit.
+    """
+    key_pos = [columns.index(col) for col in key_cols]
+    value_cols = [col for col in columns if col not in key_cols]
+    value_pos = [columns.index(col) for col in value_cols]
+    date_pos = key_cols.index("date")
+    dates = [row[columns.index("date")] for row in rows]
+    low = min([date_from] + dates)
+    high = max([date_to] + dates)
+    filters = ["branch_id = ?", "date BETWEEN ? AND ?"]
+    params: list = [branch_id, low, high]
+    for col, values in (where or {}).items():
+        filters.append(f"{col} IN ({', '.join('?' for _ in values)})")
+        params.extend(values)
+    cur = conn.execute(
+        f"SELECT {', '.join(key_cols + value_cols)} FROM {table} WHERE {' AND '.join(filters)}",
+        params,
+    )
+    existing = {}
+    n_key = len(key_cols)
+    for row in cur.fetchall():
+        values = tuple(row[col] for col in key_cols + value_cols)
+        existing[values[:n_key]] = _row_hash(values[n_key:])
+
+    counts = ChangeCounts()
+    inserts, updates, changed = [], [], []
+    for row in rows:
+        key = tuple(row[i] for i in key_pos)
+        values = tuple(row[i] for i in value_pos)
+        old = existing.pop(key, None)
+        if old is None:
+            inserts.append(row)
+        elif old != _row_hash(values):
+            updates.append(values + key)
+            changed.append(row)
+        else:
+            counts.unchanged += 1
+    deletes = [key for key in existing if date_from <= key[date_pos] <= date_to]
+
+    counts.inserted, counts.updated, counts.deleted = len(inserts), len(updates), len(deletes)
+
+    if updates and conn.copies(len(inserts) + len(updates)):
+        # One COPY merge writes both: changed keys take the ON CONFLICT update.
+        inserts, updates = inserts + changed, []
+    where = " AND ".join(f"{col} = ?" for col in key_cols)
+    if inserts:
+        conn.executemany(upsert_sql(table, columns, key_cols), inserts)
+    if updates:
+        assignments = ", ".join(f"{col} = ?" for col in value_cols)
+        conn.executemany(f"UPDATE {table} SET {assignments} WHERE {where}", updates)
+    if deletes:
+        conn.executemany(f"DELETE FROM {table} WHERE {where}", deletes)
+    return counts
 
 
 def _connect_sqlite(db_path: Path) -> sqlite3.Connection:
@@ -95,7 +260,7 @@ def _connect_sqlite(db_path: Path) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
-    return conn
+    return tune_sqlite(conn, db_settings.sqlite_pragmas())
 
 
 def _connect_postgres():
@@ -108,191 +273,342 @@ def _connect_postgres():
     raise RuntimeError("Postgres driver not available (psycopg/psycopg2)")
 
 
+def _sqlite_pool(name: str, db_path: Path):
+    return get_pool(
+        name,
+        f"sqlite:{db_path.resolve()}",
+        lambda: _connect_sqlite(db_path),
+        per_thread=True,
+        **db_settings.pool_options(),
+    )
+
+
 @contextmanager
 def get_conn() -> DBConn:
-    raw = _connect_postgres() if USE_POSTGRES else _connect_sqlite(settings.db_path)
-    conn = DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
-    try:
-        yield conn
-    finally:
-        conn.close()
+    if USE_POSTGRES:
+        pool = get_pool("app", f"postgres:{DB_URL}", _connect_postgres, **db_settings.pool_options())
+    else:
+        pool = _sqlite_pool("app", settings.db_path)
+    with pool.connection() as raw:
+        yield DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
 
 
 @contextmanager
 def get_hist_conn() -> DBConn:
-    raw = _connect_sqlite(settings.historical_db_path)
-    conn = DBConn(raw, "sqlite")
+    with _sqlite_pool("historical", settings.historical_db_path).connection() as raw:
+        yield DBConn(raw, "sqlite")
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await blocking work of an async endpoint (queries and whatever else its payload needs) on the DB executor."""
+    return await get_db_executor("app").run(fn, *args, **kwargs)
+
+
+def _ensure_columns(conn: DBConn, table: str, columns: dict[str, str]) -> None:
     try:
-        yield conn
-    finally:
-        conn.close()
+        if USE_POSTGRES:
+            for name, col_type in columns.items():
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {name} {col_type};")
+        else:
+            cur = conn.execute(f"PRAGMA table_info({table});")
+            existing = {row["name"] for row in cur.fetchall()}
+            for name, col_type in columns.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type};")
+    except Exception:  # noqa: BLE001
+        pass
 
 
-def init_db() -> None:
-    with get_conn() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS raw_records (
-                branch_id INTEGER NOT NULL,
-                staff_id INTEGER NOT NULL,
-                record_id INTEGER NOT NULL,
-                start_dt TEXT NOT NULL,
-                end_dt TEXT NOT NULL,
-                attendance INTEGER NOT NULL,
-                updated_at TEXT NOT NULL,
-                PRIMARY KEY (branch_id, record_id)
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS staff_hour_busy (
-                branch_id INTEGER NOT NULL,
-                staff_id INTEGER NOT NULL,
-                date TEXT NOT NULL,
-                hour INTEGER NOT NULL,
-                busy_flag INTEGER NOT NULL,
-                in_benchmark INTEGER NOT NULL,
-                in_gray INTEGER NOT NULL,
-                PRIMARY KEY (branch_id, staff_id, date, hour)
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS group_hour_load (
-                branch_id INTEGER NOT NULL,
-                group_id TEXT NOT NULL,
-                date TEXT NOT NULL,
-                dow INTEGER NOT NULL,
-                hour INTEGER NOT NULL,
-                busy_count INTEGER NOT NULL,
-                staff_total INTEGER NOT NULL,
-                load_pct REAL NOT NULL,
-                in_benchmark INTEGER NOT NULL,
-                PRIMARY KEY (branch_id, group_id, date, hour)
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS etl_runs (
-                run_id TEXT PRIMARY KEY,
-                run_type TEXT NOT NULL,
-                branch_id INTEGER,
-                started_at TEXT NOT NULL,
-                finished_at TEXT,
-                status TEXT NOT NULL,
-                progress TEXT,
-                error_log TEXT
-            );
-            """
-        )
-        try:
-            if USE_POSTGRES:
-                conn.execute("ALTER TABLE etl_runs ADD COLUMN IF NOT EXISTS branch_id INTEGER;")
-            else:
-                cur = conn.execute("PRAGMA table_info(etl_runs);")
-                cols = {row["name"] for row in cur.fetchall()}
-                if "branch_id" not in cols:
-                    conn.execute("ALTER TABLE etl_runs ADD COLUMN branch_id INTEGER;")
-        except Exception:  # noqa: BLE001
-            pass
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS goods_cache (
-                branch_id INTEGER NOT NULL,
-                good_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                price REAL,
-                unit TEXT,
-                updated_at TEXT NOT NULL,
-                PRIMARY KEY (branch_id, good_id)
-            );
-            """
-        )
+def _base_schema(conn: DBConn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS raw_records (
+            branch_id INTEGER NOT NULL,
+            staff_id INTEGER NOT NULL,
+            record_id INTEGER NOT NULL,
+            start_dt TEXT NOT NULL,
+            end_dt TEXT NOT NULL,
+            attendance INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (branch_id, record_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS staff_hour_busy (
+            branch_id INTEGER NOT NULL,
+            staff_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            busy_flag INTEGER NOT NULL,
+            in_benchmark INTEGER NOT NULL,
+            in_gray INTEGER NOT NULL,
+            PRIMARY KEY (branch_id, staff_id, date, hour)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS group_hour_load (
+            branch_id INTEGER NOT NULL,
+            group_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            dow INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            busy_count INTEGER NOT NULL,
+            staff_total INTEGER NOT NULL,
+            load_pct REAL NOT NULL,
+            in_benchmark INTEGER NOT NULL,
+            PRIMARY KEY (branch_id, group_id, date, hour)
+        );
+        """
+    )
+    _ensure_columns(conn, "staff_hour_busy", {"busy_minutes": "REAL"})
+    _ensure_columns(conn, "group_hour_load", {"load_pct_minutes": "REAL"})
+    # Which (group, date) cells were computed and with how many staff: the
+    # readers densify group_hour_load from it when zero hours are not stored.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS group_day_staff (
+            branch_id INTEGER NOT NULL,
+            group_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            staff_total INTEGER NOT NULL,
+            PRIMARY KEY (branch_id, group_id, date)
+        );
+        """
+    )
+    if conn.execute("SELECT 1 FROM group_day_staff LIMIT 1").fetchone() is None:
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS goods_cache_status (
-                branch_id INTEGER PRIMARY KEY,
-                last_sync TEXT,
-                total_count INTEGER,
-                status TEXT,
-                error TEXT
-            );
+            INSERT INTO group_day_staff (branch_id, group_id, date, staff_total)
+            SELECT branch_id, group_id, date, MAX(staff_total)
+            FROM group_hour_load
+            GROUP BY branch_id, group_id, date
             """
         )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_goods_cache_title ON goods_cache(branch_id, title);"
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS mini_app_audit (
-                created_at TEXT NOT NULL,
-                action TEXT NOT NULL,
-                branch_id INTEGER NOT NULL,
-                record_id INTEGER NOT NULL,
-                service_id INTEGER,
-                good_id INTEGER,
-                amount REAL,
-                price REAL,
-                storage_id INTEGER,
-                tg_user_id TEXT,
-                tg_username TEXT,
-                tg_name TEXT,
-                status TEXT NOT NULL,
-                error TEXT
-            );
-            """
-        )
-        conn.commit()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS etl_runs (
+            run_id TEXT PRIMARY KEY,
+            run_type TEXT NOT NULL,
+            branch_id INTEGER,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            status TEXT NOT NULL,
+            progress TEXT,
+            error_log TEXT
+        );
+        """
+    )
+    _ensure_columns(
+        conn,
+        "etl_runs",
+        {
+            "branch_id": "INTEGER",
+            "backoff_seconds": "REAL",
+            "peak_rss_mb": "REAL",
+            "rows_inserted": "INTEGER",
+            "rows_updated": "INTEGER",
+            "rows_deleted": "INTEGER",
+            "owner": "TEXT",
+            "progress_json": "TEXT",
+        },
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS etl_checkpoints (
+            run_type TEXT NOT NULL,
+            branch_id INTEGER NOT NULL,
+            run_id TEXT NOT NULL,
+            period_from TEXT NOT NULL,
+            committed_to TEXT,
+            latest_change TEXT,
+            window_from TEXT,
+            window_to TEXT,
+            page INTEGER,
+            total_count INTEGER,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (run_type, branch_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS group_config_hashes (
+            branch_id INTEGER NOT NULL,
+            group_id TEXT NOT NULL,
+            staff_hash TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (branch_id, group_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS etl_watermarks (
+            branch_id INTEGER PRIMARY KEY,
+            changed_after TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS goods_cache (
+            branch_id INTEGER NOT NULL,
+            good_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            price REAL,
+            unit TEXT,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (branch_id, good_id)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS goods_cache_status (
+            branch_id INTEGER PRIMARY KEY,
+            last_sync TEXT,
+            total_count INTEGER,
+            status TEXT,
+            error TEXT
+        );
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_goods_cache_title ON goods_cache(branch_id, title);"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mini_app_audit (
+            created_at TEXT NOT NULL,
+            action TEXT NOT NULL,
+            branch_id INTEGER NOT NULL,
+            record_id INTEGER NOT NULL,
+            service_id INTEGER,
+            good_id INTEGER,
+            amount REAL,
+            price REAL,
+            storage_id INTEGER,
+            tg_user_id TEXT,
+            tg_username TEXT,
+            tg_name TEXT,
+            status TEXT NOT NULL,
+            error TEXT
+        );
+        """
+    )
+
+
+def _historical_base_schema(conn: DBConn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historical_loads (
+            branch_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            resource_type TEXT NOT NULL,
+            date TEXT NOT NULL,
+            dow INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            load_pct REAL NOT NULL,
+            PRIMARY KEY (branch_id, resource_type, date, hour)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historical_types (
+            branch_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            resource_type TEXT NOT NULL,
+            order_index INTEGER NOT NULL,
+            PRIMARY KEY (branch_id, month, resource_type)
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historical_imports (
+            run_id TEXT PRIMARY KEY,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            status TEXT NOT NULL,
+            rows_count INTEGER,
+            file_path TEXT,
+            file_mtime REAL,
+            error_log TEXT
+        );
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hist_month ON historical_loads(branch_id, month);"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hist_date ON historical_loads(branch_id, date);"
+    )
+
+
+def _hot_query_indexes(conn: DBConn) -> None:
+    # Covering indexes for the queries of the heatmap summary/status pages,
+    # the ETL's reaggregation and the goods search: each answers its query
+    # from the index alone, in the order of its range filter.
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_group_hour_load_date ON group_hour_load"
+        "(branch_id, date, hour, group_id, load_pct, load_pct_minutes);",
+        "CREATE INDEX IF NOT EXISTS idx_group_day_staff_date ON group_day_staff(branch_id, date, group_id);",
+        "CREATE INDEX IF NOT EXISTS idx_raw_records_updated ON raw_records(branch_id, updated_at);",
+        "CREATE INDEX IF NOT EXISTS idx_raw_records_start ON raw_records(branch_id, start_dt, end_dt, staff_id);",
+        "CREATE INDEX IF NOT EXISTS idx_etl_runs_started ON etl_runs(started_at);",
+        "CREATE INDEX IF NOT EXISTS idx_etl_runs_type_started ON etl_runs(run_type, started_at);",
+        # LOWER(title) LIKE '%term%' cannot seek; covering the selected
+        # columns at least keeps the per-branch scan inside the index.
+        "DROP INDEX IF EXISTS idx_goods_cache_title;",
+        "CREATE INDEX IF NOT EXISTS idx_goods_cache_title ON goods_cache(branch_id, title, good_id, price, unit);",
+    ):
+        conn.execute(statement)
+
+
+def _historical_summary_index(conn: DBConn) -> None:
+    # In GROUP BY order and covering the summary's AVG(load_pct); replaces
+    # idx_hist_month, whose (branch_id, month) prefix it keeps.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_hist_summary ON historical_loads"
+        "(branch_id, month, resource_type, hour, load_pct);"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_hist_month;")
+
+
+APP_MIGRATIONS = [
+    Migration(1, "base_schema", _base_schema),
+    Migration(2, "hot_query_indexes", _hot_query_indexes),
+]
+
+HISTORICAL_MIGRATIONS = [
+    Migration(1, "base_schema", _historical_base_schema),
+    Migration(2, "summary_index", _historical_summary_index),
+]
+
+_MIGRATED: set[str] = set()
+_MIGRATED_LOCK = threading.Lock()
+
+
+def _migrate_once(target: str, connect, migrations: list[Migration], postgres: bool = False) -> None:
+    with _MIGRATED_LOCK:
+        if target in _MIGRATED:
+            return
+        with connect() as conn:
+            migrate(conn, migrations, postgres=postgres)
+        _MIGRATED.add(target)
+
+
+def init_db() -> None:
+    """Bring the app database to the latest schema version; later calls in the process return at once."""
+    target = f"postgres:{DB_URL}" if USE_POSTGRES else f"sqlite:{settings.db_path.resolve()}"
+    _migrate_once(target, get_conn, APP_MIGRATIONS, postgres=USE_POSTGRES)
 
 
 def init_historical_db() -> None:
-    with get_hist_conn() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS historical_loads (
-                branch_id INTEGER NOT NULL,
-                month TEXT NOT NULL,
-                resource_type TEXT NOT NULL,
-                date TEXT NOT NULL,
-                dow INTEGER NOT NULL,
-                hour INTEGER NOT NULL,
-                load_pct REAL NOT NULL,
-                PRIMARY KEY (branch_id, resource_type, date, hour)
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS historical_types (
-                branch_id INTEGER NOT NULL,
-                month TEXT NOT NULL,
-                resource_type TEXT NOT NULL,
-                order_index INTEGER NOT NULL,
-                PRIMARY KEY (branch_id, month, resource_type)
-            );
-            """
-        )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS historical_imports (
-                run_id TEXT PRIMARY KEY,
-                started_at TEXT NOT NULL,
-                finished_at TEXT,
-                status TEXT NOT NULL,
-                rows_count INTEGER,
-                file_path TEXT,
-                file_mtime REAL,
-                error_log TEXT
-            );
-            """
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_hist_month ON historical_loads(branch_id, month);"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_hist_date ON historical_loads(branch_id, date);"
-        )
-        conn.commit()
+    _migrate_once(f"sqlite:{settings.historical_db_path.resolve()}", get_hist_conn, HISTORICAL_MIGRATIONS)
@@ -11,7 +11,9 @@ from typing import Any
 import requests
 
 from .config import settings
+from .rate_limit import limiter_for, parse_retry_after
 from .utils import parse_datetime
+from .yclients import get_session
 
 
 def _mask_token(token: str | None) -> str:
@@ -90,8 +92,10 @@ def _request(
     response_text = ""
     json_data = None
     error = None
+    limiter = limiter_for(settings.yclients_partner_token)
     try:
-        resp = requests.request(
+        limiter.acquire()
+        resp = get_session().request(
             method,
             url,
             headers=_headers(),
@@ -99,6 +103,10 @@ def _request(
             timeout=timeout or settings.yclients_timeout,
         )
         status_code = resp.status_code
+        if status_code == 429:
+            limiter.throttle(parse_retry_after(resp.headers.get("Retry-After")))
+        else:
+            limiter.success()
         response_text = resp.text or ""
         try:
             json_data = resp.json()
@@ -1,18 +1,74 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import socket
+import sys
+import threading
 import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import replace
 from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from .config import settings
-from .db import get_conn, upsert_sql
-from .groups import load_group_config, resolve_staff_ids, save_group_config
-from .utils import parse_datetime, daterange
+from .db import ChangeCounts, apply_changes, get_conn, upsert_sql
+from .groups import (
+    load_group_config,
+    load_source_group_config,
+    resolve_staff_ids,
+    resolve_staff_ids_offline,
+    save_group_config,
+)
+from .occupancy import OccupancyAccumulator, group_hour_rows, iter_hours as _iter_hours, staff_hour_rows
+from .progress import RunProgress, finish as finish_progress, get_tracker, track
+from .utils import daterange, parse_datetime
+from .retry import RetryStats
 from .yclients import YClientsClient
 
 
 ATTENDANCE_FACT = {1, 2}
+# Incremental runs ask for changes a little before the stored watermark so
+# edits saved in the same second as the last fetched one are not missed.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Branches fetch in parallel but write one at a time: SQLite has a single
+# writer, and the hour rebuild is CPU-bound under the GIL anyway.
+_WRITE_LOCK = threading.Lock()
+# Written to etl_runs.owner so a restarted process can tell its
+# predecessor's abandoned runs from ones another worker is still running.
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _rss_mb() -> float | None:
+    """Resident set size of the process in MB (the peak so far where /proc is missing)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+class _RunStats:
+    """Highest process RSS sampled during a run, in MB, and the aggregate rows it changed."""
+
+    def __init__(self) -> None:
+        self.peak: float | None = None
+        self.changes = ChangeCounts()
+
+    def sample(self) -> float | None:
+        current = _rss_mb()
+        if current is not None and (self.peak is None or current > self.peak):
+            self.peak = current
+        return self.peak
 
 
 def _start_run(run_type: str, branch_id: int | None = None) -> str:
@@ -21,16 +77,29 @@ def _start_run(run_type: str, branch_id: int | None = None) -> str:
     with get_conn() as conn:
         conn.execute(
             """
-            INSERT INTO etl_runs(run_id, run_type, branch_id, started_at, status, progress, error_log)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            INSERT INTO etl_runs(run_id, run_type, branch_id, started_at, status, progress, error_log, owner)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (run_id, run_type, branch_id, now, "running", "0%", ""),
+            (run_id, run_type, branch_id, now, "running", "0%", "", _OWNER),
         )
         conn.commit()
+    track(run_id, run_type).fields["branch_id"] = branch_id
     return run_id
 
 
-def _update_run(run_id: str, status: str | None = None, progress: str | None = None, error: str | None = None, finished: bool = False) -> None:
+def _tracker(run_id: str) -> RunProgress:
+    return get_tracker(run_id) or track(run_id, "")
+
+
+def _update_run(
+    run_id: str,
+    status: str | None = None,
+    progress: str | None = None,
+    error: str | None = None,
+    finished: bool = False,
+    backoff_seconds: float | None = None,
+    stats: _RunStats | None = None,
+) -> None:
     fields = []
     params = []
     if status is not None:
@@ -42,9 +111,22 @@ def _update_run(run_id: str, status: str | None = None, progress: str | None = N
     if error is not None:
         fields.append("error_log = COALESCE(error_log, '') || ?")
         params.append(f"\n{error}")
+    if backoff_seconds is not None:
+        fields.append("backoff_seconds = ?")
+        params.append(round(backoff_seconds, 3))
+    if stats is not None:
+        peak = stats.sample()
+        fields.append("peak_rss_mb = ?")
+        params.append(round(peak, 1) if peak is not None else None)
+        fields.extend(["rows_inserted = ?", "rows_updated = ?", "rows_deleted = ?"])
+        params.extend([stats.changes.inserted, stats.changes.updated, stats.changes.deleted])
     if finished:
         fields.append("finished_at = ?")
         params.append(datetime.utcnow().isoformat())
+        snapshot = finish_progress(run_id, status or "done")
+        if snapshot is not None:
+            fields.append("progress_json = ?")
+            params.append(json.dumps(snapshot))
     if not fields:
         return
     params.append(run_id)
@@ -56,11 +138,103 @@ def _update_run(run_id: str, status: str | None = None, progress: str | None = N
         conn.commit()
 
 
-def _iter_hours(start_dt: datetime, end_dt: datetime) -> Iterable[datetime]:
-    current = start_dt.replace(minute=0, second=0, microsecond=0)
-    while current < end_dt:
-        yield current
-        current += timedelta(hours=1)
+def _owner_alive(owner: str | None, run_id: str) -> bool:
+    """Whether the process that started a run may still be running it."""
+    if not owner:
+        return False
+    if owner == _OWNER:
+        # Runs of this process are tracked until they finish; an untracked one
+        # belongs to an earlier process that had the same pid (e.g. pid 1 in a container).
+        return get_tracker(run_id) is not None
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        # Another instance: on a single-instance deploy, the replaced one.
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def mark_interrupted_runs() -> list[dict]:
+    """Mark ``running`` runs whose process is gone as ``interrupted`` and return them."""
+    with get_conn() as conn:
+        cur = conn.execute("SELECT run_id, run_type, branch_id, owner FROM etl_runs WHERE status = ?", ("running",))
+        stale = [dict(row) for row in cur.fetchall() if not _owner_alive(row["owner"], row["run_id"])]
+    for run in stale:
+        _update_run(run["run_id"], status="interrupted", error="process restarted before the run finished", finished=True)
+    return stale
+
+
+def _get_checkpoint(run_type: str, branch_id: int) -> dict | None:
+    with get_conn() as conn:
+        cur = conn.execute(
+            "SELECT * FROM etl_checkpoints WHERE run_type = ? AND branch_id = ?",
+            (run_type, branch_id),
+        )
+        row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def _save_checkpoint(
+    run_type: str,
+    branch_id: int,
+    run_id: str,
+    period_from: date,
+    committed_to: date | None,
+    latest: datetime | None,
+) -> None:
+    """Record that everything up to ``committed_to`` is written for the branch's run."""
+    sql = upsert_sql(
+        "etl_checkpoints",
+        ["run_type", "branch_id", "run_id", "period_from", "committed_to", "latest_change", "updated_at"],
+        ["run_type", "branch_id"],
+    )
+    with get_conn() as conn:
+        conn.execute(
+            sql,
+            (
+                run_type,
+                branch_id,
+                run_id,
+                period_from.isoformat(),
+                committed_to.isoformat() if committed_to else None,
+                latest.isoformat() if latest else None,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+        conn.commit()
+
+
+def _checkpoint_page(run_type: str, branch_id: int, window: tuple[date, date], page: int, total: int) -> None:
+    """Page progress of the window being fetched; resuming still restarts that window."""
+    with get_conn() as conn:
+        conn.execute(
+            """
+            UPDATE etl_checkpoints
+            SET window_from = ?, window_to = ?, page = ?, total_count = ?, updated_at = ?
+            WHERE run_type = ? AND branch_id = ?
+            """,
+            (
+                window[0].isoformat(),
+                window[1].isoformat(),
+                page,
+                total or None,
+                datetime.utcnow().isoformat(),
+                run_type,
+                branch_id,
+            ),
+        )
+        conn.commit()
+
+
+def _clear_checkpoint(run_type: str, branch_id: int) -> None:
+    with get_conn() as conn:
+        conn.execute("DELETE FROM etl_checkpoints WHERE run_type = ? AND branch_id = ?", (run_type, branch_id))
+        conn.commit()
 
 
 def _upsert_raw_records(records: list[dict]) -> None:
@@ -74,127 +248,161 @@ def _upsert_raw_records(records: list[dict]) -> None:
         conn.commit()
 
 
-def _rebuild_staff_hour_busy(branch_id: int, date_from: date, date_to: date, records: list[dict]) -> None:
-    rows = {}
-    for rec in records:
-        start_dt = rec["start_dt"]
-        end_dt = rec["end_dt"]
-        staff_id = rec["staff_id"]
-        for hour_dt in _iter_hours(start_dt, end_dt):
-            day = hour_dt.date().isoformat()
-            hour = hour_dt.hour
-            in_benchmark = 1 if 10 <= hour <= 21 else 0
-            in_gray = 1 if (hour < 10 or hour >= 22) else 0
-            key = (branch_id, staff_id, day, hour)
-            rows[key] = (branch_id, staff_id, day, hour, 1, in_benchmark, in_gray)
-
+def _write_staff_hour_busy(branch_id: int, date_from: date, date_to: date, rows: list[tuple]) -> ChangeCounts:
     with get_conn() as conn:
-        conn.execute(
-            "DELETE FROM staff_hour_busy WHERE branch_id = ? AND date BETWEEN ? AND ?",
-            (branch_id, date_from.isoformat(), date_to.isoformat()),
+        counts = apply_changes(
+            conn,
+            "staff_hour_busy",
+            ["branch_id", "staff_id", "date", "hour", "busy_flag", "in_benchmark", "in_gray", "busy_minutes"],
+            ["branch_id", "staff_id", "date", "hour"],
+            rows,
+            branch_id,
+            date_from.isoformat(),
+            date_to.isoformat(),
         )
-        if rows:
-            sql = upsert_sql(
-                "staff_hour_busy",
-                ["branch_id", "staff_id", "date", "hour", "busy_flag", "in_benchmark", "in_gray"],
-                ["branch_id", "staff_id", "date", "hour"],
-            )
-            conn.executemany(sql, rows.values())
         conn.commit()
+    return counts
 
 
-def _rebuild_group_hour_load(branch_id: int, group_config: dict, date_from: date, date_to: date) -> None:
+def _branch_groups(group_config: dict, branch_id: int) -> list[dict] | None:
     branch = next((b for b in group_config.get("branches", []) if int(b["branch_id"]) == branch_id), None)
-    if not branch:
-        return
-    groups = branch.get("groups", [])
-    group_sets = []
-    for g in groups:
-        staff_ids = [int(x) for x in g.get("staff_ids", [])]
-        group_sets.append((g["group_id"], set(staff_ids)))
+    return None if branch is None else branch.get("groups", [])
+
+
+def _rebuild_group_hour_load(
+    branch_id: int,
+    group_config: dict,
+    date_from: date,
+    date_to: date,
+    staff_rows: list[tuple],
+    group_ids: list[str] | None = None,
+) -> ChangeCounts:
+    """Rebuild group_hour_load from the staff-hour rows just written, without re-reading them.
+
+    group_day_staff records every computed (group, date) with its staff
+    total; in sparse mode (GROUP_LOAD_SPARSE) only hours with someone busy
+    are kept in group_hour_load and readers fill in the rest from it.
+    With ``group_ids`` only those groups are rebuilt and the others are
+    left untouched.
+    """
+    groups = _branch_groups(group_config, branch_id)
+    if groups is None:
+        return ChangeCounts()
+    where = None
+    if group_ids is not None:
+        if not group_ids:
+            return ChangeCounts()
+        groups = [g for g in groups if g["group_id"] in group_ids]
+        where = {"group_id": list(group_ids)}
+    rows = group_hour_rows(branch_id, groups, date_from, date_to, staff_rows)
+    if settings.group_load_sparse:
+        rows = [row for row in rows if row[5]]
+    day_rows = [
+        (branch_id, g["group_id"], day.isoformat(), len({int(x) for x in g.get("staff_ids", [])}))
+        for g in groups
+        for day in daterange(date_from, date_to)
+    ]
 
-    busy_by_day_hour = {}
     with get_conn() as conn:
-        cur = conn.execute(
-            """
-            SELECT staff_id, date, hour
-            FROM staff_hour_busy
-            WHERE branch_id = ? AND date BETWEEN ? AND ? AND busy_flag = 1
-            """,
-            (branch_id, date_from.isoformat(), date_to.isoformat()),
+        day_counts = apply_changes(
+            conn,
+            "group_day_staff",
+            ["branch_id", "group_id", "date", "staff_total"],
+            ["branch_id", "group_id", "date"],
+            day_rows,
+            branch_id,
+            date_from.isoformat(),
+            date_to.isoformat(),
+            where,
         )
-        for row in cur.fetchall():
-            key = (row["date"], int(row["hour"]))
-            busy_by_day_hour.setdefault(key, set()).add(int(row["staff_id"]))
-
-        conn.execute(
-            "DELETE FROM group_hour_load WHERE branch_id = ? AND date BETWEEN ? AND ?",
-            (branch_id, date_from.isoformat(), date_to.isoformat()),
+        counts = apply_changes(
+            conn,
+            "group_hour_load",
+            [
+                "branch_id",
+                "group_id",
+                "date",
+                "dow",
+                "hour",
+                "busy_count",
+                "staff_total",
+                "load_pct",
+                "in_benchmark",
+                "load_pct_minutes",
+            ],
+            ["branch_id", "group_id", "date", "hour"],
+            rows,
+            branch_id,
+            date_from.isoformat(),
+            date_to.isoformat(),
+            where,
         )
-
-        insert_rows = []
-        for day in daterange(date_from, date_to):
-            day_str = day.isoformat()
-            dow = day.isoweekday()
-            for hour in range(24):
-                busy_set = busy_by_day_hour.get((day_str, hour), set())
-                in_benchmark = 1 if 10 <= hour <= 21 else 0
-                for group_id, staff_set in group_sets:
-                    staff_total = len(staff_set)
-                    if staff_total == 0:
-                        busy_count = 0
-                        load_pct = 0.0
-                    else:
-                        busy_count = len(staff_set.intersection(busy_set))
-                        load_pct = round((busy_count / staff_total) * 100, 2)
-                    insert_rows.append(
-                        (
-                            branch_id,
-                            group_id,
-                            day_str,
-                            dow,
-                            hour,
-                            busy_count,
-                            staff_total,
-                            load_pct,
-                            in_benchmark,
-                        )
-                    )
-        if insert_rows:
-            sql = upsert_sql(
-                "group_hour_load",
-                [
-                    "branch_id",
-                    "group_id",
-                    "date",
-                    "dow",
-                    "hour",
-                    "busy_count",
-                    "staff_total",
-                    "load_pct",
-                    "in_benchmark",
-                ],
-                ["branch_id", "group_id", "date", "hour"],
-            )
-            conn.executemany(sql, insert_rows)
         conn.commit()
+    counts.add(day_counts)
+    return counts
 
 
-def _fetch_records_for_period(client: YClientsClient, branch_id: int, start_date: date, end_date: date, progress_cb) -> list[dict]:
-    records_out = []
-    page = 1
+def _fetch_records_for_period(
+    client: YClientsClient,
+    branch_id: int,
+    start_date: date,
+    end_date: date,
+    progress_cb,
+    changed_after: str | None = None,
+    first_page: dict | None = None,
+) -> list[dict]:
     count = 50
-    while True:
-        resp = client.get_records(
+
+    def fetch_page(page: int) -> dict:
+        return client.get_records(
             branch_id,
             start_date=start_date.isoformat(),
             end_date=end_date.isoformat(),
             page=page,
             count=count,
+            changed_after=changed_after,
         )
+
+    first = first_page if first_page is not None else fetch_page(1)
+    data = first.get("data") or []
+    total = (first.get("meta") or {}).get("total_count") or 0
+    progress_cb(branch_id, 1, total)
+    if not data:
+        return []
+    if not total:
+        return _fetch_pages_sequential(fetch_page, branch_id, data, count, progress_cb)
+    pages_total = -(-int(total) // count)
+    if pages_total <= 1:
+        return list(data)
+
+    # meta.total_count tells how many pages there are, so the rest can be
+    # fetched concurrently; results are stitched back in page order.
+    pages: dict[int, list[dict]] = {1: data}
+    workers = min(settings.etl_fetch_concurrency, pages_total - 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_page, page): page for page in range(2, pages_total + 1)}
+        try:
+            for future in as_completed(futures):
+                resp = future.result()
+                pages[futures[future]] = resp.get("data") or []
+                progress_cb(branch_id, len(pages), total)
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+    records_out = []
+    for page in range(1, pages_total + 1):
+        records_out.extend(pages.get(page) or [])
+    return records_out
+
+
+def _fetch_pages_sequential(fetch_page, branch_id: int, first_data: list[dict], count: int, progress_cb) -> list[dict]:
+    records_out = list(first_data)
+    page = 2
+    while True:
+        resp = fetch_page(page)
         data = resp.get("data") or []
-        meta = resp.get("meta") or {}
-        total = meta.get("total_count") or 0
+        total = (resp.get("meta") or {}).get("total_count") or 0
         progress_cb(branch_id, page, total)
         if not data:
             break
@@ -208,6 +416,8 @@ def _fetch_records_for_period(client: YClientsClient, branch_id: int, start_date
 def _normalize_records(branch_id: int, records: list[dict]) -> list[dict]:
     normalized = []
     for rec in records:
+        if rec.get("deleted"):
+            continue
         attendance = rec.get("attendance")
         if attendance is None:
             attendance = rec.get("visit_attendance")
@@ -258,7 +468,7 @@ def _to_raw_row(rec: dict) -> tuple:
     )
 
 
-def _run_full_for_branch(client: YClientsClient, resolved: dict, branch_id: int, run_id: str) -> None:
+def _branch_period(branch_id: int) -> tuple[date, date]:
     start_date = date(2025, 1, 1)
     if settings.branch_start_date and (
         not settings.active_branch_ids or branch_id in settings.active_branch_ids
@@ -269,54 +479,633 @@ def _run_full_for_branch(client: YClientsClient, resolved: dict, branch_id: int,
     end_date = datetime.now(tz=tz).date()
     if end_date < start_date:
         end_date = start_date
+    return start_date, end_date
 
-    def progress_cb(bid, page, total):
-        if total:
-            _update_run(run_id, progress=f"{bid}: page {page} / ~{total}")
+
+def _get_watermark(branch_id: int) -> str | None:
+    """Stored change watermark, or the newest ``updated_at`` already loaded."""
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT changed_after FROM etl_watermarks WHERE branch_id = ?",
+            (branch_id,),
+        ).fetchone()
+        if row and row["changed_after"]:
+            return row["changed_after"]
+        row = conn.execute(
+            "SELECT MAX(updated_at) AS max_updated FROM raw_records WHERE branch_id = ?",
+            (branch_id,),
+        ).fetchone()
+    return row["max_updated"] if row and row["max_updated"] else None
+
+
+def _change_values(raw_records: list[dict]) -> list[str | None]:
+    return [rec.get("last_change_date") or rec.get("create_date") for rec in raw_records]
+
+
+def _latest_change(values: Iterable[str | None], latest: datetime | None = None) -> datetime | None:
+    for value in values:
+        if not value:
+            continue
+        try:
+            changed = parse_datetime(value, settings.timezone)
+        except ValueError:
+            continue
+        if latest is None or changed > latest:
+            latest = changed
+    return latest
+
+
+def _advance_watermark(branch_id: int, raw_records: list[dict], latest: datetime | None = None) -> None:
+    latest = _latest_change([_get_watermark(branch_id)] + _change_values(raw_records), latest)
+    if latest is None:
+        return
+    sql = upsert_sql("etl_watermarks", ["branch_id", "changed_after", "updated_at"], ["branch_id"])
+    with get_conn() as conn:
+        conn.execute(sql, (branch_id, latest.isoformat(), datetime.utcnow().isoformat()))
+        conn.commit()
+
+
+def _group_hash(group: dict) -> str:
+    """Fingerprint of what a group's aggregates depend on: its set of staff ids."""
+    staff_ids = sorted({int(x) for x in group.get("staff_ids", [])})
+    return hashlib.sha256(json.dumps(staff_ids).encode()).hexdigest()
+
+
+def _stored_group_hashes(branch_id: int) -> dict[str, str]:
+    with get_conn() as conn:
+        cur = conn.execute("SELECT group_id, staff_hash FROM group_config_hashes WHERE branch_id = ?", (branch_id,))
+        return {row["group_id"]: row["staff_hash"] for row in cur.fetchall()}
+
+
+def _store_group_hashes(branch_id: int, groups: list[dict]) -> None:
+    """Remember the membership the branch's stored aggregates were built with."""
+    now = datetime.utcnow().isoformat()
+    with get_conn() as conn:
+        conn.execute("DELETE FROM group_config_hashes WHERE branch_id = ?", (branch_id,))
+        conn.executemany(
+            "INSERT INTO group_config_hashes(branch_id, group_id, staff_hash, updated_at) VALUES (?, ?, ?, ?)",
+            [(branch_id, g["group_id"], _group_hash(g), now) for g in groups],
+        )
+        conn.commit()
+
+
+def _stale_group_ids(branch_id: int, group_ids: set[str]) -> list[str]:
+    """Groups that still have aggregates stored but are no longer configured."""
+    with get_conn() as conn:
+        cur = conn.execute("SELECT DISTINCT group_id FROM group_day_staff WHERE branch_id = ?", (branch_id,))
+        stored = {row["group_id"] for row in cur.fetchall()}
+    return sorted((stored | set(_stored_group_hashes(branch_id))) - group_ids)
+
+
+def _delete_group_rows(branch_id: int, group_ids: list[str]) -> int:
+    if not group_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in group_ids)
+    deleted = 0
+    with get_conn() as conn:
+        for table in ("group_hour_load", "group_day_staff"):
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE branch_id = ? AND group_id IN ({placeholders})",
+                [branch_id, *group_ids],
+            )
+            deleted += max(cur.rowcount, 0)
+        conn.commit()
+    return deleted
+
+
+def _load_staff_hour_rows(branch_id: int, date_from: date, date_to: date, staff_ids: list[int]) -> list[tuple]:
+    """Stored staff_hour_busy rows of some staff, shaped like staff_hour_rows output."""
+    if not staff_ids:
+        return []
+    placeholders = ", ".join("?" for _ in staff_ids)
+    with get_conn() as conn:
+        cur = conn.execute(
+            f"""
+            SELECT branch_id, staff_id, date, hour, busy_flag, in_benchmark, in_gray, busy_minutes
+            FROM staff_hour_busy
+            WHERE branch_id = ? AND date BETWEEN ? AND ? AND staff_id IN ({placeholders})
+            """,
+            [branch_id, date_from.isoformat(), date_to.isoformat(), *staff_ids],
+        )
+        rows = cur.fetchall()
+    # Rows written before busy minutes were tracked count as a fully busy hour.
+    return [
+        (
+            int(row["branch_id"]),
+            int(row["staff_id"]),
+            row["date"],
+            int(row["hour"]),
+            int(row["busy_flag"]),
+            int(row["in_benchmark"]),
+            int(row["in_gray"]),
+            60.0 if row["busy_minutes"] is None else float(row["busy_minutes"]),
+        )
+        for row in rows
+    ]
+
+
+def _record_dates(start_dt: datetime, end_dt: datetime) -> set[date]:
+    dates = {hour_dt.date() for hour_dt in _iter_hours(start_dt, end_dt)}
+    dates.add(start_dt.date())
+    return dates
+
+
+def _stored_record_dates(branch_id: int, record_ids: list[int]) -> set[date]:
+    """Dates currently occupied by these records in raw_records (before they change)."""
+    dates: set[date] = set()
+    with get_conn() as conn:
+        for offset in range(0, len(record_ids), 500):
+            chunk = record_ids[offset: offset + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            cur = conn.execute(
+                f"SELECT start_dt, end_dt FROM raw_records WHERE branch_id = ? AND record_id IN ({placeholders})",
+                [branch_id, *chunk],
+            )
+            for row in cur.fetchall():
+                dates |= _record_dates(datetime.fromisoformat(row["start_dt"]), datetime.fromisoformat(row["end_dt"]))
+    return dates
+
+
+def _window_record_ids(branch_id: int, date_from: date, date_to: date) -> set[int]:
+    """Ids of the stored records starting between ``date_from`` and ``date_to``."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            "SELECT record_id FROM raw_records WHERE branch_id = ? AND start_dt >= ? AND start_dt < ?",
+            (branch_id, date_from.isoformat(), (date_to + timedelta(days=1)).isoformat()),
+        )
+        return {int(row["record_id"]) for row in cur.fetchall()}
+
+
+def _delete_raw_records(branch_id: int, record_ids: list[int]) -> None:
+    with get_conn() as conn:
+        for offset in range(0, len(record_ids), 500):
+            chunk = record_ids[offset: offset + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            conn.execute(
+                f"DELETE FROM raw_records WHERE branch_id = ? AND record_id IN ({placeholders})",
+                [branch_id, *chunk],
+            )
+        conn.commit()
+
+
+def _load_raw_records(branch_id: int, date_from: date, date_to: date) -> list[dict]:
+    """Stored records that can occupy hours between ``date_from`` and ``date_to``."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            """
+            SELECT staff_id, start_dt, end_dt
+            FROM raw_records
+            WHERE branch_id = ? AND start_dt >= ? AND start_dt < ?
+            """,
+            (
+                branch_id,
+                (date_from - timedelta(days=1)).isoformat(),
+                (date_to + timedelta(days=1)).isoformat(),
+            ),
+        )
+        rows = cur.fetchall()
+    return [
+        {
+            "staff_id": int(row["staff_id"]),
+            "start_dt": datetime.fromisoformat(row["start_dt"]),
+            "end_dt": datetime.fromisoformat(row["end_dt"]),
+        }
+        for row in rows
+    ]
+
+
+def _load_carry_records(branch_id: int, day: date) -> list[dict]:
+    """Stored records that started before ``day`` and run into it."""
+    boundary = datetime.combine(day, datetime.min.time())
+    return [
+        rec
+        for rec in _load_raw_records(branch_id, day - timedelta(days=1), day - timedelta(days=1))
+        if rec["start_dt"].replace(tzinfo=None) < boundary < rec["end_dt"].replace(tzinfo=None)
+    ]
+
+
+def _date_ranges(dates: Iterable[date]) -> list[tuple[date, date]]:
+    ranges: list[tuple[date, date]] = []
+    for day in sorted(dates):
+        if ranges and day - ranges[-1][1] <= timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
         else:
-            _update_run(run_id, progress=f"{bid}: page {page}")
+            ranges.append((day, day))
+    return ranges
+
+
+def _date_chunks(start_date: date, end_date: date, days: int) -> Iterator[tuple[date, date]]:
+    chunk_from = start_date
+    while chunk_from <= end_date:
+        chunk_to = min(chunk_from + timedelta(days=days - 1), end_date)
+        yield chunk_from, chunk_to
+        chunk_from = chunk_to + timedelta(days=1)
+
+
+class _WindowPlanner:
+    """Consecutive fetch windows of a period, sized from the record density seen so far.
+
+    Windows aim at ``target`` records (a few dozen pages) and never exceed
+    ``max_days``; the first one is ``max_days`` long and later ones shrink
+    or grow with the records per day the previous windows returned.
+    """
+
+    def __init__(self, start_date: date, end_date: date, max_days: int, target: int) -> None:
+        self.next_from = start_date
+        self.end_date = end_date
+        self.max_days = max_days
+        self.target = target
+        self.per_day: float | None = None
+
+    def next(self) -> tuple[date, date] | None:
+        if self.next_from > self.end_date:
+            return None
+        days = self.max_days
+        if self.per_day:
+            days = max(1, min(self.max_days, int(self.target / self.per_day)))
+        window = (self.next_from, min(self.next_from + timedelta(days=days - 1), self.end_date))
+        self.next_from = window[1] + timedelta(days=1)
+        return window
+
+    def observe(self, window: tuple[date, date], records: int) -> None:
+        self.per_day = records / ((window[1] - window[0]).days + 1)
+
+
+def _fetch_window(
+    client: YClientsClient,
+    branch_id: int,
+    window_from: date,
+    window_to: date,
+    progress_cb,
+    max_records: int,
+) -> list[dict]:
+    """Records of a date window; a window far denser than planned is split in halves.
+
+    Deep pages are the slow ones upstream, so when page 1 reports more than
+    ``max_records`` the window is fetched as two shorter ones instead (that page
+    is wasted, which is cheaper than paginating on).
+    """
+    first = client.get_records(
+        branch_id, start_date=window_from.isoformat(), end_date=window_to.isoformat(), page=1, count=50
+    )
+    total = int((first.get("meta") or {}).get("total_count") or 0)
+    if total > max_records and window_to > window_from:
+        middle = window_from + timedelta(days=(window_to - window_from).days // 2)
+        return _fetch_window(client, branch_id, window_from, middle, progress_cb, max_records) + _fetch_window(
+            client, branch_id, middle + timedelta(days=1), window_to, progress_cb, max_records
+        )
+    return _fetch_records_for_period(client, branch_id, window_from, window_to, progress_cb, first_page=first)
+
+
+def _iter_record_chunks(
+    client: YClientsClient,
+    branch_id: int,
+    start_date: date,
+    end_date: date,
+    run_id: str,
+    checkpoint: str | None = None,
+) -> Iterator[tuple[date, date, list[dict]]]:
+    """Raw records of the period in date windows, in order.
+
+    Window length adapts to the record density (``ETL_WINDOW_RECORDS`` per
+    window, at most ``ETL_CHUNK_DAYS`` days). Up to ``ETL_WINDOW_CONCURRENCY``
+    windows are fetched ahead in the background while the caller writes the
+    current one; the shared rate limiter paces them all.
+    """
+    planner = _WindowPlanner(start_date, end_date, settings.etl_chunk_days, settings.etl_window_records)
+
+    tracker = _tracker(run_id)
+
+    def fetch(chunk_from: date, chunk_to: date) -> list[dict]:
+        def progress_cb(bid, page, total):
+            # Page progress is persisted only when the tracker writes its own.
+            if tracker.page(bid, (chunk_from, chunk_to), page, total) and checkpoint:
+                _checkpoint_page(checkpoint, bid, (chunk_from, chunk_to), page, total)
+
+        return _fetch_window(client, branch_id, chunk_from, chunk_to, progress_cb, 2 * settings.etl_window_records)
+
+    workers = settings.etl_window_concurrency
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: deque[tuple[tuple[date, date], Future]] = deque()
+        try:
+            while True:
+                while len(pending) < workers and (window := planner.next()) is not None:
+                    pending.append((window, pool.submit(fetch, *window)))
+                if not pending:
+                    return
+                window, future = pending.popleft()
+                raw_records = future.result()
+                planner.observe(window, len(raw_records))
+                yield window[0], window[1], raw_records
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _stream_branch_period(
+    client: YClientsClient,
+    resolved: dict,
+    branch_id: int,
+    start_date: date,
+    end_date: date,
+    run_id: str,
+    stats: _RunStats,
+    checkpoint: tuple[str, date] | None = None,
+    latest: datetime | None = None,
+    carry: bool = False,
+) -> datetime | None:
+    """Load a branch period chunk by chunk: fetch, normalize, upsert raw, staff hours, group load.
+
+    Every chunk is committed on its own and dropped before the next one, so
+    memory stays flat however long the period is. Returns the newest change
+    time seen, for the caller to advance the watermark with. With
+    ``checkpoint`` (run type, period start) each committed chunk is
+    recorded in etl_checkpoints; a period starting after the period start
+    resumes one and picks up visits running into it from raw_records, as
+    does any period with ``carry``.
+    """
+    tracker = _tracker(run_id)
+    tracker.start_period(branch_id, start_date, end_date)
+    accumulator = OccupancyAccumulator(branch_id)
+    if carry or (checkpoint and start_date > checkpoint[1]):
+        accumulator.carry(_load_carry_records(branch_id, start_date))
+    run_type = checkpoint[0] if checkpoint else None
+    chunks = _iter_record_chunks(client, branch_id, start_date, end_date, run_id, run_type)
+    for chunk_from, chunk_to, raw_records in chunks:
+        latest = _latest_change(_change_values(raw_records), latest)
+        normalized = _normalize_records(branch_id, raw_records)
+        kept_ids = {rec["record_id"] for rec in normalized}
+        # raw_records must hold exactly the visits that count, or the next
+        # incremental run puts cancelled ones back: drop fetched visits that
+        # are cancelled, no-shows or deleted, and stored ones of the window
+        # the API no longer returns.
+        fetched_ids = {int(rec["id"]) for rec in raw_records if rec.get("id") is not None}
+        with _WRITE_LOCK:
+            gone = (fetched_ids | _window_record_ids(branch_id, chunk_from, chunk_to)) - kept_ids
+            _delete_raw_records(branch_id, sorted(gone))
+            _upsert_raw_records([_to_raw_row(r) for r in normalized])
+            staff_rows = accumulator.feed(normalized, chunk_from, chunk_to, final=chunk_to >= end_date)
+            stats.changes.add(_write_staff_hour_busy(branch_id, chunk_from, chunk_to, staff_rows))
+            stats.changes.add(_rebuild_group_hour_load(branch_id, resolved, chunk_from, chunk_to, staff_rows))
+            if checkpoint:
+                _save_checkpoint(run_type, branch_id, run_id, checkpoint[1], chunk_to, latest)
+        stats.sample()
+        tracker.window_done((chunk_from, chunk_to), len(raw_records))
+    return latest
+
+
+def _run_full_for_branch(
+    client: YClientsClient, resolved: dict, branch_id: int, run_id: str, stats: _RunStats | None = None
+) -> None:
+    """Load the branch's whole period, continuing an unfinished earlier full load if there is one."""
+    start_date, end_date = _branch_period(branch_id)
+    resume_from, latest = start_date, None
+    saved = _get_checkpoint("full_2025", branch_id)
+    if saved and saved["period_from"] == start_date.isoformat() and saved["committed_to"]:
+        resume_from = date.fromisoformat(saved["committed_to"]) + timedelta(days=1)
+        latest = _latest_change([saved["latest_change"]])
+        _tracker(run_id).update(force=True, stage="resume", branch_id=branch_id, resumed_from=resume_from.isoformat())
+    else:
+        _save_checkpoint("full_2025", branch_id, run_id, start_date, None, None)
+    latest = _stream_branch_period(
+        client,
+        resolved,
+        branch_id,
+        resume_from,
+        end_date,
+        run_id,
+        stats or _RunStats(),
+        checkpoint=("full_2025", start_date),
+        latest=latest,
+    )
+    _advance_watermark(branch_id, [], latest)
+    _store_group_hashes(branch_id, _branch_groups(resolved, branch_id) or [])
+    _clear_checkpoint("full_2025", branch_id)
 
-    raw_records = _fetch_records_for_period(client, branch_id, start_date, end_date, progress_cb)
+
+def _run_incremental_for_branch(
+    client: YClientsClient, resolved: dict, branch_id: int, run_id: str, stats: _RunStats
+) -> None:
+    watermark = _get_watermark(branch_id)
+    if not watermark:
+        # Nothing loaded yet for this branch: the first sync has to be a full one.
+        _run_full_for_branch(client, resolved, branch_id, run_id, stats)
+        return
+    start_date, end_date = _branch_period(branch_id)
+    changed_after = parse_datetime(watermark, settings.timezone) - WATERMARK_OVERLAP
+
+    tracker = _tracker(run_id)
+
+    def progress_cb(bid, page, total):
+        tracker.update(stage="changes", branch_id=bid, pages_done=page, pages_total=-(-int(total) // 50) if total else None)
+
+    raw_records = _fetch_records_for_period(
+        client,
+        branch_id,
+        start_date,
+        end_date,
+        progress_cb,
+        changed_after=changed_after.isoformat(),
+    )
+    if not raw_records:
+        return
     normalized = _normalize_records(branch_id, raw_records)
-    _upsert_raw_records([_to_raw_row(r) for r in normalized])
+    changed_ids = sorted({int(rec["id"]) for rec in raw_records if rec.get("id") is not None})
+
+    # Recompute the dates a changed record left as well as the ones it now occupies.
+    dates = _stored_record_dates(branch_id, changed_ids)
+    for rec in normalized:
+        dates |= _record_dates(rec["start_dt"], rec["end_dt"])
+
+    # Cancelled, no-show or deleted visits drop out of raw_records.
+    kept_ids = {rec["record_id"] for rec in normalized}
+    with _WRITE_LOCK:
+        _delete_raw_records(branch_id, [rid for rid in changed_ids if rid not in kept_ids])
+        _upsert_raw_records([_to_raw_row(r) for r in normalized])
+
+        for date_from, date_to in _date_ranges(d for d in dates if start_date <= d <= end_date):
+            # _load_raw_records starts a day early for overnight visits; the
+            # rows of that day are incomplete and must not overwrite stored ones.
+            low, high = date_from.isoformat(), date_to.isoformat()
+            staff_rows = [
+                row
+                for row in staff_hour_rows(branch_id, _load_raw_records(branch_id, date_from, date_to))
+                if low <= row[2] <= high
+            ]
+            stats.changes.add(_write_staff_hour_busy(branch_id, date_from, date_to, staff_rows))
+            stats.changes.add(_rebuild_group_hour_load(branch_id, resolved, date_from, date_to, staff_rows))
+        _advance_watermark(branch_id, raw_records)
+    stats.sample()
+
+
+def _reaggregate_branch(resolved: dict, branch_id: int, run_id: str, stats: _RunStats, force: bool) -> list[str]:
+    """Rebuild group_hour_load of the branch's groups whose membership changed; returns their ids."""
+    groups = _branch_groups(resolved, branch_id) or []
+    stored = _stored_group_hashes(branch_id)
+    changed = [g for g in groups if force or stored.get(g["group_id"]) != _group_hash(g)]
+    stale = _stale_group_ids(branch_id, {g["group_id"] for g in groups})
+    stats.changes.deleted += _delete_group_rows(branch_id, stale)
+    if changed:
+        group_ids = [g["group_id"] for g in changed]
+        staff_ids = sorted({int(x) for g in changed for x in g.get("staff_ids", [])})
+        start_date, end_date = _branch_period(branch_id)
+        tracker = _tracker(run_id)
+        tracker.start_period(branch_id, start_date, end_date)
+        for chunk_from, chunk_to in _date_chunks(start_date, end_date, settings.etl_chunk_days):
+            tracker.update(
+                stage="reaggregate",
+                branch_id=branch_id,
+                window_from=chunk_from.isoformat(),
+                window_to=chunk_to.isoformat(),
+            )
+            staff_rows = _load_staff_hour_rows(branch_id, chunk_from, chunk_to, staff_ids)
+            with _WRITE_LOCK:
+                stats.changes.add(
+                    _rebuild_group_hour_load(branch_id, resolved, chunk_from, chunk_to, staff_rows, group_ids)
+                )
+            stats.sample()
+            tracker.window_done((chunk_from, chunk_to), len(staff_rows))
+    if changed or stale or set(stored) != {g["group_id"] for g in groups}:
+        _store_group_hashes(branch_id, groups)
+    return [g["group_id"] for g in changed] + stale
 
-    _rebuild_staff_hour_busy(branch_id, start_date, end_date, normalized)
-    _rebuild_group_hour_load(branch_id, resolved, start_date, end_date)
+
+def run_reaggregate(branch_id: int | None = None, force: bool = False) -> str:
+    """Apply a group config change to group_hour_load from stored staff_hour_busy.
+
+    Staff names are resolved against the staff directory saved by the last
+    online resolve, so no YCLIENTS call is made. Only groups whose staff set
+    differs from the one recorded in group_config_hashes are recomputed
+    (every group with ``force``); removed groups lose their rows.
+    """
+    run_id = _start_run("reaggregate", branch_id=branch_id)
+    stats = _RunStats()
+    stats.sample()
+    try:
+        errors: dict[int, list[str]] = {}
+        resolved = resolve_staff_ids_offline(load_source_group_config(), load_group_config(), errors=errors)
+        branch_ids = [int(b["branch_id"]) for b in resolved.get("branches", [])]
+        if branch_id is not None:
+            if branch_id not in branch_ids:
+                raise RuntimeError(f"Unknown branch_id {branch_id}")
+            branch_ids = [branch_id]
+        save_group_config(resolved)
+        for bid, names in errors.items():
+            _update_run(run_id, error=f"{bid}: staff not found offline, run a full load to resolve: {', '.join(names)}")
+        rebuilt = []
+        for bid in branch_ids:
+            rebuilt += [f"{bid}/{gid}" for gid in _reaggregate_branch(resolved, bid, run_id, stats, force)]
+        _update_run(
+            run_id,
+            status="success",
+            progress="100%" + (f" ({', '.join(rebuilt)})" if rebuilt else " (no changes)"),
+            finished=True,
+            stats=stats,
+        )
+    except Exception as exc:  # noqa: BLE001
+        _update_run(run_id, status="failed", error=str(exc), finished=True, stats=stats)
+    return run_id
+
+
+def resume_interrupted(client: YClientsClient) -> list[str]:
+    """Continue the full loads of interrupted runs from their last committed window."""
+    with get_conn() as conn:
+        cur = conn.execute(
+            """
+            SELECT c.branch_id
+            FROM etl_checkpoints c
+            JOIN etl_runs r ON r.run_id = c.run_id
+            WHERE c.run_type = ? AND r.status = ?
+            ORDER BY c.branch_id
+            """,
+            ("full_2025", "interrupted"),
+        )
+        branch_ids = [int(row["branch_id"]) for row in cur.fetchall()]
+    return [run_full_2025(client, branch_id=bid) for bid in branch_ids]
+
+
+def _backoff_since(client: YClientsClient, start: float) -> float:
+    return client.retry_stats.backoff_seconds - start
+
+
+def _run_full_branch_job(client: YClientsClient, resolved: dict, branch_id: int, run_id: str) -> None:
+    # Branches share the process, so this is the process peak while the branch ran.
+    stats = _RunStats()
+    stats.sample()
+    try:
+        _run_full_for_branch(client, resolved, branch_id, run_id, stats)
+        _update_run(
+            run_id,
+            status="success",
+            progress="100%",
+            finished=True,
+            backoff_seconds=client.retry_stats.backoff_seconds,
+            stats=stats,
+        )
+    except Exception as exc:  # noqa: BLE001
+        _update_run(
+            run_id,
+            status="failed",
+            error=str(exc),
+            finished=True,
+            backoff_seconds=client.retry_stats.backoff_seconds,
+            stats=stats,
+        )
 
 
 def run_full_2025(client: YClientsClient, branch_id: int | None = None) -> str:
     config = load_group_config()
-    branches = config.get("branches", [])
+    branch_ids = [int(b["branch_id"]) for b in config.get("branches", [])]
     if branch_id is not None:
-        if not any(int(b["branch_id"]) == branch_id for b in branches):
+        if branch_id not in branch_ids:
             raise RuntimeError(f"Unknown branch_id {branch_id}")
-        run_id = _start_run("full_2025", branch_id=branch_id)
-        try:
-            resolved = resolve_staff_ids(config, client, branch_ids=[branch_id])
-            save_group_config(resolved)
-            _run_full_for_branch(client, resolved, branch_id, run_id)
-            _update_run(run_id, status="success", progress="100%", finished=True)
-        except Exception as exc:  # noqa: BLE001
-            _update_run(run_id, status="failed", error=str(exc), finished=True)
-        return run_id
+        branch_ids = [branch_id]
+    if not branch_ids:
+        return ""
+    run_ids = {bid: _start_run("full_2025", branch_id=bid) for bid in branch_ids}
 
-    last_run_id = ""
-    for branch in branches:
-        bid = int(branch["branch_id"])
-        run_id = _start_run("full_2025", branch_id=bid)
-        last_run_id = run_id
-        try:
-            config = resolve_staff_ids(config, client, branch_ids=[bid])
-            save_group_config(config)
-            _run_full_for_branch(client, config, bid, run_id)
-            _update_run(run_id, status="success", progress="100%", finished=True)
-        except Exception as exc:  # noqa: BLE001
+    # Staff names are resolved once for every branch and the resolved config
+    # written once, instead of per branch.
+    errors: dict[int, str] = {}
+    try:
+        resolved = resolve_staff_ids(config, client, branch_ids=branch_ids, errors=errors)
+        save_group_config(resolved)
+    except Exception as exc:  # noqa: BLE001
+        for run_id in run_ids.values():
             _update_run(run_id, status="failed", error=str(exc), finished=True)
-    return last_run_id
+        return run_ids[branch_ids[-1]]
+    for bid, error in errors.items():
+        _update_run(run_ids[bid], status="failed", error=error, finished=True)
+
+    # Branches run concurrently. Each gets its own client copy for per-branch
+    # backoff accounting; the HTTP pool and the rate limiter stay shared.
+    pending = [bid for bid in branch_ids if bid not in errors]
+    branch_clients = {bid: replace(client, retry_stats=RetryStats()) for bid in pending}
+    if pending:
+        workers = min(settings.etl_branch_concurrency, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_full_branch_job, branch_clients[bid], resolved, bid, run_ids[bid])
+                for bid in pending
+            ]
+            for future in futures:
+                future.result()
+    for branch_client in branch_clients.values():
+        stats = branch_client.retry_stats
+        client.retry_stats.add(
+            retries=stats.retries,
+            backoff=stats.backoff_seconds,
+            terminal=stats.terminal_failures,
+            exhausted=stats.exhausted,
+        )
+    return run_ids[branch_ids[-1]]
 
 
 def run_daily(client: YClientsClient, target_day: date | None = None) -> str:
     run_id = _start_run("daily")
+    backoff_start = client.retry_stats.backoff_seconds
+    stats = _RunStats()
+    stats.sample()
     try:
         config = load_group_config()
         resolved = resolve_staff_ids(config, client)
@@ -332,18 +1121,61 @@ def run_daily(client: YClientsClient, target_day: date | None = None) -> str:
             branch_id = int(branch["branch_id"])
             if settings.branch_start_date and target_day < settings.branch_start_date:
                 continue
+            # Visits of the day before that run past midnight come from raw_records.
+            _stream_branch_period(client, resolved, branch_id, target_day, target_day, run_id, stats, carry=True)
 
-            def progress_cb(bid, page, total):
-                _update_run(run_id, progress=f"{bid}: page {page}")
-
-            raw_records = _fetch_records_for_period(client, branch_id, target_day, target_day, progress_cb)
-            normalized = _normalize_records(branch_id, raw_records)
-            _upsert_raw_records([_to_raw_row(r) for r in normalized])
+        _update_run(
+            run_id,
+            status="success",
+            progress="100%",
+            finished=True,
+            backoff_seconds=_backoff_since(client, backoff_start),
+            stats=stats,
+        )
+    except Exception as exc:  # noqa: BLE001
+        _update_run(
+            run_id,
+            status="failed",
+            error=str(exc),
+            finished=True,
+            backoff_seconds=_backoff_since(client, backoff_start),
+            stats=stats,
+        )
+    return run_id
 
-            _rebuild_staff_hour_busy(branch_id, target_day, target_day, normalized)
-            _rebuild_group_hour_load(branch_id, resolved, target_day, target_day)
 
-        _update_run(run_id, status="success", progress="100%", finished=True)
+def run_incremental(client: YClientsClient, branch_id: int | None = None) -> str:
+    """Fetch records changed since each branch's watermark and rebuild only the dates they touch."""
+    run_id = _start_run("incremental", branch_id=branch_id)
+    backoff_start = client.retry_stats.backoff_seconds
+    stats = _RunStats()
+    stats.sample()
+    try:
+        config = load_group_config()
+        branch_ids = [int(b["branch_id"]) for b in config.get("branches", [])]
+        if branch_id is not None:
+            if branch_id not in branch_ids:
+                raise RuntimeError(f"Unknown branch_id {branch_id}")
+            branch_ids = [branch_id]
+        resolved = resolve_staff_ids(config, client, branch_ids=branch_ids)
+        save_group_config(resolved)
+        for bid in branch_ids:
+            _run_incremental_for_branch(client, resolved, bid, run_id, stats)
+        _update_run(
+            run_id,
+            status="success",
+            progress="100%",
+            finished=True,
+            backoff_seconds=_backoff_since(client, backoff_start),
+            stats=stats,
+        )
     except Exception as exc:  # noqa: BLE001
-        _update_run(run_id, status="failed", error=str(exc), finished=True)
+        _update_run(
+            run_id,
+            status="failed",
+            error=str(exc),
+            finished=True,
+            backoff_seconds=_backoff_since(client, backoff_start),
+            stats=stats,
+        )
     return run_id
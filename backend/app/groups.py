@@ -19,6 +19,13 @@ def _load_json(path: Path) -> dict:
     return data
 
 
+def load_source_group_config() -> dict:
+    """The hand-edited group config, falling back to the resolved one when it is missing."""
+    if settings.group_config_path.exists():
+        return _load_json(settings.group_config_path)
+    return load_group_config()
+
+
 def load_group_config() -> dict:
     if settings.group_resolved_path.exists():
         data = _load_json(settings.group_resolved_path)
@@ -78,7 +85,14 @@ def save_group_config(config: dict) -> None:
     )
 
 
-def resolve_staff_ids(config: dict, client: YClientsClient, branch_ids: list[int] | None = None) -> dict:
+def resolve_staff_ids(
+    config: dict,
+    client: YClientsClient,
+    branch_ids: list[int] | None = None,
+    errors: dict[int, str] | None = None,
+) -> dict:
+    """Fill ``staff_ids`` from staff names; with ``errors`` given, a branch whose
+    staff list cannot be loaded is recorded there instead of failing the rest."""
     resolved = deepcopy(config)
     log = logging.getLogger("groups")
     company_names = {}
@@ -99,7 +113,13 @@ def resolve_staff_ids(config: dict, client: YClientsClient, branch_ids: list[int
                 branch["display_name"] = company_names[branch_id]
         if branch_ids and branch_id not in branch_ids:
             continue
-        staff_resp = client.get_staff(branch_id)
+        try:
+            staff_resp = client.get_staff(branch_id)
+        except Exception as exc:  # noqa: BLE001
+            if errors is None:
+                raise
+            errors[branch_id] = str(exc)
+            continue
         staff_list = staff_resp.get("data") or []
         by_name = {}
         for staff in staff_list:
@@ -107,6 +127,8 @@ def resolve_staff_ids(config: dict, client: YClientsClient, branch_ids: list[int
             if not name:
                 continue
             by_name.setdefault(name, []).append(int(staff.get("id")))
+        # Kept in the resolved config so group edits can be resolved offline.
+        branch["staff_directory"] = by_name
         for group in branch.get("groups", []):
             staff_ids = []
             for staff_name in group.get("staff_names", []):
@@ -119,3 +141,42 @@ def resolve_staff_ids(config: dict, client: YClientsClient, branch_ids: list[int
                     log.warning("No staff matched name '%s' in branch %s", staff_name, branch_id)
             group["staff_ids"] = sorted(set(staff_ids))
     return resolved
+
+
+def resolve_staff_ids_offline(config: dict, resolved: dict, errors: dict[int, list[str]] | None = None) -> dict:
+    """Fill ``staff_ids`` like resolve_staff_ids, but from the ``staff_directory``
+    the last online resolve stored in ``resolved`` -- no API calls.
+
+    Names missing from the directory are listed per branch in ``errors`` and
+    left out of the group; the names that match keep their ids. Branches
+    resolved before the directory was stored have nothing to match against:
+    a group whose staff names changed keeps its previously resolved ids.
+    """
+    result = deepcopy(config)
+    log = logging.getLogger("groups")
+    previous = {int(b["branch_id"]): b for b in resolved.get("branches", [])}
+    for branch in result.get("branches", []):
+        branch_id = int(branch["branch_id"])
+        old_branch = previous.get(branch_id, {})
+        if old_branch.get("display_name") and _needs_display_name(branch):
+            branch["display_name"] = old_branch["display_name"]
+        directory = old_branch.get("staff_directory")
+        if directory is not None:
+            branch["staff_directory"] = directory
+        old_groups = {g["group_id"]: g for g in old_branch.get("groups", [])}
+        for group in branch.get("groups", []):
+            old_group = old_groups.get(group["group_id"], {})
+            names = [name.strip() for name in group.get("staff_names", [])]
+            if directory is None:
+                unchanged = names == [name.strip() for name in old_group.get("staff_names", [])]
+                unresolved = [] if unchanged else names
+                staff_ids = list(old_group.get("staff_ids", []))
+            else:
+                staff_ids = [directory[name][0] for name in names if directory.get(name)]
+                unresolved = [name for name in names if not directory.get(name)]
+            if unresolved:
+                log.warning("No staff matched names %s in branch %s", unresolved, branch_id)
+                if errors is not None:
+                    errors.setdefault(branch_id, []).extend(unresolved)
+            group["staff_ids"] = sorted(set(int(x) for x in staff_ids))
+    return result
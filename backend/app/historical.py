@@ -8,6 +8,8 @@ from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Iterable
 
+from src.shared.benchmark import BENCH_END_HOUR, BENCH_START_HOUR
+
 from .config import BASE_DIR, settings
 from .db import get_hist_conn, init_historical_db
 from .utils import week_start_monday, resource_sort_key
@@ -419,7 +421,7 @@ def month_payload(branch_id: int, month: str) -> dict[str, Any]:
         type_order = [r[0] for r in cur2.fetchall()]
 
     hours = sorted(h for h in {int(r["hour"]) for r in rows} if 8 <= h <= 23)
-    bench_hours = {h for h in hours if 10 <= h <= 21}
+    bench_hours = {h for h in hours if BENCH_START_HOUR <= h <= BENCH_END_HOUR}
     dates = sorted({r["date"] for r in rows})
     hour_index = {hour: idx for idx, hour in enumerate(hours)}
     date_index = {day: idx for idx, day in enumerate(dates)}
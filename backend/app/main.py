@@ -11,6 +11,7 @@ import logging
 import os
 import subprocess
 import time
+import threading
 from typing import Any
 
 from fastapi import BackgroundTasks, FastAPI, Form, HTTPException, Request, Body
@@ -19,11 +20,18 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 
+from src.shared.benchmark import BENCH_END_HOUR, BENCH_HOURS_PER_DAY, BENCH_START_HOUR
+from src.shared.db_async import executor_stats, shutdown_db_executors
+from src.shared.db_pool import maintenance_stats, pool_stats
+from src.shared.db_settings import db_settings
+
+from .api_log import api_log
 from .auth import authenticate, require_admin
 from .config import settings
-from .db import get_conn, get_hist_conn, init_db, init_historical_db, db_source_label, upsert_sql
-from .etl import run_full_2025, run_daily
+from .db import get_conn, get_hist_conn, init_db, init_historical_db, db_source_label, run_db, upsert_sql
+from .etl import mark_interrupted_runs, resume_interrupted, run_full_2025, run_daily, run_incremental, run_reaggregate
 from .groups import load_group_config, ensure_branch_names
+from .progress import get_tracker, live as live_progress
 from .historical import (
     list_branches as hist_list_branches,
     list_months as hist_list_months,
@@ -35,7 +43,10 @@ from .historical import (
 )
 from .scheduler import start_scheduler, stop_scheduler
 from .utils import daterange, week_start_monday, resource_sort_key, parse_datetime
-from .yclients import build_client
+from .rate_limit import limiter_stats
+from .response_cache import cache_stats, get_response_cache
+from .retry import retry_stats
+from .yclients import build_client, coalescing_stats, http_pool_stats
 from src.features.cuteam.api import router as cuteam_api
 from src.features.cuteam import admin_service as cuteam_admin
 from src.features.cuteam.views import router as cuteam_views
@@ -83,10 +94,25 @@ templates = Jinja2Templates(directory=str(BASE_DIR / "app" / "templates"))
 app.include_router(cuteam_api)
 app.include_router(cuteam_views)
 
+def _resume_interrupted_runs() -> None:
+    try:
+        run_ids = resume_interrupted(build_client())
+    except Exception:  # noqa: BLE001
+        logging.getLogger("etl").exception("Failed to resume interrupted ETL runs")
+        return
+    if run_ids:
+        logging.getLogger("etl").info("Resumed %s interrupted full loads", len(run_ids))
+
+
 @app.on_event("startup")
 def on_startup():
     init_db()
     init_historical_db()
+    interrupted = mark_interrupted_runs()
+    if interrupted:
+        logging.getLogger("etl").warning("Marked %s unfinished ETL runs as interrupted", len(interrupted))
+        if settings.etl_resume_on_start:
+            threading.Thread(target=_resume_interrupted_runs, name="etl-resume", daemon=True).start()
     if settings.enable_scheduler:
         start_scheduler()
     else:
@@ -95,6 +121,8 @@ def on_startup():
 @app.on_event("shutdown")
 def on_shutdown():
     stop_scheduler()
+    shutdown_db_executors()
+    api_log.flush()
 
 def _get_group(branch_id: int, group_id: str) -> dict:
     config = load_group_config()
@@ -114,6 +142,36 @@ def _branch_start_date(branch_id: int) -> date | None:
     return settings.branch_start_date
 
 
+def _load_column(metric: str | None) -> str:
+    """load_pct expression for the requested metric.
+
+    ``hours`` (default) counts a staff member busy for any visit touching the
+    hour; ``minutes`` weights by busy minutes. Rows loaded before minutes were
+    tracked fall back to the hour metric.
+    """
+    if (metric or "hours").lower() == "minutes":
+        return "COALESCE(load_pct_minutes, load_pct)"
+    return "load_pct"
+
+
+def _group_day_staff(conn, branch_id: int, group_id: str, date_from: str, date_to: str) -> dict[str, int]:
+    """Staff total per loaded date of a group.
+
+    A date is listed once the ETL has computed it, even if no hour of it is
+    stored in group_hour_load (sparse mode keeps only busy hours); its
+    missing hours are zero-load cells.
+    """
+    cur = conn.execute(
+        """
+        SELECT date, staff_total
+        FROM group_day_staff
+        WHERE branch_id = ? AND group_id = ? AND date BETWEEN ? AND ?
+        """,
+        (branch_id, group_id, date_from, date_to),
+    )
+    return {row["date"]: int(row["staff_total"]) for row in cur.fetchall()}
+
+
 def _require_session(request: Request) -> None:
     if not request.session.get("user"):
         raise HTTPException(status_code=401, detail="РќРµ Р°РІС‚РѕСЂРёР·РѕРІР°РЅ")
@@ -1164,17 +1222,51 @@ def api_cuteam_import_plans_checks(request: Request, background: BackgroundTasks
     return {"status": "started"}
 
 
+@app.get("/api/admin/yclients/stats")
+def api_yclients_stats(request: Request):
+    """Counters of the shared YCLIENTS HTTP client."""
+    require_admin(request)
+    return {
+        "http_pool": http_pool_stats(),
+        "rate_limiters": limiter_stats(),
+        "retries": retry_stats(),
+        "cache": cache_stats(),
+        "coalescing": coalescing_stats(),
+        "debug_log": api_log.stats(),
+    }
+
+
+@app.get("/api/admin/db/stats")
+def api_db_stats(request: Request):
+    """Counters of the database connection pools (app, historical, cuteam, heatmap) and the async DB executors."""
+    require_admin(request)
+    return {
+        "source": db_source_label(),
+        "sqlite_profile": db_settings.sqlite_profile,
+        "pools": pool_stats(),
+        "async_executors": executor_stats(),
+        "sqlite_maintenance": maintenance_stats(),
+    }
+
+
+@app.delete("/api/admin/yclients/cache")
+def api_purge_yclients_cache(request: Request, endpoint: str | None = None):
+    """Drop cached YCLIENTS responses (all, or one endpoint: companies, company, staff, storages)."""
+    require_admin(request)
+    cache = get_response_cache()
+    if cache is None:
+        return {"status": "disabled", "deleted": 0}
+    return {"status": "cleared", "deleted": cache.purge(endpoint or None)}
+
+
 @app.get("/api/admin/yclients-debug-log")
 def api_yclients_debug_log(request: Request, lines: int = 50):
-    """Get last N lines from YCLIENTS API debug log."""
+    """Get last N lines from YCLIENTS API debug log (live file plus rotated archives)."""
     require_admin(request)
-    log_path = settings.data_dir / "yclients_api_debug.log"
-    if not log_path.exists():
+    if not api_log.files():
         return {"lines": [], "message": "Log file not found. No API calls logged yet."}
     try:
-        with log_path.open("r", encoding="utf-8") as f:
-            all_lines = f.readlines()
-        last_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+        last_lines = api_log.tail(lines)
         entries = []
         for line in last_lines:
             line = line.strip()
@@ -1183,7 +1275,7 @@ def api_yclients_debug_log(request: Request, lines: int = 50):
                     entries.append(json.loads(line))
                 except json.JSONDecodeError:
                     entries.append({"raw": line})
-        return {"lines": entries, "total": len(all_lines)}
+        return {"lines": entries, "total": len(entries), "log": api_log.stats()}
     except Exception as exc:  # noqa: BLE001
         return {"error": str(exc)}
 
@@ -1192,9 +1284,7 @@ def api_yclients_debug_log(request: Request, lines: int = 50):
 def api_clear_yclients_debug_log(request: Request):
     """Clear YCLIENTS API debug log."""
     require_admin(request)
-    log_path = settings.data_dir / "yclients_api_debug.log"
-    if log_path.exists():
-        log_path.unlink()
+    api_log.clear()
     return {"status": "cleared"}
 
 
@@ -1233,7 +1323,7 @@ def api_weeks(month: str, request: Request):
     return {"weeks": weeks}
 
 @app.get("/api/heatmap")
-def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request):
+def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request, metric: str = "hours"):
     if not request.session.get("user"):
         raise HTTPException(status_code=401, detail="Не авторизован")
     try:
@@ -1255,8 +1345,8 @@ def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request
 
     with get_conn() as conn:
         cur = conn.execute(
-            """
-            SELECT date, hour, load_pct, busy_count, staff_total
+            f"""
+            SELECT date, hour, {_load_column(metric)} AS load_pct, busy_count, staff_total
             FROM group_hour_load
             WHERE branch_id = ? AND group_id = ? AND date BETWEEN ? AND ? AND hour BETWEEN 8 AND 23
             """,
@@ -1264,6 +1354,7 @@ def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request
         )
         rows = cur.fetchall()
         by_day_hour = {(r["date"], int(r["hour"])): r for r in rows}
+        day_staff = _group_day_staff(conn, branch_id, group_id, effective_start.isoformat(), week_end.isoformat())
 
     for day in daterange(effective_start, week_end):
         day_str = day.isoformat()
@@ -1279,7 +1370,7 @@ def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request
                     }
                 )
             else:
-                cells.append({"load_pct": 0, "busy_count": 0, "staff_total": len(staff_ids)})
+                cells.append({"load_pct": 0, "busy_count": 0, "staff_total": day_staff.get(day_str, len(staff_ids))})
         days.append(
             {
                 "date": day_str,
@@ -1290,10 +1381,7 @@ def api_heatmap(branch_id: int, group_id: str, week_start: str, request: Request
 
     return {"week_start": week_start_date.isoformat(), "hours": hours, "days": days}
 
-@app.get("/api/heatmap/month")
-def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Request):
-    if not request.session.get("user"):
-        raise HTTPException(status_code=401, detail="Не авторизован")
+def _heatmap_month_payload(branch_id: int, group_id: str, month: str, metric: str = "hours") -> dict:
     try:
         year, mon = month.split("-")
         year = int(year)
@@ -1312,12 +1400,12 @@ def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Reques
     group = _get_group(branch_id, group_id)
     staff_ids = [int(x) for x in group.get("staff_ids", [])]
     hours = list(range(8, 24))
-    bench_hours = {h for h in hours if 10 <= h <= 21}
+    bench_hours = {h for h in hours if BENCH_START_HOUR <= h <= BENCH_END_HOUR}
 
     with get_conn() as conn:
         cur = conn.execute(
-            """
-            SELECT date, hour, load_pct, busy_count, staff_total
+            f"""
+            SELECT date, hour, {_load_column(metric)} AS load_pct, busy_count, staff_total
             FROM group_hour_load
             WHERE branch_id = ? AND group_id = ? AND date BETWEEN ? AND ? AND hour BETWEEN 8 AND 23
             """,
@@ -1325,6 +1413,7 @@ def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Reques
         )
         rows = cur.fetchall()
         by_day_hour = {(r["date"], int(r["hour"])): r for r in rows}
+        day_staff = _group_day_staff(conn, branch_id, group_id, effective_start.isoformat(), last_day.isoformat())
 
     days_map = {}
     all_vals = []
@@ -1344,7 +1433,7 @@ def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Reques
                     }
                 )
             else:
-                cells.append({"load_pct": 0.0, "busy_count": 0, "staff_total": len(staff_ids)})
+                cells.append({"load_pct": 0.0, "busy_count": 0, "staff_total": day_staff.get(day_str, len(staff_ids))})
             if hour in bench_hours:
                 bench_vals.append(cells[-1]["load_pct"])
         all_vals.extend(bench_vals)
@@ -1386,6 +1475,14 @@ def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Reques
     month_avg = round(sum(all_vals) / len(all_vals), 2) if all_vals else 0.0
     return {"month": month, "hours": hours, "weeks": weeks, "month_avg": month_avg}
 
+
+@app.get("/api/heatmap/month")
+async def api_heatmap_month(branch_id: int, group_id: str, month: str, request: Request, metric: str = "hours"):
+    if not request.session.get("user"):
+        raise HTTPException(status_code=401, detail="Не авторизован")
+    return await run_db(_heatmap_month_payload, branch_id, group_id, month, metric)
+
+
 @app.get("/api/heatmap/status")
 def api_heatmap_status(branch_id: int, month: str, request: Request):
     if not request.session.get("user"):
@@ -1425,11 +1522,13 @@ def api_heatmap_status(branch_id: int, month: str, request: Request):
     indexed_groups.sort(key=lambda item: resource_sort_key(item[1].get("name"), item[0]))
     groups = [item[1] for item in indexed_groups]
     with get_conn() as conn:
+        # Loaded cells of the displayed hours (8-23), whether or not zero-load
+        # hours are stored as rows.
         cur = conn.execute(
             """
-            SELECT group_id, COUNT(*) as cnt
-            FROM group_hour_load
-            WHERE branch_id = ? AND date BETWEEN ? AND ? AND hour BETWEEN 8 AND 23
+            SELECT group_id, COUNT(*) * 16 as cnt
+            FROM group_day_staff
+            WHERE branch_id = ? AND date BETWEEN ? AND ?
             GROUP BY group_id
             """,
             (branch_id, effective_start.isoformat(), last_day.isoformat()),
@@ -1505,14 +1604,7 @@ def _map_historical_resource(resource_type: str, branch_name: str | None) -> str
     return HISTORICAL_RESOURCE_MAP.get(key)
 
 
-@app.get("/api/heatmap/summary")
-def api_heatmap_summary(
-    request: Request,
-    start_year: int = 2024,
-    end_year: int | None = None,
-):
-    if not request.session.get("user"):
-        raise HTTPException(status_code=401, detail="Не авторизован")
+def _heatmap_summary_payload(start_year: int = 2024, end_year: int | None = None, metric: str = "hours") -> dict:
     if end_year is None:
         end_year = datetime.now(ZoneInfo(settings.timezone)).year
     if start_year > end_year:
@@ -1545,10 +1637,10 @@ def api_heatmap_summary(
                 """
                 SELECT branch_id, month, resource_type, AVG(load_pct) AS avg_load
                 FROM historical_loads
-                WHERE month BETWEEN ? AND ? AND hour BETWEEN 10 AND 21
+                WHERE month BETWEEN ? AND ? AND hour BETWEEN ? AND ?
                 GROUP BY branch_id, month, resource_type
                 """,
-                (start_ym, hist_end_ym),
+                (start_ym, hist_end_ym, BENCH_START_HOUR, BENCH_END_HOUR),
             )
             for row in cur.fetchall():
                 try:
@@ -1575,22 +1667,40 @@ def api_heatmap_summary(
                 effective_start = branch_start
             values_by_group: dict[str, dict[str, float]] = {}
             if effective_start <= end_date:
+                # Averages over every loaded benchmark hour: the number of
+                # cells comes from group_day_staff, so hours not stored as
+                # rows (sparse mode) count as zero load.
                 cur = conn.execute(
                     """
-                    SELECT group_id, substr(date, 1, 7) AS ym, AVG(load_pct) AS avg_load
-                    FROM group_hour_load
-                    WHERE branch_id = ? AND date BETWEEN ? AND ? AND hour BETWEEN 10 AND 21
+                    SELECT group_id, substr(date, 1, 7) AS ym, COUNT(*) AS days
+                    FROM group_day_staff
+                    WHERE branch_id = ? AND date BETWEEN ? AND ?
                     GROUP BY group_id, ym
                     """,
                     (branch_id, effective_start.isoformat(), end_date.isoformat()),
                 )
-                for row in cur.fetchall():
-                    group_id = str(row["group_id"])
-                    ym = row["ym"]
-                    avg = row["avg_load"]
-                    if avg is None:
+                cells_by_group = {
+                    (str(row["group_id"]), row["ym"]): int(row["days"]) * BENCH_HOURS_PER_DAY for row in cur.fetchall()
+                }
+                cur = conn.execute(
+                    f"""
+                    SELECT group_id, substr(date, 1, 7) AS ym, SUM({_load_column(metric)}) AS load_sum, COUNT(*) AS cells
+                    FROM group_hour_load
+                    WHERE branch_id = ? AND date BETWEEN ? AND ? AND hour BETWEEN ? AND ?
+                    GROUP BY group_id, ym
+                    """,
+                    (branch_id, effective_start.isoformat(), end_date.isoformat(), BENCH_START_HOUR, BENCH_END_HOUR),
+                )
+                sums_by_group = {
+                    (str(row["group_id"]), row["ym"]): (row["load_sum"], int(row["cells"])) for row in cur.fetchall()
+                }
+                for key in set(cells_by_group) | set(sums_by_group):
+                    load_sum, cells = sums_by_group.get(key, (0.0, 0))
+                    if load_sum is None:
                         continue
-                    values_by_group.setdefault(group_id, {})[ym] = round(float(avg), 2)
+                    cells = max(cells, cells_by_group.get(key, 0))
+                    group_id, ym = key
+                    values_by_group.setdefault(group_id, {})[ym] = round(float(load_sum) / cells, 2)
             groups = branch.get("groups", [])
             display_name = branch.get("display_name") or str(branch_id)
             group_id_by_name = {
@@ -1644,10 +1754,20 @@ def api_heatmap_summary(
     branches_out.sort(key=branch_sort_key)
     return {"years": years, "months": months, "branches": branches_out}
 
-@app.get("/api/summary/month")
-def api_summary(branch_id: int, group_id: str, month: str, request: Request):
+
+@app.get("/api/heatmap/summary")
+async def api_heatmap_summary(
+    request: Request,
+    start_year: int = 2024,
+    end_year: int | None = None,
+    metric: str = "hours",
+):
     if not request.session.get("user"):
         raise HTTPException(status_code=401, detail="Не авторизован")
+    return await run_db(_heatmap_summary_payload, start_year, end_year, metric)
+
+
+def _summary_month_payload(branch_id: int, group_id: str, month: str, metric: str = "hours") -> dict:
     try:
         year, mon = month.split("-")
         year = int(year)
@@ -1659,18 +1779,23 @@ def api_summary(branch_id: int, group_id: str, month: str, request: Request):
 
     with get_conn() as conn:
         cur = conn.execute(
-            """
-            SELECT date, hour, load_pct
+            f"""
+            SELECT date, hour, {_load_column(metric)} AS load_pct
             FROM group_hour_load
             WHERE branch_id = ? AND group_id = ? AND date BETWEEN ? AND ? AND in_benchmark = 1
             """,
             (branch_id, group_id, first.isoformat(), last_day.isoformat()),
         )
         rows = cur.fetchall()
+        day_staff = _group_day_staff(conn, branch_id, group_id, first.isoformat(), last_day.isoformat())
 
     by_date = {}
     for r in rows:
         by_date.setdefault(r["date"], []).append(float(r["load_pct"]))
+    # Loaded dates count their unstored (zero) benchmark hours too.
+    for day_str in day_staff:
+        vals = by_date.setdefault(day_str, [])
+        vals.extend([0.0] * (BENCH_HOURS_PER_DAY - len(vals)))
 
     avg_day = []
     for day in daterange(first, last_day):
@@ -1701,6 +1826,14 @@ def api_summary(branch_id: int, group_id: str, month: str, request: Request):
 
     return {"avg_day": avg_day, "avg_week": avg_week, "avg_month": avg_month}
 
+
+@app.get("/api/summary/month")
+async def api_summary(branch_id: int, group_id: str, month: str, request: Request, metric: str = "hours"):
+    if not request.session.get("user"):
+        raise HTTPException(status_code=401, detail="Не авторизован")
+    return await run_db(_summary_month_payload, branch_id, group_id, month, metric)
+
+
 @app.post("/api/admin/etl/full_2025/start")
 def api_start_full(request: Request, background: BackgroundTasks, payload: dict = Body(default={})):
     require_admin(request)
@@ -1721,17 +1854,57 @@ def api_start_daily(request: Request, background: BackgroundTasks):
     background.add_task(run_daily, client, None)
     return {"status": "started"}
 
+
+@app.post("/api/admin/etl/incremental/start")
+def api_start_incremental(request: Request, background: BackgroundTasks, payload: dict = Body(default={})):
+    require_admin(request)
+    branch_id = _to_int(payload.get("branch_id"))
+    if branch_id is not None:
+        config = load_group_config()
+        if not any(int(b["branch_id"]) == branch_id for b in config.get("branches", [])):
+            raise HTTPException(status_code=400, detail="Unknown branch_id")
+    client = build_client()
+    background.add_task(run_incremental, client, branch_id)
+    return {"status": "started", "branch_id": branch_id}
+
+
+@app.post("/api/admin/etl/reaggregate/start")
+def api_start_reaggregate(request: Request, background: BackgroundTasks, payload: dict = Body(default={})):
+    require_admin(request)
+    branch_id = _to_int(payload.get("branch_id"))
+    if branch_id is not None:
+        config = load_group_config()
+        if not any(int(b["branch_id"]) == branch_id for b in config.get("branches", [])):
+            raise HTTPException(status_code=400, detail="Unknown branch_id")
+    background.add_task(run_reaggregate, branch_id, bool(payload.get("force")))
+    return {"status": "started", "branch_id": branch_id}
+
 @app.get("/api/admin/etl/status")
 def api_status(request: Request):
     require_admin(request)
     with get_conn() as conn:
         cur = conn.execute(
-            "SELECT run_id, run_type, branch_id, started_at, finished_at, status, progress, error_log FROM etl_runs ORDER BY started_at DESC LIMIT 1"
+            "SELECT run_id, run_type, branch_id, started_at, finished_at, status, progress, progress_json, error_log, backoff_seconds, peak_rss_mb, rows_inserted, rows_updated, rows_deleted FROM etl_runs ORDER BY started_at DESC LIMIT 1"
         )
         row = cur.fetchone()
     if not row:
         return {"status": "none"}
-    return dict(row)
+    data = dict(row)
+    # A run of this process is read from memory; etl_runs lags by up to ETL_PROGRESS_SECONDS.
+    tracker = get_tracker(data["run_id"])
+    if tracker is not None:
+        data["progress_detail"] = tracker.snapshot()
+        data["progress"] = tracker.label(data["progress_detail"])
+    else:
+        data["progress_detail"] = json.loads(data["progress_json"]) if data["progress_json"] else None
+    data.pop("progress_json")
+    return data
+
+
+@app.get("/api/admin/etl/progress")
+def api_etl_progress(request: Request):
+    require_admin(request)
+    return {"runs": live_progress()}
 
 
 @app.get("/api/admin/etl/full/last")
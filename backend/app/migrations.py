@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+# Arbitrary key of the Postgres advisory lock that serializes migrating processes.
+_PG_LOCK_KEY = 7_311_024
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Any], None]
+
+
+def applied_versions(conn: Any) -> set[int]:
+    cur = conn.execute("SELECT version FROM schema_migrations")
+    return {int(row["version"]) for row in cur.fetchall()}
+
+
+def migrate(conn: Any, migrations: Sequence[Migration], postgres: bool = False) -> list[int]:
+    """Apply the ``migrations`` not yet recorded in ``schema_migrations``, in version order.
+
+    Each migration commits together with its version row. Whether it is
+    pending is checked under a lock held to that commit (a Postgres advisory
+    lock, the SQLite write lock), so processes starting at once apply every
+    migration exactly once. Returns the applied versions.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        );
+        """
+    )
+    conn.commit()
+    done = applied_versions(conn)
+    applied: list[int] = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        if postgres:
+            conn.execute("SELECT pg_advisory_xact_lock(?)", (_PG_LOCK_KEY,))
+        else:
+            conn.execute("BEGIN IMMEDIATE")
+        if migration.version in applied_versions(conn):
+            conn.commit()
+            continue
+        migration.apply(conn)
+        conn.execute(
+            "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+            (migration.version, migration.name, datetime.utcnow().isoformat()),
+        )
+        conn.commit()
+        applied.append(migration.version)
+    return applied
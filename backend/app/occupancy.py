@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from operator import attrgetter, itemgetter
+from typing import Iterable
+
+try:
+    import numpy as np
+except Exception:  # noqa: BLE001
+    np = None
+
+from src.shared.benchmark import BENCH_END_HOUR, BENCH_START_HOUR
+
+
+# Visits are expanded in local wall time, exactly like iter_hours: an hour
+# slot is busy when it starts before the visit ends and does not end before
+# the visit's start hour. Integer microseconds keep the bounds exact.
+_EPOCH_DATE = date(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH_DATE.toordinal()
+_HOUR_US = 3600 * 1_000_000
+
+
+def iter_hours(start_dt: datetime, end_dt: datetime) -> Iterable[datetime]:
+    current = start_dt.replace(minute=0, second=0, microsecond=0)
+    while current < end_dt:
+        yield current
+        current += timedelta(hours=1)
+
+
+def hour_flags(hour: int) -> tuple[int, int]:
+    """(in_benchmark, in_gray) for an hour of the day."""
+    in_benchmark = 1 if BENCH_START_HOUR <= hour <= BENCH_END_HOUR else 0
+    in_gray = 1 - in_benchmark
+    return in_benchmark, in_gray
+
+
+def _wall_us_array(values: list[datetime]):
+    """Local wall-clock microseconds since the epoch for a list of datetimes.
+
+    Built from the datetime fields directly, one C-level pass per field, so no
+    time zone arithmetic is done per value.
+    """
+    n = len(values)
+
+    def field(name: str):
+        return np.fromiter(map(attrgetter(name), values), dtype=np.int64, count=n)
+
+    days = np.fromiter((value.toordinal() for value in values), dtype=np.int64, count=n) - _EPOCH_ORDINAL
+    seconds = days * 86400 + field("hour") * 3600 + field("minute") * 60 + field("second")
+    return seconds * 1_000_000 + field("microsecond")
+
+
+def _visit_arrays(records: list[dict]):
+    n = len(records)
+    staff = np.fromiter((rec["staff_id"] for rec in records), dtype=np.int64, count=n)
+    start = _wall_us_array([rec["start_dt"] for rec in records])
+    end = _wall_us_array([rec["end_dt"] for rec in records])
+    return staff, start, end
+
+
+def _expand_hours(start, end):
+    """(interval index, absolute hour) for every hour slot each interval touches."""
+    first = start // _HOUR_US
+    last = -((-end) // _HOUR_US)  # exclusive: hours h with h * 3600 < end
+    counts = np.maximum(last - first, 0)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(start)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, first[owner] + offsets
+
+
+def merge_intervals(staff, start, end):
+    """Sweep-line union of each staff member's intervals, O(n log n).
+
+    Intervals are sorted by (staff, start); a running maximum of the end
+    within each staff run tells whether the next interval starts a new
+    disjoint segment. Returns (staff, start, end) of the merged segments.
+    """
+    if not len(staff):
+        return staff, start, end
+    order = np.lexsort((start, staff))
+    staff, start, end = staff[order], start[order], end[order]
+    new_staff = np.empty(len(staff), dtype=bool)
+    new_staff[0] = True
+    new_staff[1:] = staff[1:] != staff[:-1]
+    run = np.cumsum(new_staff) - 1
+    # Offsetting every staff run above the previous one keeps the running
+    # maximum from leaking across runs.
+    low = int(end.min())
+    stride = int(end.max()) - low + 1
+    reach = np.maximum.accumulate(run * stride + (end - low)) - run * stride + low
+    opens = new_staff.copy()
+    opens[1:] |= start[1:] > reach[:-1]
+    heads = np.flatnonzero(opens)
+    tails = np.append(heads[1:] - 1, len(staff) - 1)
+    return staff[heads], start[heads], reach[tails]
+
+
+def _pack(staff_codes, hours, base: int, span: int):
+    return staff_codes.astype(np.int64) * span + (hours - base)
+
+
+def occupancy(records: list[dict]):
+    """Busy staff-hours with minute-accurate busy time.
+
+    Returns four arrays: staff_id, day (days since 1970-01-01, local wall
+    time), hour and busy minutes. The slots are the ones iter_hours marks;
+    minutes come from the merged intervals, so overlapping visits of one
+    staff member are not counted twice.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    empty = np.empty(0, dtype=np.int64)
+    if not records:
+        return empty, empty, empty, np.empty(0, dtype=np.float64)
+    staff, start, end = _visit_arrays(records)
+    owner, hours_abs = _expand_hours(start, end)
+    if not len(hours_abs):
+        return empty, empty, empty, np.empty(0, dtype=np.float64)
+    staff_values, staff_codes = np.unique(staff, return_inverse=True)
+    base = int(hours_abs.min())
+    span = int(hours_abs.max()) - base + 1
+    keys = np.unique(_pack(staff_codes[owner], hours_abs, base, span))
+
+    seg_codes, seg_start, seg_end = merge_intervals(staff_codes.astype(np.int64), start, end)
+    seg_owner, seg_hours = _expand_hours(seg_start, seg_end)
+    overlap = np.minimum(seg_end[seg_owner], (seg_hours + 1) * _HOUR_US) - np.maximum(
+        seg_start[seg_owner], seg_hours * _HOUR_US
+    )
+    minute_keys, slot = np.unique(_pack(seg_codes[seg_owner], seg_hours, base, span), return_inverse=True)
+    minutes = np.zeros(len(keys), dtype=np.float64)
+    minutes[np.searchsorted(keys, minute_keys)] = np.bincount(slot, weights=np.maximum(overlap, 0)) / 60e6
+
+    hours_abs = keys % span + base
+    return staff_values[keys // span], hours_abs // 24, hours_abs % 24, minutes
+
+
+def busy_hours(records: list[dict]):
+    """Unique busy (staff_id, day, hour) slots as three int64 arrays."""
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+    empty = np.empty(0, dtype=np.int64)
+    if not records:
+        return empty, empty, empty
+    staff, start, end = _visit_arrays(records)
+    owner, hours_abs = _expand_hours(start, end)
+    if not len(hours_abs):
+        return empty, empty, empty
+    staff_values, staff_codes = np.unique(staff[owner], return_inverse=True)
+    base = int(hours_abs.min())
+    span = int(hours_abs.max()) - base + 1
+    keys = np.unique(_pack(staff_codes, hours_abs, base, span))
+    hours_abs = keys % span + base
+    return staff_values[keys // span], hours_abs // 24, hours_abs % 24
+
+
+def day_bitmaps(records: list[dict]):
+    """Per (staff_id, day) 24-bit busy masks: bit ``h`` is set when hour ``h`` is busy."""
+    staff, days, hours = busy_hours(records)
+    if not len(staff):
+        return staff, days, np.empty(0, dtype=np.uint32)
+    day_base = int(days.min())
+    day_span = int(days.max()) - day_base + 1
+    pair_keys, inverse = np.unique(staff * day_span + (days - day_base), return_inverse=True)
+    masks = np.zeros(len(pair_keys), dtype=np.uint32)
+    np.bitwise_or.at(masks, inverse, np.left_shift(np.uint32(1), hours.astype(np.uint32)))
+    return pair_keys // day_span, pair_keys % day_span + day_base, masks
+
+
+def day_label(day: int) -> str:
+    return (_EPOCH_DATE + timedelta(days=int(day))).isoformat()
+
+
+def day_number(value: date) -> int:
+    return (value - _EPOCH_DATE).days
+
+
+def _merged_minutes_py(records: list[dict]) -> dict[tuple, float]:
+    """Busy minutes per (staff_id, date, hour) from each staff member's merged intervals."""
+    by_staff: dict[int, list[tuple[datetime, datetime]]] = {}
+    for rec in records:
+        by_staff.setdefault(rec["staff_id"], []).append((rec["start_dt"], rec["end_dt"]))
+    minutes: dict[tuple, float] = {}
+    for staff_id, intervals in by_staff.items():
+        intervals.sort()
+        merged: list[list[datetime]] = []
+        for start_dt, end_dt in intervals:
+            if merged and start_dt <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end_dt)
+            else:
+                merged.append([start_dt, end_dt])
+        for start_dt, end_dt in merged:
+            for hour_dt in iter_hours(start_dt, end_dt):
+                lo = max(start_dt, hour_dt)
+                hi = min(end_dt, hour_dt + timedelta(hours=1))
+                key = (staff_id, hour_dt.date().isoformat(), hour_dt.hour)
+                minutes[key] = minutes.get(key, 0.0) + max((hi - lo).total_seconds(), 0) / 60
+    return minutes
+
+
+def _staff_hour_rows_py(branch_id: int, records: list[dict]) -> list[tuple]:
+    minutes = _merged_minutes_py(records)
+    rows = {}
+    for rec in records:
+        staff_id = rec["staff_id"]
+        for hour_dt in iter_hours(rec["start_dt"], rec["end_dt"]):
+            day = hour_dt.date().isoformat()
+            hour = hour_dt.hour
+            in_benchmark, in_gray = hour_flags(hour)
+            busy = round(minutes.get((staff_id, day, hour), 0.0), 2)
+            rows[(branch_id, staff_id, day, hour)] = (branch_id, staff_id, day, hour, 1, in_benchmark, in_gray, busy)
+    return list(rows.values())
+
+
+def staff_hour_rows(branch_id: int, records: list[dict]) -> list[tuple]:
+    """staff_hour_busy rows ``(branch_id, staff_id, date, hour, 1, in_benchmark, in_gray, busy_minutes)``."""
+    if np is None:
+        return _staff_hour_rows_py(branch_id, records)
+    staff, days, hours, minutes = occupancy(records)
+    if not len(staff):
+        return []
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    labels = np.array([day_label(day) for day in unique_days], dtype=object)
+    in_benchmark = ((hours >= BENCH_START_HOUR) & (hours <= BENCH_END_HOUR)).astype(np.int8)
+    count = len(staff)
+    return list(
+        zip(
+            [branch_id] * count,
+            staff.tolist(),
+            labels[day_index].tolist(),
+            hours.tolist(),
+            [1] * count,
+            in_benchmark.tolist(),
+            (1 - in_benchmark).tolist(),
+            np.round(minutes, 2).tolist(),
+        )
+    )
+
+
+class OccupancyAccumulator:
+    """staff_hour_busy rows for consecutive date chunks of one branch.
+
+    Visits running past the end of a chunk are carried into the next one, so
+    the busy minutes of a date always see every visit that touches it. Each
+    ``feed`` returns the rows of the chunk's own dates; with ``final`` it
+    also returns the hours the last visits spill into after the range.
+    """
+
+    def __init__(self, branch_id: int) -> None:
+        self.branch_id = branch_id
+        self._carry: list[dict] = []
+
+    def carry(self, records: list[dict]) -> None:
+        """Seed visits from before the next chunk, e.g. when resuming a load midway."""
+        self._carry.extend(records)
+
+    def feed(self, records: list[dict], date_from: date, date_to: date, final: bool = False) -> list[tuple]:
+        records = self._carry + records
+        boundary = datetime.combine(date_to + timedelta(days=1), time.min)
+        self._carry = [rec for rec in records if rec["end_dt"].replace(tzinfo=None) > boundary]
+        lo, hi = date_from.isoformat(), date_to.isoformat()
+        return [row for row in staff_hour_rows(self.branch_id, records) if lo <= row[2] and (final or row[2] <= hi)]
+
+
+def _group_members(groups: list[dict]) -> list[tuple[str, list[int]]]:
+    return [(g["group_id"], sorted({int(x) for x in g.get("staff_ids", [])})) for g in groups]
+
+
+def _group_hour_rows_py(branch_id: int, groups: list[dict], date_from: date, date_to: date, staff_rows: list[tuple]) -> list[tuple]:
+    members = _group_members(groups)
+    bits: dict[int, int] = {}
+    for _, staff_ids in members:
+        for staff_id in staff_ids:
+            bits.setdefault(staff_id, len(bits))
+    group_masks = [(group_id, sum(1 << bits[s] for s in staff_ids), len(staff_ids)) for group_id, staff_ids in members]
+
+    busy: dict[tuple[str, int], int] = {}
+    minutes: dict[tuple[str, int], dict[int, float]] = {}
+    lo, hi = date_from.isoformat(), date_to.isoformat()
+    for row in staff_rows:
+        bit = bits.get(row[1])
+        if bit is None or not lo <= row[2] <= hi:
+            continue
+        key = (row[2], row[3])
+        busy[key] = busy.get(key, 0) | (1 << bit)
+        minutes.setdefault(key, {})[bit] = row[7]
+
+    rows = []
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        day_str = day.isoformat()
+        dow = day.isoweekday()
+        for hour in range(24):
+            mask = busy.get((day_str, hour), 0)
+            minutes_by_bit = minutes.get((day_str, hour), {})
+            in_benchmark, _ = hour_flags(hour)
+            for group_id, group_mask, staff_total in group_masks:
+                hit = mask & group_mask
+                busy_count = hit.bit_count()
+                busy_minutes = sum(m for bit, m in minutes_by_bit.items() if hit >> bit & 1)
+                total = staff_total or 1
+                rows.append(
+                    (
+                        branch_id,
+                        group_id,
+                        day_str,
+                        dow,
+                        hour,
+                        busy_count,
+                        staff_total,
+                        round((busy_count / total) * 100, 2),
+                        in_benchmark,
+                        round((busy_minutes / (total * 60)) * 100, 2),
+                    )
+                )
+    return rows
+
+
+def group_hour_rows(branch_id: int, groups: list[dict], date_from: date, date_to: date, staff_rows: list[tuple]) -> list[tuple]:
+    """group_hour_load rows for every day, hour and group in ``[date_from, date_to]``.
+
+    ``staff_rows`` are staff_hour_rows output. Busy slots become a
+    (day * 24 + hour) x staff matrix and group membership a group x staff
+    matrix, so busy counts and busy minutes of all groups come from two
+    matrix products instead of a set intersection per group and hour.
+    Rows are ``(branch_id, group_id, date, dow, hour, busy_count,
+    staff_total, load_pct, in_benchmark, load_pct_minutes)``.
+    """
+    if np is None:
+        return _group_hour_rows_py(branch_id, groups, date_from, date_to, staff_rows)
+    members = _group_members(groups)
+    if not members:
+        return []
+    staff_index = np.array(sorted({s for _, staff_ids in members for s in staff_ids}), dtype=np.int64)
+    membership = np.zeros((len(members), len(staff_index)))
+    for g, (_, staff_ids) in enumerate(members):
+        membership[g, np.searchsorted(staff_index, staff_ids)] = 1.0
+
+    first = day_number(date_from)
+    n_days = (date_to - date_from).days + 1
+    busy = np.zeros((n_days * 24, len(staff_index)))
+    # Minutes are summed as integer hundredths, which float64 adds exactly.
+    cents = np.zeros_like(busy)
+    if staff_rows and len(staff_index):
+        n = len(staff_rows)
+        day_of = {label: day_number(date.fromisoformat(label)) - first for label in set(map(itemgetter(2), staff_rows))}
+        staff = np.fromiter(map(itemgetter(1), staff_rows), dtype=np.int64, count=n)
+        days = np.fromiter(map(day_of.__getitem__, map(itemgetter(2), staff_rows)), dtype=np.int64, count=n)
+        hours = np.fromiter(map(itemgetter(3), staff_rows), dtype=np.int64, count=n)
+        minutes = np.fromiter(map(itemgetter(7), staff_rows), dtype=np.float64, count=n)
+        col = np.minimum(np.searchsorted(staff_index, staff), len(staff_index) - 1)
+        keep = (staff_index[col] == staff) & (days >= 0) & (days < n_days)
+        slot = days[keep] * 24 + hours[keep]
+        busy[slot, col[keep]] = 1.0
+        cents[slot, col[keep]] = np.rint(minutes[keep] * 100)
+
+    busy_count = busy @ membership.T
+    busy_cents = cents @ membership.T
+    staff_total = membership.sum(axis=1)
+    total = np.maximum(staff_total, 1)
+    # Percentages with two decimals as exact ratios of integers: one
+    # correctly rounded division, then round-half-even like round().
+    load_pct = np.rint(busy_count * 10_000 / total) / 100
+    load_pct_minutes = np.rint(busy_cents * 100 / (total * 60)) / 100
+
+    n_groups = len(members)
+    per_day = 24 * n_groups
+    labels = np.array([day_label(first + offset) for offset in range(n_days)], dtype=object)
+    dows = np.array([(date_from + timedelta(days=offset)).isoweekday() for offset in range(n_days)])
+    hours = np.tile(np.repeat(np.arange(24), n_groups), n_days)
+    count = n_days * per_day
+    return list(
+        zip(
+            [branch_id] * count,
+            [group_id for group_id, _ in members] * (n_days * 24),
+            np.repeat(labels, per_day).tolist(),
+            np.repeat(dows, per_day).tolist(),
+            hours.tolist(),
+            busy_count.astype(np.int64).ravel().tolist(),
+            np.tile(staff_total.astype(np.int64), n_days * 24).tolist(),
+            load_pct.ravel().tolist(),
+            ((hours >= BENCH_START_HOUR) & (hours <= BENCH_END_HOUR)).astype(np.int64).tolist(),
+            load_pct_minutes.ravel().tolist(),
+        )
+    )
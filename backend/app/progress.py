@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import date
+from typing import Any
+
+from .config import settings
+from .db import get_conn
+
+
+class RunProgress:
+    """Live progress of one ETL run, kept in memory and written to etl_runs sparingly.
+
+    Callers update it from any thread; ``update`` persists the ``progress``
+    text and ``progress_json`` at most every ``ETL_PROGRESS_SECONDS`` and
+    reports whether it did, so other per-page bookkeeping can ride along.
+    """
+
+    def __init__(self, run_id: str, run_type: str, interval: float) -> None:
+        self.run_id = run_id
+        self.run_type = run_type
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._persisted_at: float | None = None
+        self.fields: dict[str, Any] = {
+            "stage": "start",
+            "branch_id": None,
+            "window_from": None,
+            "window_to": None,
+            "pages_done": 0,
+            "pages_total": None,
+            "records": 0,
+            "days_done": 0,
+            "days_total": None,
+        }
+
+    def start_period(self, branch_id: int, date_from: date, date_to: date) -> None:
+        """Begin a branch period; ETA is measured over its days."""
+        with self._lock:
+            self._started = time.monotonic()
+            self.fields.update(
+                branch_id=branch_id,
+                days_done=0,
+                days_total=max((date_to - date_from).days + 1, 0),
+            )
+
+    def page(self, branch_id: int, window: tuple[date, date], page: int, total_count: int, per_page: int = 50) -> bool:
+        return self.update(
+            stage="fetch",
+            branch_id=branch_id,
+            window_from=window[0].isoformat(),
+            window_to=window[1].isoformat(),
+            pages_done=page,
+            pages_total=-(-int(total_count) // per_page) if total_count else None,
+        )
+
+    def window_done(self, window: tuple[date, date], records: int) -> bool:
+        with self._lock:
+            self.fields["records"] += records
+            self.fields["days_done"] += (window[1] - window[0]).days + 1
+        return self.update()
+
+    def update(self, force: bool = False, **fields: Any) -> bool:
+        with self._lock:
+            self.fields.update(fields)
+            now = time.monotonic()
+            if not force and self._persisted_at is not None and now - self._persisted_at < self.interval:
+                return False
+            self._persisted_at = now
+        self.persist()
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            data = dict(self.fields)
+            elapsed = time.monotonic() - self._started
+        data["run_id"] = self.run_id
+        data["run_type"] = self.run_type
+        data["elapsed_seconds"] = round(elapsed, 1)
+        done, total = data["days_done"], data["days_total"]
+        data["eta_seconds"] = None
+        if total and 0 < done < total:
+            data["eta_seconds"] = round(elapsed / done * (total - done), 1)
+        return data
+
+    def label(self, data: dict[str, Any] | None = None) -> str:
+        """The free-form ``etl_runs.progress`` text older readers show."""
+        data = data or self.snapshot()
+        text = f"{data['branch_id']}: " if data["branch_id"] is not None else ""
+        if data["window_from"]:
+            text += f"{data['window_from']}..{data['window_to']} "
+        if data["stage"] == "fetch":
+            total = data["pages_total"]
+            return text + f"page {data['pages_done']}" + (f" / {total}" if total else "")
+        return text + data["stage"]
+
+    def persist(self) -> None:
+        data = self.snapshot()
+        with get_conn() as conn:
+            conn.execute(
+                "UPDATE etl_runs SET progress = ?, progress_json = ? WHERE run_id = ?",
+                (self.label(data), json.dumps(data), self.run_id),
+            )
+            conn.commit()
+
+
+_TRACKERS: dict[str, RunProgress] = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def track(run_id: str, run_type: str) -> RunProgress:
+    tracker = RunProgress(run_id, run_type, settings.etl_progress_seconds)
+    with _TRACKERS_LOCK:
+        _TRACKERS[run_id] = tracker
+    return tracker
+
+
+def get_tracker(run_id: str) -> RunProgress | None:
+    with _TRACKERS_LOCK:
+        return _TRACKERS.get(run_id)
+
+
+def finish(run_id: str, stage: str) -> dict[str, Any] | None:
+    """Stop tracking a run; returns its last snapshot for the final etl_runs write."""
+    with _TRACKERS_LOCK:
+        tracker = _TRACKERS.pop(run_id, None)
+    if tracker is None:
+        return None
+    with tracker._lock:
+        tracker.fields["stage"] = stage
+    return tracker.snapshot()
+
+
+def live() -> list[dict[str, Any]]:
+    """Snapshots of every run still in progress in this process."""
+    with _TRACKERS_LOCK:
+        trackers = list(_TRACKERS.values())
+    return [tracker.snapshot() for tracker in trackers]
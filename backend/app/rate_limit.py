@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from .config import settings
+
+
+_WINDOW_SECONDS = 60.0
+_MAX_BACKOFF_SECONDS = 60.0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Blocking token bucket with AIMD back-off on 429 responses.
+
+    Every 429 halves the refill rate (down to ``min_rate``) and pauses all
+    callers for Retry-After seconds, or an exponential pause when the header
+    is missing. Each accepted response restores the rate additively.
+    """
+
+    def __init__(self, rate: float, burst: int, label: str = "") -> None:
+        self.label = label
+        self.max_rate = max(rate, 0.01)
+        self.min_rate = max(self.max_rate / 8, 0.05)
+        self.rate = self.max_rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._throttle_streak = 0
+        self._granted_at: deque[float] = deque()
+        self._lock = threading.Lock()
+        self.granted = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._paused_until - now
+                if delay <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.granted += 1
+                        self.wait_seconds += waited
+                        self._granted_at.append(now)
+                        while self._granted_at and now - self._granted_at[0] > _WINDOW_SECONDS:
+                            self._granted_at.popleft()
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def throttle(self, retry_after: float | None = None) -> float:
+        """Register a 429 and return the pause imposed on all callers."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self._throttle_streak += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = now
+            if retry_after is None:
+                retry_after = min(_MAX_BACKOFF_SECONDS, float(2 ** min(self._throttle_streak, 6)))
+            self._paused_until = max(self._paused_until, now + retry_after)
+            return retry_after
+
+    def success(self) -> None:
+        with self._lock:
+            self._throttle_streak = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(1 for ts in self._granted_at if now - ts <= _WINDOW_SECONDS)
+            return {
+                "token": self.label,
+                "rate_limit": self.max_rate,
+                "current_rate": round(self.rate, 3),
+                "requests_per_sec": round(recent / _WINDOW_SECONDS, 3),
+                "requests": self.granted,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "paused_for": round(max(0.0, self._paused_until - now), 3),
+            }
+
+
+_LIMITERS: dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _token_label(token: str | None) -> str:
+    if not token:
+        return "не задан"
+    if len(token) <= 8:
+        return "****"
+    return f"{token[:4]}...{token[-4:]}"
+
+
+def limiter_for(partner_token: str | None) -> TokenBucket:
+    """Process-wide bucket shared by every caller using the same partner token."""
+    key = hashlib.sha256((partner_token or "").encode("utf-8")).hexdigest()
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(key)
+        if limiter is None:
+            limiter = TokenBucket(
+                settings.yclients_rate_limit,
+                settings.yclients_rate_burst,
+                label=_token_label(partner_token),
+            )
+            _LIMITERS[key] = limiter
+    return limiter
+
+
+def limiter_stats() -> list[dict[str, Any]]:
+    with _LIMITERS_LOCK:
+        limiters = list(_LIMITERS.values())
+    return [limiter.stats() for limiter in limiters]
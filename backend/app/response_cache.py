@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from .config import settings
+
+
+# Seconds a cached response is fresh, per endpoint. These lists change
+# about weekly, so a stale copy is served while it is refreshed in the background.
+CACHE_TTLS: dict[str, int] = {
+    "companies": 24 * 60 * 60,
+    "company": 24 * 60 * 60,
+    "staff": 6 * 60 * 60,
+    "storages": 24 * 60 * 60,
+}
+
+_log = logging.getLogger("yclients_cache")
+
+
+class ResponseCache:
+    """SQLite-backed TTL cache of YCLIENTS GET responses with stale-while-revalidate."""
+
+    def __init__(self, path: Path, max_stale: int) -> None:
+        self.path = path
+        self.max_stale = max_stale
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    params TEXT,
+                    body TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_endpoint ON response_cache(endpoint);")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(scope: str, path: str, params: dict[str, Any] | None) -> str:
+        raw = json.dumps([scope, path, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _bump(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _read(self, key: str) -> tuple[Any, float] | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT body, expires_at FROM response_cache WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), float(row[1])
+
+    def _write(self, key: str, endpoint: str, path: str, params: dict | None, body: Any, ttl: int) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(cache_key, endpoint, path, params, body, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    endpoint,
+                    path,
+                    json.dumps(params or {}, sort_keys=True, default=str),
+                    json.dumps(body, ensure_ascii=False, default=str),
+                    now,
+                    now + ttl,
+                ),
+            )
+            conn.commit()
+
+    def _refresh_async(self, key: str, endpoint: str, path: str, params: dict | None, ttl: int, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def worker() -> None:
+            try:
+                self._write(key, endpoint, path, params, fetch(), ttl)
+                self._bump("refreshes")
+            except Exception as exc:  # noqa: BLE001
+                self._bump("refresh_errors")
+                _log.warning("Background refresh of %s failed: %s", path, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, name=f"yclients-cache-{endpoint}", daemon=True).start()
+
+    def get_or_fetch(
+        self,
+        endpoint: str,
+        scope: str,
+        path: str,
+        params: dict[str, Any] | None,
+        fetch: Callable[[], Any],
+    ) -> Any:
+        ttl = CACHE_TTLS[endpoint]
+        key = self.make_key(scope, path, params)
+        try:
+            cached = self._read(key)
+        except Exception as exc:  # noqa: BLE001
+            _log.warning("Response cache read failed: %s", exc)
+            cached = None
+        now = time.time()
+        if cached is not None:
+            body, expires_at = cached
+            if now < expires_at:
+                self._bump("hits")
+                return body
+            if now < expires_at + self.max_stale:
+                self._bump("stale_hits")
+                self._refresh_async(key, endpoint, path, params, ttl, fetch)
+                return body
+        self._bump("misses")
+        body = fetch()
+        try:
+            self._write(key, endpoint, path, params, body, ttl)
+        except Exception as exc:  # noqa: BLE001
+            _log.warning("Response cache write failed: %s", exc)
+        return body
+
+    def purge(self, endpoint: str | None = None) -> int:
+        with self._lock:
+            conn = self._db()
+            if endpoint:
+                cur = conn.execute("DELETE FROM response_cache WHERE endpoint = ?", (endpoint,))
+            else:
+                cur = conn.execute("DELETE FROM response_cache")
+            conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            try:
+                rows = self._db().execute(
+                    "SELECT endpoint, COUNT(*) FROM response_cache GROUP BY endpoint"
+                ).fetchall()
+            except Exception:  # noqa: BLE001
+                rows = []
+        counters["entries"] = {endpoint: int(cnt) for endpoint, cnt in rows}
+        counters["path"] = str(self.path)
+        return counters
+
+
+_CACHE: ResponseCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    global _CACHE
+    if not settings.yclients_cache_enabled:
+        return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ResponseCache(settings.yclients_cache_path, settings.yclients_cache_max_stale)
+    return _CACHE
+
+
+def cache_stats() -> dict[str, Any]:
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
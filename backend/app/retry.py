@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+import requests
+
+from .config import settings
+
+
+class RequestFailed(RuntimeError):
+    """YCLIENTS call failure; ``retryable`` tells the policy whether to try again."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retryable: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, RequestFailed):
+        return exc.retryable
+    return isinstance(exc, (requests.Timeout, requests.ConnectionError))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    deadline: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Equal-jitter exponential delay before attempt ``attempt + 1``."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(delay / 2, delay)
+
+
+# (method, path prefix, overrides). Record pages are safe to repeat and
+# expensive to lose mid-backfill; goods transactions are not idempotent.
+ENDPOINT_OVERRIDES: list[tuple[str, str, dict[str, Any]]] = [
+    ("GET", "/api/v1/records/", {"attempts": 5, "deadline": 180.0}),
+    ("POST", "/api/v1/storage_operations/goods_transactions/", {"attempts": 1}),
+]
+
+
+def policy_for(method: str, path: str, attempts: int | None = None) -> RetryPolicy:
+    policy = RetryPolicy(
+        attempts=max(1, attempts if attempts is not None else settings.yclients_retries),
+        deadline=settings.yclients_retry_deadline,
+    )
+    for override_method, prefix, overrides in ENDPOINT_OVERRIDES:
+        if method.upper() == override_method and path.startswith(prefix):
+            return replace(policy, **overrides)
+    return policy
+
+
+@dataclass
+class RetryStats:
+    retries: int = 0
+    backoff_seconds: float = 0.0
+    terminal_failures: int = 0
+    exhausted: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, retries: int = 0, backoff: float = 0.0, terminal: int = 0, exhausted: int = 0) -> None:
+        with self._lock:
+            self.retries += retries
+            self.backoff_seconds += backoff
+            self.terminal_failures += terminal
+            self.exhausted += exhausted
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "terminal_failures": self.terminal_failures,
+                "exhausted": self.exhausted,
+            }
+
+
+RETRY_TOTALS = RetryStats()
+
+
+def retry_stats() -> dict[str, Any]:
+    return RETRY_TOTALS.snapshot()
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+from src.shared.db_pool import sqlite_maintenance
 
 from .config import settings
-from .etl import run_daily
+from .etl import run_daily, run_incremental
 from .yclients import build_client
 
 
@@ -30,6 +34,26 @@ def _daily_job():
         logging.getLogger("scheduler").exception("Failed to start indicators sync")
 
 
+def _incremental_job():
+    run_incremental(build_client())
+
+
+def _sqlite_maintenance_job():
+    log = logging.getLogger("scheduler")
+    for result in sqlite_maintenance():
+        if result.get("error"):
+            log.warning("SQLite maintenance failed for %s: %s", "+".join(result["names"]), result["error"])
+        else:
+            log.info(
+                "SQLite maintenance %s: optimize + checkpoint %s/%s WAL pages%s in %.3fs",
+                "+".join(result["names"]),
+                result["checkpointed"],
+                result["wal_pages"],
+                " (busy)" if result["busy"] else "",
+                result["seconds"],
+            )
+
+
 def start_scheduler() -> None:
     global _scheduler
     if _scheduler is not None:
@@ -37,6 +61,20 @@ def start_scheduler() -> None:
     tz = ZoneInfo(settings.timezone)
     _scheduler = BackgroundScheduler(timezone=tz)
     _scheduler.add_job(_daily_job, CronTrigger(hour=6, minute=0))
+    if settings.etl_incremental_minutes:
+        _scheduler.add_job(
+            _incremental_job,
+            IntervalTrigger(minutes=settings.etl_incremental_minutes),
+            max_instances=1,
+            coalesce=True,
+        )
+    if settings.sqlite_maintenance_minutes:
+        _scheduler.add_job(
+            _sqlite_maintenance_job,
+            IntervalTrigger(minutes=settings.sqlite_maintenance_minutes),
+            max_instances=1,
+            coalesce=True,
+        )
     _scheduler.start()
 
 
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Callable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+def _clone(error: BaseException) -> BaseException:
+    try:
+        return copy.copy(error)
+    except Exception:  # noqa: BLE001
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller runs ``fn`` and gets its result as is; callers arriving
+    while it is in flight wait for it. Only when some did is the result
+    copied: each waiting caller gets its own deep copy of a snapshot taken
+    before the first caller returns, so mutating a result does not affect
+    the others. Waiting callers raise a copy of the exception, chained to
+    the original.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self.executed = 0
+        self.collapsed = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+            else:
+                self.collapsed += 1
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _clone(call.error) from call.error
+            return copy.deepcopy(call.result)
+        try:
+            result = fn()
+            # No caller joins once the key is gone, so ``waiters`` is final.
+            waiters = self._release(key, call)
+            if waiters:
+                call.result = copy.deepcopy(result)
+            return result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._release(key, call)
+            call.done.set()
+
+    def _release(self, key: str, call: _Call) -> int:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            return call.waiters
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._calls),
+            }
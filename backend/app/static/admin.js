@@ -1,5 +1,7 @@
 const startBtn = document.getElementById("startFull");
 const dailyBtn = document.getElementById("startDaily");
+const incrementalBtn = document.getElementById("startIncremental");
+const reaggregateBtn = document.getElementById("startReaggregate");
 const statusEl = document.getElementById("etlStatus");
 const progressEl = document.getElementById("etlProgress");
 const timeEl = document.getElementById("etlTime");
@@ -32,6 +34,17 @@ const cuteamImportStatus = document.getElementById("cuteamImportStatus");
 const cuteamImportMeta = document.getElementById("cuteamImportMeta");
 const cuteamImportOutput = document.getElementById("cuteamImportOutput");
 const cuteamImportBtn = document.getElementById("cuteamImportBtn");
+const apiRate = document.getElementById("apiRate");
+const apiRateMeta = document.getElementById("apiRateMeta");
+const apiThrottled = document.getElementById("apiThrottled");
+const apiThrottledMeta = document.getElementById("apiThrottledMeta");
+const apiPool = document.getElementById("apiPool");
+const apiPoolMeta = document.getElementById("apiPoolMeta");
+const apiCache = document.getElementById("apiCache");
+const apiCacheMeta = document.getElementById("apiCacheMeta");
+const apiCachePurgeBtn = document.getElementById("apiCachePurge");
+const apiCoalesced = document.getElementById("apiCoalesced");
+const apiCoalescedMeta = document.getElementById("apiCoalescedMeta");
 
 async function fetchJSON(url, options = {}) {
   const res = await fetch(url, options);
@@ -39,6 +52,23 @@ async function fetchJSON(url, options = {}) {
   return res.json();
 }
 
+function formatProgress(data) {
+  const detail = data.progress_detail;
+  if (!detail || data.status !== "running") return data.progress;
+  const parts = [];
+  if (detail.branch_id) parts.push(detail.branch_id);
+  if (detail.window_from) parts.push(`${detail.window_from}…${detail.window_to}`);
+  if (detail.pages_total) {
+    parts.push(`стр. ${detail.pages_done} из ${detail.pages_total}`);
+  } else if (detail.pages_done) {
+    parts.push(`стр. ${detail.pages_done}`);
+  }
+  if (detail.records) parts.push(`${detail.records} записей`);
+  if (detail.days_total) parts.push(`${detail.days_done} из ${detail.days_total} дн.`);
+  if (detail.eta_seconds) parts.push(`осталось ~${Math.ceil(detail.eta_seconds / 60)} мин`);
+  return parts.join(" · ") || data.progress;
+}
+
 async function refreshStatus() {
   const data = await fetchJSON("/api/admin/etl/status");
   if (data.status === "none") {
@@ -52,9 +82,10 @@ async function refreshStatus() {
     running: "Выполняется",
     success: "Успешно",
     failed: "Ошибка",
+    interrupted: "Прервана",
   };
   statusEl.textContent = statusMap[data.status] || data.status || "—";
-  progressEl.textContent = data.progress || "—";
+  progressEl.textContent = formatProgress(data) || "—";
   timeEl.textContent = data.finished_at || data.started_at || "—";
   errorsEl.textContent = data.error_log || "";
 }
@@ -97,6 +128,7 @@ async function refreshFullBranchStatus() {
         running: "Выполняется",
         success: "Успешно",
         failed: "Ошибка",
+        interrupted: "Прервана",
       };
       statusCell.textContent = statusMap[row.last_status] || row.last_status || "—";
       const lastCell = document.createElement("td");
@@ -235,12 +267,106 @@ if (dailyBtn) {
   });
 }
 
+if (incrementalBtn) {
+  incrementalBtn.addEventListener("click", async () => {
+    incrementalBtn.disabled = true;
+    startBtn.disabled = true;
+    try {
+      await fetchJSON("/api/admin/etl/incremental/start", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({}),
+      });
+    } catch (err) {
+      console.error(err);
+    } finally {
+      incrementalBtn.disabled = false;
+      startBtn.disabled = false;
+      await refreshStatus();
+    }
+  });
+}
+
+if (reaggregateBtn) {
+  reaggregateBtn.addEventListener("click", async () => {
+    reaggregateBtn.disabled = true;
+    startBtn.disabled = true;
+    try {
+      await fetchJSON("/api/admin/etl/reaggregate/start", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({}),
+      });
+    } catch (err) {
+      console.error(err);
+    } finally {
+      reaggregateBtn.disabled = false;
+      startBtn.disabled = false;
+      await refreshStatus();
+    }
+  });
+}
+
+async function refreshApiStats() {
+  if (!apiRate) return;
+  try {
+    const data = await fetchJSON("/api/admin/yclients/stats");
+    const limiters = data.rate_limiters || [];
+    const limiter = limiters[0];
+    if (limiter) {
+      apiRate.textContent = `${limiter.requests_per_sec} req/s`;
+      apiRateMeta.textContent = `Лимит ${limiter.current_rate} из ${limiter.rate_limit} req/s · запросов ${limiter.requests}`;
+      apiThrottled.textContent = String(limiter.throttled);
+      apiThrottledMeta.textContent = limiter.paused_for > 0
+        ? `Пауза ещё ${limiter.paused_for.toFixed(1)} с`
+        : `Ожидание в очереди: ${limiter.wait_seconds.toFixed(1)} с`;
+    } else {
+      apiRate.textContent = "—";
+      apiRateMeta.textContent = "Запросов ещё не было";
+      apiThrottled.textContent = "—";
+      apiThrottledMeta.textContent = "—";
+    }
+    const pool = data.http_pool || {};
+    apiPool.textContent = `${pool.connections_reused ?? 0} / ${pool.requests ?? 0}`;
+    apiPoolMeta.textContent = `Переиспользовано / всего · открыто ${pool.connections_created ?? 0}`;
+    const cache = data.cache || {};
+    if (cache.enabled) {
+      const entries = Object.values(cache.entries || {}).reduce((sum, cnt) => sum + cnt, 0);
+      apiCache.textContent = `${cache.hits + cache.stale_hits} / ${cache.misses}`;
+      apiCacheMeta.textContent = `Попадания / промахи · записей ${entries} · фоновых обновлений ${cache.refreshes}`;
+    } else {
+      apiCache.textContent = "Выключен";
+      apiCacheMeta.textContent = "YCLIENTS_CACHE=0";
+    }
+    const coalescing = data.coalescing || {};
+    apiCoalesced.textContent = String(coalescing.collapsed ?? 0);
+    apiCoalescedMeta.textContent = `Выполнено GET ${coalescing.executed ?? 0} · в работе ${coalescing.in_flight ?? 0}`;
+  } catch (err) {
+    apiRateMeta.textContent = err.message || "Ошибка";
+  }
+}
+
 setInterval(refreshStatus, 5000);
 refreshStatus().catch((err) => console.error(err));
 refreshHistoricalStatus().catch((err) => console.error(err));
 setInterval(refreshHistoricalStatus, 10000);
 loadEtlBranches().then(refreshFullBranchStatus);
 setInterval(refreshFullBranchStatus, 15000);
+if (apiCachePurgeBtn) {
+  apiCachePurgeBtn.addEventListener("click", async () => {
+    apiCachePurgeBtn.disabled = true;
+    try {
+      await fetchJSON("/api/admin/yclients/cache", { method: "DELETE" });
+    } catch (err) {
+      console.error(err);
+    } finally {
+      apiCachePurgeBtn.disabled = false;
+      await refreshApiStats();
+    }
+  });
+}
+refreshApiStats().catch((err) => console.error(err));
+setInterval(refreshApiStats, 10000);
 
 function loadPaletteSetting() {
   const current = localStorage.getItem("heatmapPalette") || "perceptual";
@@ -1,5 +1,6 @@
 const monthSelect = document.getElementById("monthSelect");
 const branchSelect = document.getElementById("branchSelect");
+const metricSelect = document.getElementById("metricSelect");
 const monthContainer = document.getElementById("monthContainer");
 const statusMonth = document.getElementById("dataMonth");
 const statusUpdated = document.getElementById("dataUpdated");
@@ -346,6 +347,7 @@ function renderGroupError(group, err) {
 async function refresh() {
   const branchId = branchSelect.value;
   const month = monthSelect.value;
+  const metric = metricSelect ? metricSelect.value : "hours";
   if (!branchId || !month) return;
   monthContainer.innerHTML = '<div class="group-empty">Загрузка данных…</div>';
   let statusData = null;
@@ -378,7 +380,7 @@ async function refresh() {
     }
     try {
       const data = await fetchJSON(
-        `/api/heatmap/month?branch_id=${branchId}&group_id=${group.group_id}&month=${month}`
+        `/api/heatmap/month?branch_id=${branchId}&group_id=${group.group_id}&month=${month}&metric=${metric}`
       );
       renderGroupMonth(group, data);
     } catch (err) {
@@ -396,6 +398,9 @@ async function init() {
 }
 
 monthSelect.addEventListener("change", refresh);
+if (metricSelect) {
+  metricSelect.addEventListener("change", refresh);
+}
 branchSelect.addEventListener("change", async () => {
   await refresh();
 });
@@ -1,19 +1,89 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import threading
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .api_log import api_log
 from .config import settings
+from .rate_limit import TokenBucket, limiter_for, parse_retry_after
+from .response_cache import get_response_cache
+from .retry import RETRY_TOTALS, RequestFailed, RetryStats, is_retryable, policy_for
+from .singleflight import SingleFlight
 
 _logger = logging.getLogger("yclients_api")
 
+# One urllib3 pool per process: every client (ETL, mini app, daily report)
+# mounts the same adapter, so keep-alive connections are reused between calls.
+# Sessions are per-thread because requests.Session itself is not thread-safe.
+_ADAPTER_LOCK = threading.Lock()
+_ADAPTER: HTTPAdapter | None = None
+_SESSIONS = threading.local()
+
+# Identical GETs in flight at the same time (e.g. several admins opening /mini
+# for one branch) share a single upstream call.
+_INFLIGHT = SingleFlight()
+
+
+def _shared_adapter() -> HTTPAdapter:
+    global _ADAPTER
+    if _ADAPTER is None:
+        with _ADAPTER_LOCK:
+            if _ADAPTER is None:
+                _ADAPTER = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.yclients_pool_size,
+                    pool_block=True,
+                )
+    return _ADAPTER
+
+
+def get_session() -> requests.Session:
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        adapter = _shared_adapter()
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _SESSIONS.session = session
+    return session
+
+
+def coalescing_stats() -> dict[str, Any]:
+    return _INFLIGHT.stats()
+
+
+def http_pool_stats() -> dict[str, Any]:
+    """Connection counters of the shared pool (reused = requests - connections)."""
+    stats = {
+        "pool_size": settings.yclients_pool_size,
+        "hosts": 0,
+        "connections_created": 0,
+        "requests": 0,
+        "connections_reused": 0,
+    }
+    adapter = _ADAPTER
+    if adapter is None:
+        return stats
+    pools = adapter.poolmanager.pools
+    with pools.lock:
+        host_pools = [pools[key] for key in pools.keys()]
+    for pool in host_pools:
+        stats["hosts"] += 1
+        stats["connections_created"] += pool.num_connections
+        stats["requests"] += pool.num_requests
+    stats["connections_reused"] = max(0, stats["requests"] - stats["connections_created"])
+    return stats
+
 
 def _log_api_call(
     method: str,
@@ -24,25 +94,19 @@ def _log_api_call(
     response_data: Any,
     error: str | None = None,
 ) -> None:
-    """Log API call to file for debugging."""
-    log_path = settings.data_dir / "yclients_api_debug.log"
-    entry = {
-        "ts": datetime.utcnow().isoformat(),
-        "method": method,
-        "url": url,
-        "params": params,
-        "request_body": json_body,
-        "status_code": status_code,
-        "response": response_data,
-        "error": error,
-    }
-    try:
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False, default=str))
-            f.write("\n")
-    except Exception:  # noqa: BLE001
-        _logger.warning("Failed to write API debug log")
+    """Queue an API call for the background debug log writer."""
+    api_log.enqueue(
+        {
+            "ts": datetime.utcnow().isoformat(),
+            "method": method,
+            "url": url,
+            "params": params,
+            "request_body": json_body,
+            "status_code": status_code,
+            "response": response_data,
+            "error": error,
+        }
+    )
 
 
 @dataclass
@@ -52,6 +116,12 @@ class YClientsClient:
     user_token: str | None = None
     timeout: int = 30
     retries: int = 3
+    session: requests.Session | None = field(default=None, repr=False)
+    retry_stats: RetryStats = field(default_factory=RetryStats, repr=False, compare=False)
+    use_cache: bool = True
+
+    def _session(self) -> requests.Session:
+        return self.session or get_session()
 
     def _headers(self) -> dict[str, str]:
         auth = f"Bearer {self.partner_token}"
@@ -63,48 +133,120 @@ class YClientsClient:
             "Authorization": auth,
         }
 
+    def _scope(self) -> str:
+        return hashlib.sha256(
+            f"{self.base_url}|{self.partner_token}|{self.user_token or ''}".encode("utf-8")
+        ).hexdigest()
+
     def _request(
         self,
         method: str,
         path: str,
         params: dict[str, Any] | None = None,
         json_body: dict[str, Any] | None = None,
+    ) -> Any:
+        if method != "GET":
+            return self._request_with_retry(method, path, params, json_body)
+        key = json.dumps([self._scope(), path, params or {}], sort_keys=True, default=str)
+        return _INFLIGHT.do(key, lambda: self._request_with_retry(method, path, params, None))
+
+    def _request_with_retry(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        json_body: dict[str, Any] | None,
     ) -> Any:
         url = f"{self.base_url}{path}"
-        last_err = None
-        for attempt in range(1, self.retries + 1):
+        limiter = limiter_for(self.partner_token)
+        policy = policy_for(method, path, attempts=self.retries)
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
             try:
-                resp = requests.request(
-                    method,
-                    url,
-                    headers=self._headers(),
-                    params=params,
-                    json=json_body,
-                    timeout=self.timeout,
-                )
-                try:
-                    data = resp.json() if resp.text else {}
-                except Exception:
-                    _log_api_call(method, url, params, json_body, resp.status_code, resp.text, error="json_decode_error")
-                    raise RuntimeError(f"YCLIENTS request failed: {resp.text[:1000]}")
-
-                # Log all PUT/POST requests to visits, goods_transactions, and consumables for debugging
-                if method in ("PUT", "POST") and ("/visits/" in path or "/goods_transactions/" in path or "/consumables/" in path):
-                    _log_api_call(method, url, params, json_body, resp.status_code, data)
-                
-                if resp.status_code >= 500:
-                    raise RuntimeError(f"Server error {resp.status_code}")
-                if data.get("success") is False:
-                    _log_api_call(method, url, params, json_body, resp.status_code, data, error="success=false")
-                    raise RuntimeError(data.get("meta") or data)
-                if resp.status_code >= 400:
-                    _log_api_call(method, url, params, json_body, resp.status_code, data, error=f"status={resp.status_code}")
-                    raise RuntimeError(data.get("meta") or data)
-                return data
+                return self._send(method, path, url, params, json_body, limiter)
             except Exception as exc:  # noqa: BLE001
-                last_err = exc
-                time.sleep(min(2 ** attempt, 10))
-        raise RuntimeError(f"YCLIENTS request failed: {last_err}")
+                status_code = getattr(exc, "status_code", None)
+                if not is_retryable(exc):
+                    self._count(terminal=1)
+                    raise RequestFailed(f"YCLIENTS request failed: {exc}", status_code=status_code) from exc
+                # A 429 pause is enforced by the shared limiter on the next acquire().
+                retry_after = getattr(exc, "retry_after", None)
+                delay = retry_after if retry_after is not None else policy.backoff(attempt)
+                if attempt >= policy.attempts or time.monotonic() + delay > deadline:
+                    self._count(exhausted=1)
+                    raise RequestFailed(
+                        f"YCLIENTS request failed after {attempt} attempt(s): {exc}",
+                        status_code=status_code,
+                        retryable=True,
+                    ) from exc
+                self._count(retries=1, backoff=delay)
+                if retry_after is None:
+                    time.sleep(delay)
+
+    def _cached_get(self, endpoint: str, path: str, params: dict[str, Any] | None = None) -> Any:
+        cache = get_response_cache() if self.use_cache else None
+        if cache is None:
+            return self._request("GET", path, params=params)
+        return cache.get_or_fetch(
+            endpoint,
+            self._scope(),
+            path,
+            params,
+            lambda: self._request("GET", path, params=params),
+        )
+
+    def _count(self, **kwargs: Any) -> None:
+        self.retry_stats.add(**kwargs)
+        RETRY_TOTALS.add(**kwargs)
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        params: dict[str, Any] | None,
+        json_body: dict[str, Any] | None,
+        limiter: TokenBucket,
+    ) -> Any:
+        limiter.acquire()
+        resp = self._session().request(
+            method,
+            url,
+            headers=self._headers(),
+            params=params,
+            json=json_body,
+            timeout=self.timeout,
+        )
+        status = resp.status_code
+        if status == 429:
+            pause = limiter.throttle(parse_retry_after(resp.headers.get("Retry-After")))
+            _log_api_call(method, url, params, json_body, status, resp.text[:1000], error="status=429")
+            raise RequestFailed("Rate limited (429)", status_code=status, retryable=True, retry_after=pause)
+        limiter.success()
+        try:
+            data = resp.json() if resp.text else {}
+        except Exception:
+            _log_api_call(method, url, params, json_body, status, resp.text, error="json_decode_error")
+            raise RequestFailed(f"status={status}: {resp.text[:1000]}", status_code=status, retryable=status >= 500)
+
+        # Log all PUT/POST requests to visits, goods_transactions, and consumables for debugging
+        if method in ("PUT", "POST") and ("/visits/" in path or "/goods_transactions/" in path or "/consumables/" in path):
+            _log_api_call(method, url, params, json_body, status, data)
+
+        if status >= 500:
+            raise RequestFailed(f"Server error {status}", status_code=status, retryable=True)
+        if data.get("success") is False:
+            _log_api_call(method, url, params, json_body, status, data, error="success=false")
+            raise RequestFailed(f"status={status}: {data.get('meta') or data}", status_code=status)
+        if status >= 400:
+            _log_api_call(method, url, params, json_body, status, data, error=f"status={status}")
+            raise RequestFailed(f"status={status}: {data.get('meta') or data}", status_code=status)
+        # Capture mode: keep every successful GET so the fake server can replay it.
+        if settings.api_log_all and method == "GET":
+            _log_api_call(method, url, params, json_body, status, data)
+        return data
 
     def get_records(
         self,
@@ -113,39 +255,36 @@ class YClientsClient:
         end_date: str,
         page: int,
         count: int = 50,
+        changed_after: str | None = None,
     ) -> dict[str, Any]:
-        return self._request(
-            "GET",
-            f"/api/v1/records/{company_id}",
-            params={
-                "page": page,
-                "count": count,
-                "start_date": start_date,
-                "end_date": end_date,
-            },
-        )
+        params: dict[str, Any] = {
+            "page": page,
+            "count": count,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+        if changed_after:
+            params["changed_after"] = changed_after
+        return self._request("GET", f"/api/v1/records/{company_id}", params=params)
 
     def get_staff(self, company_id: int) -> dict[str, Any]:
         # staff_id = 0 means all staff (primary endpoint)
         try:
-            return self._request(
-                "GET",
-                f"/api/v1/company/{company_id}/staff/0",
-            )
+            return self._cached_get("staff", f"/api/v1/company/{company_id}/staff/0")
         except Exception as exc:  # noqa: BLE001
             msg = str(exc)
             # Fallback to deprecated endpoint if API rejects staff_id=0
-            if "masterId" in msg or "staff_id" in msg or "400" in msg or "422" in msg:
-                return self._request("GET", f"/api/v1/staff/{company_id}")
+            if getattr(exc, "status_code", None) in (400, 422) or "masterId" in msg or "staff_id" in msg:
+                return self._cached_get("staff", f"/api/v1/staff/{company_id}")
             raise
 
     def get_companies(self, my_only: bool = True) -> dict[str, Any]:
         params = {"my": 1} if my_only else None
-        return self._request("GET", "/api/v1/companies", params=params)
+        return self._cached_get("companies", "/api/v1/companies", params=params)
 
     def get_company(self, company_id: int, include: str | None = None) -> dict[str, Any]:
         params = {"include": include} if include else None
-        return self._request("GET", f"/api/v1/company/{company_id}", params=params)
+        return self._cached_get("company", f"/api/v1/company/{company_id}", params=params)
 
     def get_record(self, company_id: int, record_id: int, include_consumables: int = 1, include_finance: int = 0) -> dict[str, Any]:
         params = {
@@ -243,10 +382,7 @@ class YClientsClient:
         )
 
     def list_storages(self, company_id: int) -> dict[str, Any]:
-        return self._request(
-            "GET",
-            f"/api/v1/storages/{company_id}",
-        )
+        return self._cached_get("storages", f"/api/v1/storages/{company_id}")
 
 
 def build_client() -> YClientsClient:
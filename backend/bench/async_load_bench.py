@@ -0,0 +1,238 @@
+"""Dashboard latency under mini-app load: shared threadpool vs the async DB executor.
+
+    python -m backend.bench.async_load_bench --mini 60 --dashboard 8 --seconds 15
+
+Fills a scratch SQLite database, starts the offline YCLIENTS stand-in with
+``--yclients-ms`` latency and then, for DB_ASYNC_WORKERS=0 (async endpoints
+run on anyio's threadpool, as the sync endpoints did) and for
+``--workers``, serves the app with uvicorn in a child process. ``--mini``
+clients keep calling /api/mini/records, whose sync endpoint holds a
+threadpool worker while it waits on YCLIENTS; ``--dashboard`` clients
+cycle through /api/heatmap/month, /api/summary/month and
+/api/heatmap/summary. Dashboard latency and both request rates are
+reported per mode.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Sequence
+
+import requests
+
+from .group_load_bench import _branch_data
+
+_PASSWORD = "bench"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _prepare(args) -> int:
+    config, records_by_branch = _branch_data(args)
+    Path(os.environ["GROUP_CONFIG_PATH"]).write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    from ..app import etl
+    from ..app.db import init_db
+    from ..app.occupancy import staff_hour_rows
+    from .sqlite_profile_bench import _write_months
+
+    init_db()
+    _write_months(etl, staff_hour_rows, config, records_by_branch)
+    months = sorted({rec["start_dt"].strftime("%Y-%m") for records in records_by_branch.values() for rec in records})
+    print(json.dumps({"months": months}))
+    return 0
+
+
+def _wait_ready(base: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app exited with code {proc.returncode}")
+        try:
+            if requests.get(f"{base}/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("app did not start")
+
+
+def _percentile(values: list[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def _run_mode(args, env: dict, workers: int, config: dict, months: list[str]) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**env, "DB_ASYNC_WORKERS": str(workers)},
+    )
+    try:
+        _wait_ready(base, proc)
+        login = requests.Session()
+        login.post(f"{base}/login", data={"username": "admin", "password": _PASSWORD}, allow_redirects=False, timeout=10)
+        cookies = login.cookies.get_dict()
+
+        branch = config["branches"][0]
+        group_id = branch["groups"][0]["group_id"]
+        month = months[len(months) // 2]
+        year = int(month[:4])
+        dashboard_paths = [
+            f"/api/heatmap/month?branch_id={branch['branch_id']}&group_id={group_id}&month={month}",
+            f"/api/summary/month?branch_id={branch['branch_id']}&group_id={group_id}&month={month}",
+            f"/api/heatmap/summary?start_year={year}&end_year={year}",
+        ]
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies: list[float] = []
+        counts = {"mini": 0, "dashboard_errors": 0}
+
+        def mini_client(index: int) -> None:
+            session = requests.Session()
+            session.cookies.update(cookies)
+            branch_id = config["branches"][index % len(config["branches"])]["branch_id"]
+            while not stop.is_set():
+                try:
+                    session.get(f"{base}/api/mini/records?branch_id={branch_id}&mode=today", timeout=60)
+                except requests.RequestException:
+                    continue
+                with lock:
+                    counts["mini"] += 1
+
+        def dashboard_client(index: int) -> None:
+            session = requests.Session()
+            session.cookies.update(cookies)
+            step = index
+            while not stop.is_set():
+                path = dashboard_paths[step % len(dashboard_paths)]
+                step += 1
+                started = time.perf_counter()
+                try:
+                    ok = session.get(f"{base}{path}", timeout=60).ok
+                except requests.RequestException:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        counts["dashboard_errors"] += 1
+
+        threads = [threading.Thread(target=mini_client, args=(i,), daemon=True) for i in range(args.mini)]
+        # Let the mini-app load occupy the threadpool before measuring.
+        for thread in threads:
+            thread.start()
+        time.sleep(args.warmup)
+        dashboard = [threading.Thread(target=dashboard_client, args=(i,), daemon=True) for i in range(args.dashboard)]
+        with lock:
+            counts["mini"] = 0
+        for thread in dashboard:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads + dashboard:
+            thread.join(timeout=65)
+        stats = requests.get(f"{base}/api/admin/db/stats", cookies=cookies, timeout=10).json()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=15)
+    return {
+        "dashboard_rps": len(latencies) / args.seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0,
+        "errors": counts["dashboard_errors"],
+        "mini_rps": counts["mini"] / args.seconds,
+        "executor": stats.get("async_executors", {}).get("app"),
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--groups", type=int, default=6, help="groups per branch")
+    parser.add_argument("--staff", type=int, default=20, help="staff per branch")
+    parser.add_argument("--visits", type=int, default=6, help="visits per staff member and day")
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--mini", type=int, default=60, help="concurrent mini-app clients")
+    parser.add_argument("--dashboard", type=int, default=8, help="concurrent dashboard clients")
+    parser.add_argument("--yclients-ms", type=float, default=500.0, help="latency of the YCLIENTS stand-in")
+    parser.add_argument("--workers", type=int, default=8, help="DB_ASYNC_WORKERS of the dedicated run")
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.prepare:
+        return _prepare(args)
+
+    from ..testing.fake_yclients import FakeScale, FaultConfig, SyntheticData, create_app, serve_in_thread
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fake_port = _free_port()
+        env = dict(os.environ)
+        env.pop("DATABASE_URL", None)
+        env.update(
+            {
+                "DATA_DIR": tmp,
+                "DB_PATH": str(Path(tmp) / "app.db"),
+                "HISTORICAL_DB_PATH": str(Path(tmp) / "historical.db"),
+                "GROUP_CONFIG_PATH": str(Path(tmp) / "groups.json"),
+                "GROUP_CONFIG_RESOLVED_PATH": str(Path(tmp) / "groups.json"),
+                "ENABLE_SCHEDULER": "0",
+                "ETL_RESUME_ON_START": "0",
+                "ADMIN_PASS": _PASSWORD,
+                "YCLIENTS_BASE_URL": f"http://127.0.0.1:{fake_port}",
+                "YCLIENTS_PARTNER_TOKEN": "fake",
+                "YCLIENTS_USER_TOKEN": "fake",
+                "YCLIENTS_CACHE": "0",
+                "YCLIENTS_RATE_LIMIT": "10000",
+                "YCLIENTS_RATE_BURST": "10000",
+                "YCLIENTS_POOL_SIZE": str(max(10, args.mini)),
+            }
+        )
+        argv = [sys.executable, "-m", "backend.bench.async_load_bench", "--prepare"]
+        for name in ("branches", "groups", "staff", "visits", "days"):
+            argv += [f"--{name}", str(getattr(args, name))]
+        prepared = subprocess.run(argv, env=env, capture_output=True, text=True, check=True)
+        months = json.loads(prepared.stdout.strip().splitlines()[-1])["months"]
+        config = json.loads(Path(env["GROUP_CONFIG_PATH"]).read_text(encoding="utf-8"))
+
+        data = SyntheticData(FakeScale(branches=args.branches, staff=args.staff, days=args.days), config)
+        fake = serve_in_thread(create_app(data, FaultConfig(latency_ms=args.yclients_ms)), port=fake_port)
+        try:
+            results = {
+                "shared": _run_mode(args, env, 0, config, months),
+                "dedicated": _run_mode(args, env, args.workers, config, months),
+            }
+        finally:
+            fake.should_exit = True
+
+    for mode, result in results.items():
+        print(
+            f"[bench] {mode:<9}: dashboard {result['dashboard_rps']:.1f} req/s p50={result['p50_ms']:.0f}ms"
+            f" p95={result['p95_ms']:.0f}ms max={result['max_ms']:.0f}ms errors={result['errors']}"
+            f" | mini {result['mini_rps']:.1f} req/s | executor {result['executor']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""Compare executemany and COPY-staging upserts on Postgres.
+
+    DATABASE_URL=postgresql://... python -m backend.bench.copy_bench --rows 100000
+
+Works on a scratch table shaped like staff_hour_busy (dropped afterwards):
+each path loads ``--rows`` new rows, then rewrites all of them with changed
+values, so both the insert and the ON CONFLICT update branches are timed.
+Both paths must leave identical table contents.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import time
+from datetime import date, timedelta
+from typing import Sequence
+
+from ..app.db import USE_POSTGRES, get_conn, upsert_sql
+
+TABLE = "bench_copy_load"
+COLUMNS = ["branch_id", "staff_id", "date", "hour", "busy_flag", "in_benchmark", "in_gray", "busy_minutes"]
+KEY = ["branch_id", "staff_id", "date", "hour"]
+START = date(2025, 1, 1)
+
+
+def _rows(count: int, shift: int) -> list[tuple]:
+    rows = []
+    for index in range(count):
+        hour = index % 24
+        day = index // 24
+        day_text = (START + timedelta(days=day // 50)).isoformat()
+        busy = (index + shift) % 3 == 0
+        rows.append((1000, day % 50, day_text, hour, int(busy), 1, 0, float((index + shift) % 61) if busy else 0.0))
+    return rows
+
+
+def _digest(conn) -> str:
+    digest = hashlib.sha256()
+    cur = conn.execute(f"SELECT {', '.join(COLUMNS)} FROM {TABLE} ORDER BY {', '.join(KEY)}")
+    for row in cur.fetchall():
+        digest.update(repr(tuple(row[col] for col in COLUMNS)).encode())
+    return digest.hexdigest()
+
+
+def _run(conn, rows: list[tuple], changed: list[tuple], copy: bool) -> tuple[float, float, str]:
+    sql = upsert_sql(TABLE, COLUMNS, KEY)
+    if not copy:
+        sql = str(sql)  # a plain string never takes the COPY path
+    conn.execute(f"TRUNCATE {TABLE}")
+    conn.commit()
+    timings = []
+    for batch in (rows, changed):
+        started = time.perf_counter()
+        conn.executemany(sql, batch)
+        conn.commit()
+        timings.append(time.perf_counter() - started)
+    return timings[0], timings[1], _digest(conn)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    if not USE_POSTGRES:
+        print("[bench] DATABASE_URL must point to Postgres")
+        return 2
+
+    rows = _rows(args.rows, 0)
+    changed = _rows(args.rows, 1)
+    with get_conn() as conn:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                branch_id INTEGER NOT NULL,
+                staff_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                hour INTEGER NOT NULL,
+                busy_flag INTEGER NOT NULL,
+                in_benchmark INTEGER NOT NULL,
+                in_gray INTEGER NOT NULL,
+                busy_minutes REAL,
+                PRIMARY KEY (branch_id, staff_id, date, hour)
+            )
+            """
+        )
+        conn.commit()
+        try:
+            results = {label: _run(conn, rows, changed, copy) for label, copy in (("executemany", False), ("copy", True))}
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            conn.commit()
+
+    for label, (insert_s, update_s, _) in results.items():
+        print(
+            f"[bench] {label:<11}: insert {args.rows} rows {insert_s:.2f}s ({args.rows / insert_s:,.0f}/s),"
+            f" update {update_s:.2f}s ({args.rows / update_s:,.0f}/s)"
+        )
+    if results["executemany"][2] != results["copy"][2]:
+        print("[bench] MISMATCH between executemany and copy contents")
+        return 1
+    print("[bench] table contents identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
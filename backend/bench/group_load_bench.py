@@ -0,0 +1,185 @@
+"""Compare dense and sparse group_hour_load storage: table size and read latency.
+
+    python -m backend.bench.group_load_bench --branches 5 --groups 6 --days 365
+
+Each mode runs in its own process against a fresh SQLite database (settings
+are read from the environment at import time). The endpoint responses of
+both modes must be identical.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Sequence
+
+from .occupancy_bench import synthetic_visits
+
+
+def _branch_data(args, seed_offset: int = 0) -> tuple[dict, dict[int, list[dict]]]:
+    per_day = args.staff * args.visits
+    records_by_branch: dict[int, list[dict]] = {}
+    branches = []
+    for index in range(args.branches):
+        branch_id = 1000 + index
+        # About 80% of generated visits are attended.
+        records = synthetic_visits(int(args.days * per_day * 0.8), staff=args.staff, per_staff_day=args.visits, seed=index + 1 + seed_offset)
+        records_by_branch[branch_id] = records
+        staff_ids = sorted({rec["staff_id"] for rec in records})
+        size = -(-len(staff_ids) // args.groups)
+        groups = [
+            {"group_id": f"{branch_id}-{g}", "name": f"Группа {g + 1}", "staff_ids": staff_ids[g * size : (g + 1) * size]}
+            for g in range(args.groups)
+        ]
+        branches.append({"branch_id": branch_id, "display_name": f"Филиал {index + 1}", "groups": groups})
+    return {"branches": branches}, records_by_branch
+
+
+def _table_sizes(conn) -> dict[str, int | None]:
+    sizes: dict[str, int | None] = {}
+    for table in ("group_hour_load", "group_day_staff"):
+        try:
+            row = conn.execute("SELECT SUM(pgsize) AS size FROM dbstat WHERE name = ?", (table,)).fetchone()
+            sizes[table] = int(row["size"] or 0)
+        except Exception:  # noqa: BLE001
+            sizes[table] = None
+    return sizes
+
+
+def _child(args) -> int:
+    config, records_by_branch = _branch_data(args)
+    Path(os.environ["GROUP_CONFIG_PATH"]).write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    from ..app import etl, main as app_main
+    from ..app.db import get_conn, init_db
+    from ..app.occupancy import staff_hour_rows
+    from ..app.utils import daterange
+
+    init_db()
+    started = time.perf_counter()
+    months: set[str] = set()
+    for branch_id, records in records_by_branch.items():
+        date_from = min(rec["start_dt"] for rec in records).date()
+        date_to = max(rec["end_dt"] for rec in records).date()
+        months |= {day.isoformat()[:7] for day in daterange(date_from, date_to)}
+        etl._rebuild_group_hour_load(branch_id, config, date_from, date_to, staff_hour_rows(branch_id, records))
+    write_seconds = time.perf_counter() - started
+
+    with get_conn() as conn:
+        conn.execute("VACUUM")
+        rows = conn.execute("SELECT COUNT(*) AS cnt FROM group_hour_load").fetchone()["cnt"]
+        sizes = _table_sizes(conn)
+
+    digest = hashlib.sha256()
+    calls = 0
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for branch in config["branches"]:
+            for group in branch["groups"]:
+                for month in sorted(months):
+                    month_resp = app_main._heatmap_month_payload(branch["branch_id"], group["group_id"], month)
+                    summary_resp = app_main._summary_month_payload(branch["branch_id"], group["group_id"], month)
+                    digest.update(json.dumps([month_resp, summary_resp], sort_keys=True).encode())
+                    calls += 1
+    month_seconds = (time.perf_counter() - started) / calls
+    years = sorted({int(m[:4]) for m in months})
+    started = time.perf_counter()
+    overview = app_main._heatmap_summary_payload(years[0], years[-1])
+    overview_seconds = time.perf_counter() - started
+    digest.update(json.dumps(overview, sort_keys=True).encode())
+
+    print(
+        json.dumps(
+            {
+                "rows": rows,
+                "sizes": sizes,
+                "write_s": write_seconds,
+                "month_ms": month_seconds * 1000,
+                "overview_ms": overview_seconds * 1000,
+                "digest": digest.hexdigest(),
+            }
+        )
+    )
+    return 0
+
+
+def _run_mode(args, sparse: bool, workdir: Path) -> dict:
+    mode_dir = workdir / ("sparse" if sparse else "dense")
+    mode_dir.mkdir()
+    env = dict(os.environ)
+    env.pop("DATABASE_URL", None)
+    env.update(
+        {
+            "DATA_DIR": str(mode_dir),
+            "DB_PATH": str(mode_dir / "app.db"),
+            "GROUP_CONFIG_PATH": str(mode_dir / "groups.json"),
+            "GROUP_CONFIG_RESOLVED_PATH": str(mode_dir / "groups.json"),
+            "GROUP_LOAD_SPARSE": "1" if sparse else "0",
+            "ENABLE_SCHEDULER": "0",
+        }
+    )
+    argv = [
+        sys.executable,
+        "-m",
+        "backend.bench.group_load_bench",
+        "--child",
+        "--branches",
+        str(args.branches),
+        "--groups",
+        str(args.groups),
+        "--staff",
+        str(args.staff),
+        "--visits",
+        str(args.visits),
+        "--days",
+        str(args.days),
+        "--repeat",
+        str(args.repeat),
+    ]
+    result = subprocess.run(argv, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _kb(value: int | None) -> str:
+    return "n/a" if value is None else f"{value / 1024:.0f} KB"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=5)
+    parser.add_argument("--groups", type=int, default=6, help="groups per branch")
+    parser.add_argument("--staff", type=int, default=20, help="staff per branch")
+    parser.add_argument("--visits", type=int, default=6, help="visits per staff member and day")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return _child(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dense = _run_mode(args, False, Path(tmp))
+        sparse = _run_mode(args, True, Path(tmp))
+    for label, result in (("dense ", dense), ("sparse", sparse)):
+        sizes = result["sizes"]
+        print(
+            f"[bench] {label}: group_hour_load rows={result['rows']} size={_kb(sizes['group_hour_load'])}"
+            f" group_day_staff={_kb(sizes['group_day_staff'])} write={result['write_s']:.2f}s"
+            f" month+summary={result['month_ms']:.2f}ms overview={result['overview_ms']:.1f}ms"
+        )
+    if dense["digest"] != sparse["digest"]:
+        print("[bench] MISMATCH between dense and sparse responses")
+        return 1
+    print("[bench] responses identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
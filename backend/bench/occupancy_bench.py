@@ -0,0 +1,91 @@
+"""Benchmark the staff_hour_busy and group_hour_load engines against the pure-Python paths.
+
+    python -m backend.bench.occupancy_bench --visits 120000 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date
+from typing import Sequence
+
+from ..app.etl import _normalize_records
+from ..testing.fake_yclients import FakeScale, SyntheticData
+from ..app.occupancy import _group_hour_rows_py, _staff_hour_rows_py, group_hour_rows, np, staff_hour_rows
+
+
+def synthetic_visits(visits: int, staff: int = 20, per_staff_day: int = 6, seed: int = 1) -> list[dict]:
+    """Normalized (attended) records from the fake YCLIENTS generator, at least ``visits`` long."""
+    per_day = staff * per_staff_day
+    # About 80% of generated visits are attended and survive normalization.
+    days = max(1, -(-visits * 3 // (per_day * 2)))
+    data = SyntheticData(FakeScale(branches=1, staff=staff, days=days, visits=per_staff_day, start=date(2024, 1, 1), seed=seed))
+    branch_id = next(iter(data.branches))
+    raw: list[dict] = []
+    page = 1
+    while True:
+        items, total = data.records(branch_id, None, None, page, 1000)
+        raw.extend(items)
+        if page * 1000 >= total:
+            break
+        page += 1
+    return _normalize_records(branch_id, raw)[:visits]
+
+
+def synthetic_groups(records: list[dict], size: int = 5) -> list[dict]:
+    """Consecutive staff in groups of ``size`` plus one group spanning everyone."""
+    staff_ids = sorted({rec["staff_id"] for rec in records})
+    groups = [
+        {"group_id": f"g{i // size}", "staff_ids": staff_ids[i : i + size]} for i in range(0, len(staff_ids), size)
+    ]
+    groups.append({"group_id": "all", "staff_ids": staff_ids})
+    return groups
+
+
+def _best_of(repeat: int, fn) -> tuple[float, list]:
+    best = float("inf")
+    result: list = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--visits", type=int, default=120_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("[bench] numpy is not installed; nothing to compare")
+        return 1
+    records = synthetic_visits(args.visits)
+    py_time, py_rows = _best_of(args.repeat, lambda: _staff_hour_rows_py(1, records))
+    np_time, np_rows = _best_of(args.repeat, lambda: staff_hour_rows(1, records))
+    if sorted(py_rows) != sorted(np_rows):
+        print("[bench] MISMATCH between Python and NumPy rows")
+        return 1
+    print(f"[bench] visits={len(records)} rows={len(np_rows)}")
+    print(f"[bench] python loop : {py_time:.3f}s")
+    print(f"[bench] numpy engine: {np_time:.3f}s ({py_time / np_time:.1f}x)")
+
+    groups = synthetic_groups(records)
+    date_from = min(rec["start_dt"] for rec in records).date()
+    date_to = max(rec["end_dt"] for rec in records).date()
+    staff_rows = np_rows
+    py_time, py_rows = _best_of(args.repeat, lambda: _group_hour_rows_py(1, groups, date_from, date_to, staff_rows))
+    np_time, np_rows = _best_of(args.repeat, lambda: group_hour_rows(1, groups, date_from, date_to, staff_rows))
+    if py_rows != np_rows:
+        print("[bench] MISMATCH between Python and NumPy group rows")
+        return 1
+    print(f"[bench] groups={len(groups)} days={(date_to - date_from).days + 1} rows={len(np_rows)}")
+    print(f"[bench] group bitmasks: {py_time:.3f}s")
+    print(f"[bench] group matrix  : {np_time:.3f}s ({py_time / np_time:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+"""Capture the SQL of the hot read paths and check their EXPLAIN QUERY PLAN.
+
+    python -m backend.bench.query_plans --branches 3 --days 180
+
+A child process fills a fresh SQLite database (migrated to the latest
+schema version) with synthetic records, aggregates, historical loads,
+goods and ETL runs, then calls the heatmap summary/status endpoints, the
+ETL status endpoints, the goods search, the ETL's raw-record readers and
+the reaggregation's staff-hour reader while a trace callback records every
+statement they execute. Each captured statement is printed with its query
+plan. The run fails when a statement listed in CHECKS is missing from the
+workload or does not use its index. Each checked statement is then timed
+with and without the indexes of the hot_query_indexes/summary_index
+migrations. tests/test_query_plans.py runs the same checks on a small
+workload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Sequence
+
+from .group_load_bench import _branch_data
+
+# (label, fragment of the whitespace-normalized statement, index its plan must use)
+CHECKS = [
+    ("summary load", "AS load_sum, COUNT(*) AS cells FROM group_hour_load", "idx_group_hour_load_date"),
+    ("summary cells", "COUNT(*) AS days FROM group_day_staff", "idx_group_day_staff_date"),
+    ("summary historical", "FROM historical_loads WHERE month BETWEEN", "idx_hist_summary"),
+    ("status cells", "COUNT(*) * 16 as cnt FROM group_day_staff", "idx_group_day_staff_date"),
+    ("status last update", "MAX(updated_at) as last_updated FROM raw_records", "idx_raw_records_updated"),
+    ("status last run", "FROM etl_runs ORDER BY started_at DESC LIMIT 1", "idx_etl_runs_started"),
+    ("full runs", "FROM etl_runs WHERE run_type =", "idx_etl_runs_type_started"),
+    ("watermark", "MAX(updated_at) AS max_updated FROM raw_records", "idx_raw_records_updated"),
+    ("incremental input", "SELECT staff_id, start_dt, end_dt FROM raw_records", "idx_raw_records_start"),
+    ("reaggregate input", "in_gray, busy_minutes FROM staff_hour_busy WHERE", "sqlite_autoindex_staff_hour_busy_1"),
+    ("goods search", "AND LOWER(title) LIKE", "idx_goods_cache_title"),
+]
+
+EMPTY_BRANCH = 999
+
+
+def _normalize(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _plan(conn, sql: str) -> str:
+    return "; ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall())
+
+
+def _timed(conn, sql: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _fill(args, config: dict, records_by_branch: dict[int, list[dict]]) -> None:
+    from ..app import etl
+    from ..app.db import get_conn, get_hist_conn
+    from ..app.occupancy import staff_hour_rows
+    from .sqlite_profile_bench import _write_months
+
+    _write_months(etl, staff_hour_rows, config, records_by_branch)
+    with get_conn() as conn:
+        conn.executemany(
+            "INSERT INTO goods_cache (branch_id, good_id, title, price, unit, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (branch_id, good_id, f"Товар {good_id} серия {good_id % 97}", 100.0 + good_id, "шт", "2025-01-01T00:00:00")
+                for branch_id in records_by_branch
+                for good_id in range(args.goods)
+            ],
+        )
+        first = date(2025, 1, 1)
+        conn.executemany(
+            "INSERT INTO etl_runs (run_id, run_type, branch_id, started_at, finished_at, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    f"run-{index}",
+                    "full_2025" if index % 10 == 0 else "incremental",
+                    list(records_by_branch)[index % len(records_by_branch)],
+                    (first + timedelta(hours=index)).isoformat(),
+                    (first + timedelta(hours=index, minutes=5)).isoformat(),
+                    "success",
+                )
+                for index in range(args.runs)
+            ],
+        )
+        conn.commit()
+    with get_hist_conn() as conn:
+        rows = []
+        for branch_id in records_by_branch:
+            day = date(2024, 1, 1)
+            while day <= date(2025, 2, 28):
+                for resource in ("ЗАЛ ПК", "ЗАЛ МК", "КАБ К/М"):
+                    for hour in range(8, 24):
+                        rows.append((branch_id, day.strftime("%Y-%m"), resource, day.isoformat(), day.weekday(), hour, 50.0))
+                day += timedelta(days=1)
+        conn.executemany(
+            "INSERT INTO historical_loads (branch_id, month, resource_type, date, dow, hour, load_pct) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+
+
+def capture_workload(args, config_path: Path) -> dict[str, str]:
+    """Fill the configured databases and return the SELECTs of the hot read paths, one per shape.
+
+    Maps each statement to the database it ran on (``app`` or ``historical``).
+    """
+    config, records_by_branch = _branch_data(args)
+    config["branches"].append({"branch_id": EMPTY_BRANCH, "display_name": "Без записей", "groups": []})
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    from ..app import etl, main as app_main
+    from ..app.db import get_conn, get_hist_conn, init_db, init_historical_db
+
+    init_db()
+    init_historical_db()
+    _fill(args, config, records_by_branch)
+
+    captured: list[tuple[str, str]] = []
+    with get_conn() as conn, get_hist_conn() as hist_conn:
+        # Per-thread pools hand the same connections to the calls below.
+        for db, raw in (("app", conn._conn), ("historical", hist_conn._conn)):
+            raw.execute("ANALYZE")
+            raw.set_trace_callback(lambda sql, db=db: captured.append((db, _normalize(sql))))
+
+    request = SimpleNamespace(session={"user": "bench"})
+    years = sorted({rec["start_dt"].year for records in records_by_branch.values() for rec in records})
+    app_main._heatmap_summary_payload(min(years[0], 2024), years[-1])
+    for branch_id, records in records_by_branch.items():
+        month = records[len(records) // 2]["start_dt"].strftime("%Y-%m")
+        app_main.api_heatmap_status(branch_id, month, request)
+        app_main._goods_cache_search(branch_id, "серия 4", 20)
+        etl._get_watermark(branch_id)
+        day = records[len(records) // 2]["start_dt"].date()
+        etl._load_raw_records(branch_id, day, day + timedelta(days=30))
+        staff_ids = sorted({rec["staff_id"] for rec in records})[:3]
+        etl._load_staff_hour_rows(branch_id, day, day + timedelta(days=30), staff_ids)
+    # A branch without records falls back to the latest ETL run.
+    app_main.api_heatmap_status(EMPTY_BRANCH, month, request)
+    app_main.api_status(request)
+    app_main.api_full_last(request)
+
+    with get_conn() as conn, get_hist_conn() as hist_conn:
+        for raw in (conn._conn, hist_conn._conn):
+            raw.set_trace_callback(None)
+    # One statement per shape: the same query for another branch adds nothing.
+    shapes: dict[str, tuple[str, str]] = {}
+    for db, sql in captured:
+        if sql.upper().startswith("SELECT"):
+            shapes.setdefault(re.sub(r"'[^']*'|\b\d+\b", "?", sql), (sql, db))
+    return dict(shapes.values())
+
+
+def check_plans(statements: dict[str, str], conns: dict) -> tuple[list[str], list[tuple[str, str, str]]]:
+    """Failures of the CHECKS against the captured statements, and the (label, sql, db) checked."""
+    failures = []
+    checked = []
+    for label, fragment, index in CHECKS:
+        matches = [(sql, db) for sql, db in statements.items() if fragment in sql]
+        if not matches:
+            failures.append(f"{label}: no captured statement contains {fragment!r}")
+            continue
+        sql, db = matches[0]
+        plan = _plan(conns[db], sql)
+        if f"INDEX {index}" not in plan:
+            failures.append(f"{label}: expected {index}, plan was {plan}")
+        checked.append((label, sql, db))
+    return failures, checked
+
+
+def _child(args) -> int:
+    from ..app.db import APP_MIGRATIONS, HISTORICAL_MIGRATIONS, get_conn, get_hist_conn
+
+    statements = capture_workload(args, Path(os.environ["GROUP_CONFIG_PATH"]))
+    with get_conn() as conn, get_hist_conn() as hist_conn:
+        conns = {"app": conn._conn, "historical": hist_conn._conn}
+        print("[plans] captured workload:")
+        for sql, db in statements.items():
+            plan = _plan(conns[db], sql)
+            print(f"  {sql[:110]}\n    -> {plan}")
+        failures, checked = check_plans(statements, conns)
+
+        timings = {label: [_timed(conns[db], sql, args.repeat)] for label, sql, db in checked}
+        # Primary key indexes cannot be dropped; their timings stay alike.
+        dropped = {index for _, _, index in CHECKS if not index.startswith("sqlite_autoindex_")}
+        for db, raw in conns.items():
+            for (name,) in raw.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall():
+                if name in dropped:
+                    raw.execute(f"DROP INDEX {name}")
+        for label, sql, db in checked:
+            timings[label].append(_timed(conns[db], sql, args.repeat))
+
+    print("[plans] best of", args.repeat, "runs, with / without the indexes:")
+    for label, (with_ms, without_ms) in timings.items():
+        print(f"  {label:<20} {with_ms:8.2f}ms {without_ms:8.2f}ms")
+    print(f"[plans] migrations: app v{APP_MIGRATIONS[-1].version}, historical v{HISTORICAL_MIGRATIONS[-1].version}")
+    for failure in failures:
+        print(f"[plans] FAIL {failure}")
+    if failures:
+        return 1
+    print(f"[plans] all {len(CHECKS)} checked statements use their indexes")
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=3)
+    parser.add_argument("--groups", type=int, default=6, help="groups per branch")
+    parser.add_argument("--staff", type=int, default=20, help="staff per branch")
+    parser.add_argument("--visits", type=int, default=6, help="visits per staff member and day")
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--goods", type=int, default=3000, help="goods per branch")
+    parser.add_argument("--runs", type=int, default=500, help="etl_runs rows")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return _child(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.pop("DATABASE_URL", None)
+        env.update(
+            {
+                "DATA_DIR": tmp,
+                "DB_PATH": str(Path(tmp) / "app.db"),
+                "HISTORICAL_DB_PATH": str(Path(tmp) / "historical.db"),
+                "GROUP_CONFIG_PATH": str(Path(tmp) / "groups.json"),
+                "GROUP_CONFIG_RESOLVED_PATH": str(Path(tmp) / "groups.json"),
+                "ENABLE_SCHEDULER": "0",
+            }
+        )
+        argv = [sys.executable, "-m", "backend.bench.query_plans", "--child"]
+        for name in ("branches", "groups", "staff", "visits", "days", "goods", "runs", "repeat"):
+            argv += [f"--{name}", str(getattr(args, name))]
+        return subprocess.run(argv, env=env).returncode
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
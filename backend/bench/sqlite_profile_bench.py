@@ -0,0 +1,155 @@
+"""Compare SQLite tuning profiles on the ETL write path and /api/heatmap/summary.
+
+    python -m backend.bench.sqlite_profile_bench --branches 5 --days 365
+
+Each profile (SQLITE_PROFILE=default, then tuned) runs in its own process
+against a fresh database. The ETL phase writes raw_records, staff_hour_busy
+and group_hour_load month by month, one commit per month as the full load
+does, then rewrites everything from a different seed so the diff writer
+updates most rows. The summary endpoint is then called ``--repeat`` times.
+Both profiles must produce identical responses. Use ``--workdir`` to put
+the databases on the disk the app uses: on tmpfs or a VM with a write-back
+cache, fsync is nearly free and synchronous=NORMAL shows no gain.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Sequence
+
+from .group_load_bench import _branch_data
+
+
+def _write_months(etl, staff_hour_rows, config: dict, records_by_branch: dict[int, list[dict]]) -> float:
+    started = time.perf_counter()
+    for branch_id, records in records_by_branch.items():
+        by_month: dict[str, list[dict]] = {}
+        for rec in records:
+            by_month.setdefault(rec["start_dt"].strftime("%Y-%m"), []).append(rec)
+        for month in sorted(by_month):
+            chunk = by_month[month]
+            date_from = min(rec["start_dt"] for rec in chunk).date()
+            date_to = max(rec["end_dt"] for rec in chunk).date()
+            etl._upsert_raw_records([etl._to_raw_row(rec) for rec in chunk])
+            rows = staff_hour_rows(branch_id, chunk)
+            etl._write_staff_hour_busy(branch_id, date_from, date_to, rows)
+            etl._rebuild_group_hour_load(branch_id, config, date_from, date_to, rows)
+    return time.perf_counter() - started
+
+
+def _child(args) -> int:
+    config, records_by_branch = _branch_data(args)
+    Path(os.environ["GROUP_CONFIG_PATH"]).write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+
+    from ..app import etl, main as app_main
+    from ..app.db import get_conn, init_db
+    from ..app.occupancy import staff_hour_rows
+
+    init_db()
+    insert_seconds = _write_months(etl, staff_hour_rows, config, records_by_branch)
+    # Same branches, staff and dates, different visits: mostly updates.
+    _, rewritten = _branch_data(args, seed_offset=100)
+    rewrite_seconds = _write_months(etl, staff_hour_rows, config, rewritten)
+    with get_conn() as conn:
+        rows = conn.execute("SELECT COUNT(*) AS cnt FROM staff_hour_busy").fetchone()["cnt"]
+
+    years = sorted({rec["start_dt"].year for records in rewritten.values() for rec in records})
+    timings = []
+    digest = hashlib.sha256()
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        response = app_main._heatmap_summary_payload(years[0], years[-1])
+        timings.append(time.perf_counter() - started)
+        digest.update(json.dumps(response, sort_keys=True).encode())
+
+    print(
+        json.dumps(
+            {
+                "rows": rows,
+                "insert_s": insert_seconds,
+                "rewrite_s": rewrite_seconds,
+                "summary_first_ms": timings[0] * 1000,
+                "summary_best_ms": min(timings) * 1000,
+                "digest": digest.hexdigest(),
+            }
+        )
+    )
+    return 0
+
+
+def _run_profile(args, profile: str, workdir: Path) -> dict:
+    profile_dir = workdir / profile
+    profile_dir.mkdir()
+    env = dict(os.environ)
+    env.pop("DATABASE_URL", None)
+    env.update(
+        {
+            "DATA_DIR": str(profile_dir),
+            "DB_PATH": str(profile_dir / "app.db"),
+            "GROUP_CONFIG_PATH": str(profile_dir / "groups.json"),
+            "GROUP_CONFIG_RESOLVED_PATH": str(profile_dir / "groups.json"),
+            "SQLITE_PROFILE": profile,
+            "ENABLE_SCHEDULER": "0",
+        }
+    )
+    argv = [
+        sys.executable,
+        "-m",
+        "backend.bench.sqlite_profile_bench",
+        "--child",
+        "--branches",
+        str(args.branches),
+        "--groups",
+        str(args.groups),
+        "--staff",
+        str(args.staff),
+        "--visits",
+        str(args.visits),
+        "--days",
+        str(args.days),
+        "--repeat",
+        str(args.repeat),
+    ]
+    result = subprocess.run(argv, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--branches", type=int, default=5)
+    parser.add_argument("--groups", type=int, default=6, help="groups per branch")
+    parser.add_argument("--staff", type=int, default=20, help="staff per branch")
+    parser.add_argument("--visits", type=int, default=6, help="visits per staff member and day")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workdir", help="directory for the scratch databases (default: system temp)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return _child(args)
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp:
+        results = {profile: _run_profile(args, profile, Path(tmp)) for profile in ("default", "tuned")}
+    for profile, result in results.items():
+        print(
+            f"[bench] {profile:<7}: staff_hour_busy rows={result['rows']} etl insert={result['insert_s']:.2f}s"
+            f" rewrite={result['rewrite_s']:.2f}s summary first={result['summary_first_ms']:.1f}ms"
+            f" best={result['summary_best_ms']:.1f}ms"
+        )
+    if results["default"]["digest"] != results["tuned"]["digest"]:
+        print("[bench] MISMATCH between profiles")
+        return 1
+    print("[bench] responses identical")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,673 @@
+"""Offline stand-in for the YCLIENTS API.
+
+Serves deterministic synthetic data (branches x staff x days x visits) for the
+endpoints the app uses, with optional latency, 429/5xx fault injection and
+replay of responses captured in the API debug log (``API_LOG_ALL=1``).
+
+    python -m backend.testing.fake_yclients --port 8900 --days 365 --latency-ms 40
+    YCLIENTS_BASE_URL=http://127.0.0.1:8900 YCLIENTS_PARTNER_TOKEN=fake uvicorn backend.app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Sequence
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ..app.api_log import ApiLogWriter
+from ..app.config import settings
+
+_DAY_START_MIN = 9 * 60
+_LENGTHS_MIN = (30, 45, 60, 60, 90, 120)
+_GAPS_MIN = (0, 0, 15, 30, 60)
+# Weights for attendance 1 (пришёл), 2 (подтвердил), 0 (ожидание), -1 (не пришёл).
+_ATTENDANCE = ((1, 2, 0, -1), (70, 10, 12, 8))
+_GOODS_PER_BRANCH = 60
+
+
+@dataclass(frozen=True)
+class FakeScale:
+    branches: int = 5
+    staff: int = 20
+    days: int = 365
+    visits: int = 6
+    start: date = date(2025, 1, 1)
+    seed: int = 1
+
+
+@dataclass(frozen=True)
+class FakeBranch:
+    index: int
+    id: int
+    title: str
+    staff: tuple[tuple[int, str], ...]
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    rate_limit: float = 0.0
+    retry_after: float = 1.0
+
+
+def _load_group_config(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8-sig"))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+class SyntheticData:
+    """Deterministic record generator; the same scale and seed give the same data.
+
+    Branch ids and staff names come from the group config when it is available,
+    so the ETL resolves staff exactly as against the real API. Records are
+    generated per (branch, day) on demand, cached per instance, and only the
+    requested page is built.
+    """
+
+    def __init__(self, scale: FakeScale, group_config: dict | None = None) -> None:
+        self.scale = scale
+        self.tz = ZoneInfo(settings.timezone)
+        self.branches: dict[int, FakeBranch] = {}
+        configured = (group_config or {}).get("branches") or []
+        for index in range(max(1, scale.branches)):
+            conf = configured[index] if index < len(configured) else {}
+            branch_id = int(conf.get("branch_id") or 100001 + index)
+            names: list[str] = []
+            for group in conf.get("groups") or []:
+                for name in group.get("staff_names") or []:
+                    if name and name not in names:
+                        names.append(name)
+            while len(names) < scale.staff:
+                names.append(f"Мастер {len(names) + 1}")
+            staff = tuple(((index + 1) * 100000 + n + 1, name) for n, name in enumerate(names))
+            title = conf.get("display_name") or f"Филиал {index + 1}"
+            self.branches[branch_id] = FakeBranch(index, branch_id, title, staff)
+        self._lock = threading.Lock()
+        self._overrides: dict[int, dict[str, Any]] = {}
+        self._consumables: dict[int, list[dict]] = {}
+        self._next_tx_id = 1
+        self._days: dict[tuple[int, int], tuple[dict, ...]] = {}
+
+    @property
+    def end(self) -> date:
+        return self.scale.start + timedelta(days=max(1, self.scale.days) - 1)
+
+    def per_day(self, branch: FakeBranch) -> int:
+        return len(branch.staff) * max(0, self.scale.visits)
+
+    def _record_id(self, branch: FakeBranch, day_index: int, n: int) -> int:
+        return (branch.index + 1) * 10**10 + day_index * 10**5 + n
+
+    def _decode_record_id(self, record_id: int) -> tuple[FakeBranch, int, int] | None:
+        index = record_id // 10**10 - 1
+        day_index, n = divmod(record_id % 10**10, 10**5)
+        for branch in self.branches.values():
+            if branch.index == index and 0 <= day_index < self.scale.days and n < self.per_day(branch):
+                return branch, day_index, n
+        return None
+
+    def _day_records(self, branch_id: int, day_index: int) -> tuple[dict, ...]:
+        # Deterministic, so two threads building the same day at once is harmless.
+        records = self._days.get((branch_id, day_index))
+        if records is None:
+            records = self._days[(branch_id, day_index)] = self._build_day_records(branch_id, day_index)
+        return records
+
+    def _build_day_records(self, branch_id: int, day_index: int) -> tuple[dict, ...]:
+        branch = self.branches[branch_id]
+        day = self.scale.start + timedelta(days=day_index)
+        rng = random.Random(f"{self.scale.seed}:{branch_id}:{day_index}")
+        records: list[dict] = []
+        for staff_id, staff_name in branch.staff:
+            cursor = _DAY_START_MIN + rng.choice((0, 15, 30))
+            for _ in range(self.scale.visits):
+                length = rng.choice(_LENGTHS_MIN)
+                start_min = min(cursor, 24 * 60 - length)
+                cursor += length + rng.choice(_GAPS_MIN)
+                start = datetime(day.year, day.month, day.day, tzinfo=self.tz) + timedelta(minutes=start_min)
+                record_id = self._record_id(branch, day_index, len(records))
+                attendance = rng.choices(*_ATTENDANCE)[0]
+                created = start - timedelta(days=rng.randint(0, 14), minutes=rng.randint(0, 600))
+                changed = start + timedelta(minutes=length + rng.randint(0, 120))
+                cost = float(rng.choice((1500, 2000, 2500, 3500, 5000)))
+                records.append(
+                    {
+                        "id": record_id,
+                        "company_id": branch_id,
+                        "staff_id": staff_id,
+                        "staff": {"id": staff_id, "name": staff_name},
+                        "client": {"name": f"Клиент {rng.randint(1, 5000)}", "phone": f"7900{rng.randint(0, 9999999):07d}"},
+                        "services": [
+                            {"id": 1000 + int(cost), "title": f"Услуга {int(cost)}", "cost": cost, "category_id": 1}
+                        ],
+                        "goods_transactions": [],
+                        "documents": [{"id": record_id, "type_id": 7}],
+                        "date": start.strftime("%Y-%m-%d %H:%M:%S"),
+                        "datetime": start.isoformat(),
+                        "seance_length": length * 60,
+                        "length": length * 60,
+                        "attendance": attendance,
+                        "visit_attendance": attendance,
+                        "visit_id": record_id,
+                        "create_date": created.isoformat(),
+                        "last_change_date": min(changed, max(created, datetime.now(tz=self.tz))).isoformat(),
+                        "comment": "",
+                        "deleted": False,
+                    }
+                )
+        return tuple(records)
+
+    def _with_overrides(self, record: dict) -> dict:
+        out = dict(record)
+        with self._lock:
+            patch = self._overrides.get(record["id"])
+            if patch:
+                out.update(json.loads(json.dumps(patch)))
+        return out
+
+    def _day_range(self, start_date: str | None, end_date: str | None) -> range:
+        start = date.fromisoformat(start_date[:10]) if start_date else self.scale.start
+        end = date.fromisoformat(end_date[:10]) if end_date else self.end
+        first = max(0, (start - self.scale.start).days)
+        last = min(self.scale.days - 1, (end - self.scale.start).days)
+        return range(first, last + 1)
+
+    def records(
+        self,
+        branch_id: int,
+        start_date: str | None,
+        end_date: str | None,
+        page: int,
+        count: int,
+        changed_after: str | None = None,
+    ) -> tuple[list[dict], int]:
+        branch = self.branches.get(branch_id)
+        if branch is None:
+            return [], 0
+        days = self._day_range(start_date, end_date)
+        page = max(1, page)
+        count = max(1, count)
+        offset = (page - 1) * count
+        if changed_after:
+            threshold = datetime.fromisoformat(changed_after)
+            if threshold.tzinfo is None:
+                threshold = threshold.replace(tzinfo=self.tz)
+            matched = [
+                record
+                for day_index in days
+                for record in map(self._with_overrides, self._day_records(branch_id, day_index))
+                if datetime.fromisoformat(record["last_change_date"]) > threshold
+            ]
+            return matched[offset: offset + count], len(matched)
+        per_day = self.per_day(branch)
+        total = len(days) * per_day
+        out: list[dict] = []
+        if per_day:
+            day_pos, skip = divmod(offset, per_day)
+            for day_index in days[day_pos:]:
+                out.extend(self._day_records(branch_id, day_index)[skip:])
+                skip = 0
+                if len(out) >= count:
+                    break
+        return [self._with_overrides(record) for record in out[:count]], total
+
+    def record(self, branch_id: int, record_id: int) -> dict | None:
+        decoded = self._decode_record_id(record_id)
+        if decoded is None or decoded[0].id != branch_id:
+            return None
+        branch, day_index, n = decoded
+        return self._with_overrides(self._day_records(branch.id, day_index)[n])
+
+    def _touch(self, record_id: int, **changes: Any) -> None:
+        with self._lock:
+            patch = self._overrides.setdefault(record_id, {})
+            patch.update(changes)
+            patch["last_change_date"] = datetime.now(tz=self.tz).isoformat()
+
+    def update_visit(self, record_id: int, payload: dict) -> dict | None:
+        decoded = self._decode_record_id(record_id)
+        if decoded is None:
+            return None
+        changes: dict[str, Any] = {}
+        if "attendance" in payload:
+            changes["attendance"] = changes["visit_attendance"] = payload["attendance"]
+        if "goods_transactions" in payload:
+            changes["goods_transactions"] = payload["goods_transactions"]
+        if "comment" in payload:
+            changes["comment"] = payload["comment"]
+        self._touch(record_id, **changes)
+        return self.record(decoded[0].id, record_id)
+
+    def add_goods_transaction(self, branch_id: int, payload: dict) -> dict:
+        with self._lock:
+            tx_id = self._next_tx_id
+            self._next_tx_id += 1
+        tx = {"id": tx_id, **payload}
+        record_id = int(payload.get("document_id") or 0)
+        if self.record(branch_id, record_id) is not None:
+            current = self.record(branch_id, record_id).get("goods_transactions") or []
+            self._touch(record_id, goods_transactions=current + [tx])
+        return tx
+
+    def record_consumables(self, record_id: int) -> list[dict]:
+        with self._lock:
+            return list(self._consumables.get(record_id, []))
+
+    def set_record_consumables(self, record_id: int, consumables: list[dict]) -> list[dict]:
+        with self._lock:
+            self._consumables[record_id] = list(consumables)
+        return consumables
+
+    def staff(self, branch_id: int) -> list[dict]:
+        branch = self.branches.get(branch_id)
+        if branch is None:
+            return []
+        return [{"id": staff_id, "name": name, "fired": 0, "hidden": 0} for staff_id, name in branch.staff]
+
+    def companies(self) -> list[dict]:
+        return [{"id": branch.id, "title": branch.title} for branch in self.branches.values()]
+
+    def storages(self, branch_id: int) -> list[dict]:
+        return [{"id": branch_id * 10 + 1, "title": "Основной склад", "for_services": True, "for_sale": True}]
+
+    def goods(self, branch_id: int) -> list[dict]:
+        rng = random.Random(f"{self.scale.seed}:goods:{branch_id}")
+        return [
+            {
+                "good_id": branch_id * 1000 + n,
+                "title": f"Товар {n:03d}",
+                "unit_actual_cost": float(rng.choice((150, 300, 450, 900, 1200))),
+                "service_unit_short_title": "шт",
+            }
+            for n in range(1, _GOODS_PER_BRANCH + 1)
+        ]
+
+    def finance_transactions(self, branch_id: int, start_date: str | None, end_date: str | None) -> list[dict]:
+        if branch_id not in self.branches:
+            return []
+        out: list[dict] = []
+        for day_index in self._day_range(start_date, end_date):
+            for record in self._day_records(branch_id, day_index):
+                if record["attendance"] != 1:
+                    continue
+                out.append(
+                    {
+                        "id": record["id"],
+                        "date": record["date"],
+                        "type_id": 1,
+                        "amount": record["services"][0]["cost"],
+                        "record_id": record["id"],
+                        "account": {"id": 1, "title": "Основная касса", "is_cash": True},
+                    }
+                )
+            day = self.scale.start + timedelta(days=day_index)
+            out.append(
+                {
+                    "id": 9 * 10**14 + branch_id * 1000 + day_index,
+                    "date": f"{day.isoformat()} 20:00:00",
+                    "type_id": 2,
+                    "amount": 5000.0,
+                    "expense": {"id": 1, "title": "Расходники"},
+                    "account": {"id": 1, "title": "Основная касса", "is_cash": True},
+                }
+            )
+        return out
+
+
+def _params_key(method: str, path: str, params: dict[str, Any] | None) -> str:
+    normalized = {str(key): str(value) for key, value in (params or {}).items() if value is not None}
+    return json.dumps([method.upper(), path.rstrip("/"), normalized], sort_keys=True, ensure_ascii=False)
+
+
+class ReplayStore:
+    """Responses captured by ``_log_api_call``, keyed by method, path and params.
+
+    The latest capture of a request wins. Entries logged with an error are
+    replayed with their original status code.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, log_path: Path) -> int:
+        reader = ApiLogWriter(log_path, max_bytes=0, backups=20, rotate_seconds=0, compress=True, queue_size=1)
+        loaded = 0
+        for entry in reader.iter_entries():
+            url = entry.get("url") or ""
+            method = entry.get("method") or "GET"
+            if not url or entry.get("response") is None:
+                continue
+            key = _params_key(method, urlsplit(url).path, entry.get("params"))
+            self._entries[key] = (int(entry.get("status_code") or 200), entry["response"])
+            loaded += 1
+        return loaded
+
+    def lookup(self, method: str, path: str, params: dict[str, Any]) -> tuple[int, Any] | None:
+        found = self._entries.get(_params_key(method, path, params))
+        if found is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+
+class _FaultState:
+    def __init__(self, faults: FaultConfig, seed: int) -> None:
+        self.faults = faults
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: dict[str, deque[float]] = {}
+        self.counters = {"requests": 0, "rate_limited": 0, "throttled": 0, "errors": 0, "replayed": 0}
+
+    def bump(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def over_limit(self, token: str) -> bool:
+        if self.faults.rate_limit <= 0:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._window.setdefault(token, deque())
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+            if len(window) >= self.faults.rate_limit:
+                return True
+            window.append(now)
+            return False
+
+    def roll(self, probability: float) -> bool:
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < probability
+
+    def delay(self) -> float:
+        base = self.faults.latency_ms
+        jitter = self.faults.jitter_ms
+        if base <= 0 and jitter <= 0:
+            return 0.0
+        with self._lock:
+            return max(0.0, base + self._rng.uniform(-jitter, jitter)) / 1000.0
+
+
+def _ok(data: Any, **meta: Any) -> dict[str, Any]:
+    return {"success": True, "data": data, "meta": meta or []}
+
+
+def _not_found(message: str) -> JSONResponse:
+    return JSONResponse({"success": False, "data": None, "meta": {"message": message}}, status_code=404)
+
+
+def _to_int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def create_app(
+    data: SyntheticData,
+    faults: FaultConfig | None = None,
+    replay: ReplayStore | None = None,
+    replay_only: bool = False,
+) -> FastAPI:
+    state = _FaultState(faults or FaultConfig(), data.scale.seed)
+    app = FastAPI(title="Fake YCLIENTS")
+
+    @app.middleware("http")
+    async def gate(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/__fake"):
+            return await call_next(request)
+        state.bump("requests")
+        auth = request.headers.get("authorization") or ""
+        if not auth.startswith("Bearer "):
+            return JSONResponse({"success": False, "meta": {"message": "Unauthorized"}}, status_code=401)
+        token = auth.split(",")[0]
+        retry_after = str(state.faults.retry_after)
+        if state.over_limit(token):
+            state.bump("rate_limited")
+            return PlainTextResponse("Too Many Requests", status_code=429, headers={"Retry-After": retry_after})
+        if state.roll(state.faults.throttle_rate):
+            state.bump("throttled")
+            return PlainTextResponse("Too Many Requests", status_code=429, headers={"Retry-After": retry_after})
+        delay = state.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if state.roll(state.faults.error_rate):
+            state.bump("errors")
+            return PlainTextResponse("Service Unavailable", status_code=503)
+        if replay is not None:
+            found = replay.lookup(request.method, path, dict(request.query_params))
+            if found is not None:
+                state.bump("replayed")
+                status_code, body = found
+                if isinstance(body, str):
+                    return PlainTextResponse(body, status_code=status_code)
+                return JSONResponse(body, status_code=status_code)
+            if replay_only:
+                return _not_found("No recorded response")
+        return await call_next(request)
+
+    @app.get("/__fake/stats")
+    def fake_stats():
+        out: dict[str, Any] = dict(state.counters)
+        out["scale"] = {
+            "branches": len(data.branches),
+            "staff": data.scale.staff,
+            "days": data.scale.days,
+            "visits": data.scale.visits,
+            "start": data.scale.start.isoformat(),
+        }
+        if replay is not None:
+            out["replay"] = {"entries": len(replay), "hits": replay.hits, "misses": replay.misses}
+        return out
+
+    @app.get("/api/v1/records/{company_id}")
+    def records(
+        company_id: int,
+        page: int = 1,
+        count: int = 50,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        changed_after: str | None = None,
+    ):
+        items, total = data.records(company_id, start_date, end_date, page, min(count, 1000), changed_after)
+        return _ok(items, total_count=total)
+
+    @app.get("/api/v1/record/{company_id}/{record_id}")
+    def record(company_id: int, record_id: int):
+        found = data.record(company_id, record_id)
+        if found is None:
+            return _not_found("Record not found")
+        return _ok(found)
+
+    @app.get("/api/v1/company/{company_id}/staff/{staff_id}")
+    def company_staff(company_id: int, staff_id: int):
+        staff = data.staff(company_id)
+        if staff_id:
+            staff = [item for item in staff if item["id"] == staff_id]
+        return _ok(staff)
+
+    @app.get("/api/v1/staff/{company_id}")
+    def staff_legacy(company_id: int):
+        return _ok(data.staff(company_id))
+
+    @app.get("/api/v1/companies")
+    def companies():
+        return _ok(data.companies())
+
+    @app.get("/api/v1/company/{company_id}")
+    def company(company_id: int, include: str | None = None):
+        match = next((item for item in data.companies() if item["id"] == company_id), None)
+        if match is None:
+            return _not_found("Company not found")
+        if include and "storages" in include:
+            match = {**match, "storages": data.storages(company_id)}
+        return _ok(match)
+
+    @app.get("/api/v1/storages/{company_id}")
+    def storages(company_id: int):
+        return _ok(data.storages(company_id))
+
+    @app.get("/api/v1/goods/search/{company_id}")
+    def goods_search(company_id: int, term: str = "", count: int = 30):
+        needle = term.strip().lower()
+        items = [item for item in data.goods(company_id) if needle in item["title"].lower()]
+        return _ok(items[: max(1, count)])
+
+    @app.get("/api/v1/goods/{company_id}/{good_id}")
+    def good(company_id: int, good_id: int):
+        match = next((item for item in data.goods(company_id) if item["good_id"] == good_id), None)
+        if match is None:
+            return _not_found("Good not found")
+        return _ok(match)
+
+    @app.get("/api/v1/goods/{company_id}")
+    def goods(company_id: int, page: int = 1, count: int = 200):
+        items = data.goods(company_id)
+        offset = (max(1, page) - 1) * max(1, count)
+        return _ok(items[offset: offset + max(1, count)], total_count=len(items))
+
+    @app.put("/api/v1/visits/{visit_id}/{record_id}")
+    async def update_visit(visit_id: int, record_id: int, request: Request):
+        payload = await request.json()
+        updated = data.update_visit(record_id, payload or {})
+        if updated is None:
+            return _not_found("Visit not found")
+        return _ok(updated)
+
+    @app.post("/api/v1/storage_operations/goods_transactions/{company_id}")
+    async def goods_transaction(company_id: int, request: Request):
+        payload = await request.json()
+        return _ok(data.add_goods_transaction(company_id, payload or {}))
+
+    @app.get("/api/v1/technological_cards/record_consumables/{company_id}/{record_id}/")
+    def record_consumables(company_id: int, record_id: int):
+        return _ok(data.record_consumables(record_id))
+
+    @app.put("/api/v1/technological_cards/record_consumables/consumables/{company_id}/{record_id}/{service_id}/")
+    async def set_record_consumables(company_id: int, record_id: int, service_id: int, request: Request):
+        payload = await request.json()
+        return _ok(data.set_record_consumables(record_id, (payload or {}).get("consumables") or []))
+
+    @app.get("/finance_transactions/{company_id}")
+    @app.get("/api/v1/finance_transactions/{company_id}")
+    def finance_transactions(
+        company_id: int,
+        page: int = 1,
+        count: int = 500,
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ):
+        items = data.finance_transactions(company_id, start_date, end_date)
+        offset = (max(1, page) - 1) * max(1, count)
+        return _ok(items[offset: offset + max(1, count)], total_count=len(items))
+
+    return app
+
+
+def serve_in_thread(app: FastAPI, host: str = "127.0.0.1", port: int = 8900):
+    """Start the fake server in a daemon thread; returns the uvicorn server (set ``should_exit`` to stop)."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="fake-yclients", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and thread.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return server
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline YCLIENTS stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--branches", type=int, default=FakeScale.branches)
+    parser.add_argument("--staff", type=int, default=FakeScale.staff, help="staff per branch (minimum)")
+    parser.add_argument("--days", type=int, default=FakeScale.days)
+    parser.add_argument("--visits", type=int, default=FakeScale.visits, help="visits per staff per day")
+    parser.add_argument("--start", type=date.fromisoformat, default=FakeScale.start)
+    parser.add_argument("--seed", type=int, default=FakeScale.seed)
+    parser.add_argument("--no-config", action="store_true", help="ignore GROUP_CONFIG_PATH branches and names")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/sec per token before 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument(
+        "--replay",
+        nargs="?",
+        const=str(settings.data_dir / "yclients_api_debug.log"),
+        help="replay captured responses from this API debug log",
+    )
+    parser.add_argument("--replay-only", action="store_true", help="404 for requests missing from the replay log")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    import uvicorn
+
+    args = _parse_args(argv)
+    scale = FakeScale(
+        branches=args.branches,
+        staff=args.staff,
+        days=args.days,
+        visits=args.visits,
+        start=args.start,
+        seed=args.seed,
+    )
+    config = None if args.no_config else _load_group_config(settings.group_config_path)
+    data = SyntheticData(scale, config)
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+    )
+    replay = None
+    if args.replay:
+        replay = ReplayStore()
+        loaded = replay.load(Path(args.replay))
+        print(f"[fake-yclients] replay entries loaded: {loaded} ({args.replay})")
+    total = sum(data.per_day(branch) for branch in data.branches.values()) * scale.days
+    print(
+        f"[fake-yclients] http://{args.host}:{args.port} branches={len(data.branches)} "
+        f"days={scale.days} records={total}"
+    )
+    uvicorn.run(create_app(data, faults, replay, args.replay_only), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,6 +10,7 @@ from .d1_service import (
     list_months,
     upsert_plan,
 )
+from .db import run_db
 from .overview_service import build_overview_payload
 
 
@@ -27,32 +28,32 @@ def api_months(branch_code: str = Query(..., min_length=1)):
 
 
 @router.get("/d1")
-def api_d1(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
-    payload = build_d1_payload(branch_code, month)
+async def api_d1(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
+    payload = await run_db(build_d1_payload, branch_code, month)
     if not payload.get("branch"):
         raise HTTPException(status_code=404, detail="Branch not found")
     return payload
 
 
 @router.get("/raw")
-def api_raw(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
-    payload = build_raw_payload(branch_code, month)
+async def api_raw(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
+    payload = await run_db(build_raw_payload, branch_code, month)
     if not payload.get("branch"):
         raise HTTPException(status_code=404, detail="Branch not found")
     return payload
 
 
 @router.get("/year-summary")
-def api_year_summary(branch_code: str = Query(..., min_length=1)):
-    payload = build_year_summary_payload(branch_code)
+async def api_year_summary(branch_code: str = Query(..., min_length=1)):
+    payload = await run_db(build_year_summary_payload, branch_code)
     if not payload.get("branch"):
         raise HTTPException(status_code=404, detail="Branch not found")
     return payload
 
 
 @router.get("/overview")
-def api_overview(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
-    payload = build_overview_payload(branch_code, month)
+async def api_overview(branch_code: str = Query(..., min_length=1), month: str = Query(..., min_length=7)):
+    payload = await run_db(build_overview_payload, branch_code, month)
     if not payload.get("branch"):
         raise HTTPException(status_code=404, detail="Branch not found")
     return payload
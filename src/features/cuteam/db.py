@@ -2,6 +2,11 @@ from __future__ import annotations
 
 import sqlite3
 from contextlib import contextmanager
+from typing import Any, Callable
+
+from src.shared.db_async import get_db_executor
+from src.shared.db_pool import get_pool, tune_sqlite
+from src.shared.db_settings import db_settings
 
 from .settings import settings
 
@@ -92,7 +97,7 @@ def _connect_sqlite() -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
-    return conn
+    return tune_sqlite(conn, db_settings.sqlite_pragmas())
 
 
 def _connect_postgres():
@@ -105,14 +110,22 @@ def _connect_postgres():
     raise RuntimeError("Postgres driver not available (psycopg/psycopg2)")
 
 
+def _pool():
+    options = db_settings.pool_options()
+    if USE_POSTGRES:
+        return get_pool("cuteam", f"postgres:{DB_URL}", _connect_postgres, **options)
+    return get_pool("cuteam", f"sqlite:{settings.db_path.resolve()}", _connect_sqlite, per_thread=True, **options)
+
+
 @contextmanager
 def get_conn() -> DBConn:
-    raw = _connect_postgres() if USE_POSTGRES else _connect_sqlite()
-    conn = DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
-    try:
-        yield conn
-    finally:
-        conn.close()
+    with _pool().connection() as raw:
+        yield DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await blocking cuteam database work (payload builders) on the cuteam DB executor."""
+    return await get_db_executor("cuteam").run(fn, *args, **kwargs)
 
 
 def _split_sql_statements(sql: str) -> list[str]:
@@ -3,6 +3,9 @@ from __future__ import annotations
 import sqlite3
 from contextlib import contextmanager
 
+from src.shared.db_pool import get_pool, tune_sqlite
+from src.shared.db_settings import db_settings
+
 from .settings import settings
 
 DB_URL = settings.heatmap_db_url or ""
@@ -67,7 +70,7 @@ def _connect_sqlite() -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
-    return conn
+    return tune_sqlite(conn, db_settings.sqlite_pragmas())
 
 
 def _connect_postgres():
@@ -80,11 +83,16 @@ def _connect_postgres():
     raise RuntimeError("Postgres driver not available (psycopg/psycopg2)")
 
 
+def _pool():
+    options = db_settings.pool_options()
+    if USE_POSTGRES:
+        return get_pool("heatmap", f"postgres:{DB_URL}", _connect_postgres, **options)
+    return get_pool(
+        "heatmap", f"sqlite:{settings.heatmap_db_path.resolve()}", _connect_sqlite, per_thread=True, **options
+    )
+
+
 @contextmanager
 def get_heatmap_conn() -> DBConn:
-    raw = _connect_postgres() if USE_POSTGRES else _connect_sqlite()
-    conn = DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
-    try:
-        yield conn
-    finally:
-        conn.close()
+    with _pool().connection() as raw:
+        yield DBConn(raw, "postgres" if USE_POSTGRES else "sqlite")
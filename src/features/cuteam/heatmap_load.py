@@ -6,6 +6,8 @@ import sqlite3
 from functools import lru_cache
 from typing import Dict, List
 
+from src.shared.benchmark import BENCH_HOURS_PER_DAY
+
 from .heatmap_db import get_heatmap_conn
 from .settings import settings
 
@@ -110,6 +112,26 @@ def _daterange(start: dt.date, end: dt.date) -> List[dt.date]:
     return [start + dt.timedelta(days=offset) for offset in range(total)]
 
 
+def _query(sql: str, params: list):
+    rows = None
+    try:
+        with get_heatmap_conn() as conn:
+            rows = conn.execute(sql, params).fetchall()
+    except Exception:
+        rows = None
+
+    if rows is None:
+        db_path = settings.heatmap_db_path
+        if db_path.exists():
+            raw = sqlite3.connect(str(db_path))
+            raw.row_factory = sqlite3.Row
+            try:
+                rows = raw.execute(sql, params).fetchall()
+            finally:
+                raw.close()
+    return rows
+
+
 def fetch_hairdresser_daily_load(
     branch_code: str, start_date: str, end_date: str
 ) -> Dict[str, float]:
@@ -129,29 +151,31 @@ def fetch_hairdresser_daily_load(
     )
     params = [branch_id, start_date, end_date, *group_ids]
 
-    rows = None
     try:
-        with get_heatmap_conn() as conn:
-            rows = conn.execute(sql, params).fetchall()
+        rows = _query(sql, params)
     except Exception:
-        rows = None
+        return {}
 
-    if rows is None:
-        try:
-            db_path = settings.heatmap_db_path
-            if db_path.exists():
-                raw = sqlite3.connect(str(db_path))
-                raw.row_factory = sqlite3.Row
-                rows = raw.execute(sql, params).fetchall()
-                raw.close()
-        except Exception:
-            return {}
+    # Groups loaded per date: hours not stored as rows (sparse mode) are
+    # zero-load cells. Databases without group_day_staff store every hour.
+    loaded: Dict[str, int] = {}
+    try:
+        coverage = _query(
+            "SELECT date, COUNT(*) AS groups_loaded FROM group_day_staff "
+            "WHERE branch_id = ? AND date BETWEEN ? AND ? "
+            f"AND group_id IN ({placeholders}) GROUP BY date",
+            params,
+        )
+        for row in coverage or []:
+            loaded[row["date"]] = int(row["groups_loaded"])
+    except Exception:
+        loaded = {}
 
-    if not rows:
+    if not rows and not loaded:
         return {}
 
     by_date: Dict[str, List[float]] = {}
-    for row in rows:
+    for row in rows or []:
         try:
             date_key = row["date"]
             by_date.setdefault(date_key, []).append(float(row["load_pct"]))
@@ -168,7 +192,8 @@ def fetch_hairdresser_daily_load(
     for day in _daterange(start, end):
         key = day.isoformat()
         vals = by_date.get(key, [])
-        if not vals:
+        cells = max(len(vals), loaded.get(key, 0) * BENCH_HOURS_PER_DAY)
+        if not cells:
             continue
-        daily[key] = round(sum(vals) / len(vals), 2)
+        daily[key] = round(sum(vals) / cells, 2)
     return daily
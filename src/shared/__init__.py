@@ -0,0 +1 @@
+"""Code shared by backend.app and the feature packages."""
@@ -0,0 +1,9 @@
+"""Benchmark hours of the load heatmaps.
+
+The ETL flags staff hours from BENCH_START_HOUR:00 to BENCH_END_HOUR:59 with
+``in_benchmark``; the summaries of backend.app and cuteam average over them.
+"""
+
+BENCH_START_HOUR = 10
+BENCH_END_HOUR = 21
+BENCH_HOURS_PER_DAY = BENCH_END_HOUR - BENCH_START_HOUR + 1
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import anyio
+
+from .db_settings import db_settings
+
+
+class DBExecutor:
+    """Runs blocking database work for async endpoints on its own bounded threads.
+
+    Async endpoints await ``run`` instead of holding a worker of anyio's
+    shared threadpool (40 threads), which stays free for the sync endpoints,
+    e.g. the mini app waiting on YCLIENTS. With per-thread SQLite pools the
+    number of open connections is bounded by ``workers`` as well.
+    ``workers=0`` runs the work on anyio's threadpool like a sync endpoint.
+    """
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name = name
+        self.workers = max(0, workers)
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix=f"db-{name}") if self.workers else None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.running = 0
+        self.peak_running = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        call = functools.partial(fn, *args, **kwargs)
+        submitted = time.monotonic()
+
+        def job() -> Any:
+            waited = time.monotonic() - submitted
+            with self._lock:
+                self.calls += 1
+                self.running += 1
+                self.peak_running = max(self.peak_running, self.running)
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        if self._pool is None:
+            return await anyio.to_thread.run_sync(job)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, job)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers or "anyio",
+                "calls": self.calls,
+                "running": self.running,
+                "peak_running": self.peak_running,
+                "avg_wait_ms": round(self.wait_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_EXECUTORS: dict[str, DBExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def get_db_executor(name: str) -> DBExecutor:
+    """The executor of one caller (``app``, ``cuteam``), created on first use.
+
+    Each name gets its own DB_ASYNC_WORKERS threads, so a burst of one
+    package's requests does not queue the other's.
+    """
+    with _EXECUTORS_LOCK:
+        executor = _EXECUTORS.get(name)
+        if executor is None:
+            executor = _EXECUTORS[name] = DBExecutor(name, db_settings.async_workers)
+        return executor
+
+
+def executor_stats() -> dict[str, dict[str, Any]]:
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+    return {executor.name: executor.stats() for executor in executors}
+
+
+def shutdown_db_executors() -> None:
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown()
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+# Only the standard library here: backend.app and src.features.cuteam both
+# import this module; pool sizes come from src.shared.db_settings via the callers.
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+SQLITE_PROFILES = ("default", "tuned")
+
+
+def sqlite_pragmas(profile: str, cache_mb: int, mmap_mb: int, busy_timeout_ms: int) -> list[str]:
+    """Per-connection PRAGMAs of a SQLite tuning profile (on top of WAL and foreign keys).
+
+    ``default`` keeps SQLite's own settings (synchronous=FULL, ~2 MB page
+    cache, no mmap). ``tuned`` syncs only at WAL checkpoints
+    (synchronous=NORMAL: a power loss may drop the last commits but never
+    corrupts the file), sizes the page cache and memory map, keeps temp
+    b-trees of sorts and GROUP BYs in memory and waits on locks instead of
+    failing at once.
+    """
+    if profile != "tuned":
+        return []
+    return [
+        "PRAGMA synchronous=NORMAL;",
+        f"PRAGMA cache_size=-{max(cache_mb, 1) * 1024};",
+        f"PRAGMA mmap_size={max(mmap_mb, 0) * 1024 * 1024};",
+        "PRAGMA temp_store=MEMORY;",
+        f"PRAGMA busy_timeout={max(busy_timeout_ms, 0)};",
+    ]
+
+
+def tune_sqlite(conn: Any, pragmas: list[str]) -> Any:
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+class ConnectionPool:
+    """Reusable DB-API connections for one database.
+
+    Shared mode (Postgres) keeps up to ``max_size`` connections, ``min_size``
+    of them opened up front and never trimmed; callers beyond that wait up to
+    ``timeout`` seconds. Per-thread mode (SQLite) keeps one connection per
+    thread instead, since a file connection is cheap and must not be shared
+    mid-transaction; a nested acquire in the same thread gets a temporary
+    extra one. Connections idle longer than ``check_after`` seconds are
+    health-checked before reuse, and every release rolls back whatever the
+    caller did not commit, as closing the connection used to.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        check_after: float = 30.0,
+        max_idle: float = 300.0,
+        per_thread: bool = False,
+        target: str = "",
+    ) -> None:
+        self.names = [name]
+        self.target = target
+        self._connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.per_thread = per_thread
+        self._cond = threading.Condition()
+        self._idle: list[tuple[Any, float]] = []
+        self._local = threading.local()
+        self._open = 0
+        self._filled = False
+        self.created = 0
+        self.closed = 0
+        self.in_use = 0
+        self.acquired = 0
+        self.reused = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.check_failures = 0
+
+    def _create(self) -> Any:
+        conn = self._connect()
+        with self._cond:
+            self.created += 1
+        return conn
+
+    def _close(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:  # noqa: BLE001
+            pass
+        with self._cond:
+            self.closed += 1
+
+    def _healthy(self, conn: Any, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:  # noqa: BLE001
+            with self._cond:
+                self.check_failures += 1
+            return False
+
+    def _fill(self) -> None:
+        with self._cond:
+            if self._filled:
+                return
+            self._filled = True
+            missing = self.min_size - self._open
+            self._open += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                conn = self._create()
+            except Exception:  # noqa: BLE001
+                with self._cond:
+                    self._open -= 1
+                continue
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _acquire_thread(self) -> tuple[Any, bool]:
+        slot = getattr(self._local, "slot", None)
+        if slot is not None and not slot[2]:
+            conn, idle_since, _ = slot
+            if self._healthy(conn, idle_since):
+                self._local.slot = (conn, idle_since, True)
+                with self._cond:
+                    self.reused += 1
+                return conn, True
+            self._local.slot = None
+            self._close(conn)
+        conn = self._create()
+        if getattr(self._local, "slot", None) is None:
+            self._local.slot = (conn, time.monotonic(), True)
+            return conn, True
+        return conn, False
+
+    def _acquire_shared(self) -> Any:
+        self._fill()
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                while True:
+                    if self._idle:
+                        conn, idle_since = self._idle.pop()
+                        break
+                    if self._open < self.max_size:
+                        self._open += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(f"No free connection in pool {'+'.join(self.names)} after {self.timeout}s")
+                    if not waited:
+                        waited = True
+                        self.waits += 1
+                    self._cond.wait(remaining)
+                if waited:
+                    spent = time.monotonic() - started
+                    self.wait_seconds += spent
+                    self.max_wait_seconds = max(self.max_wait_seconds, spent)
+            if conn is None:
+                try:
+                    return self._create()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+            if self._healthy(conn, idle_since):
+                with self._cond:
+                    self.reused += 1
+                return conn
+            self._close(conn)
+            with self._cond:
+                self._open -= 1
+
+    def _reset(self, conn: Any) -> bool:
+        """Roll back leftovers; False when the connection is no longer usable."""
+        try:
+            if getattr(conn, "closed", False):
+                return False
+            if getattr(conn, "in_transaction", True):
+                conn.rollback()
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _trim(self) -> list[Any]:
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            while self._idle and self._open > self.min_size and now - self._idle[0][1] > self.max_idle:
+                expired.append(self._idle.pop(0)[0])
+                self._open -= 1
+        return expired
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        if self.per_thread:
+            conn, owned = self._acquire_thread()
+        else:
+            conn, owned = self._acquire_shared(), True
+        with self._cond:
+            self.acquired += 1
+            self.in_use += 1
+        try:
+            yield conn
+        finally:
+            usable = self._reset(conn)
+            with self._cond:
+                self.in_use -= 1
+            if self.per_thread:
+                if owned and usable:
+                    self._local.slot = (conn, time.monotonic(), False)
+                else:
+                    if owned:
+                        self._local.slot = None
+                    self._close(conn)
+            elif usable:
+                with self._cond:
+                    self._idle.append((conn, time.monotonic()))
+                    self._cond.notify()
+                for stale in self._trim():
+                    self._close(stale)
+            else:
+                self._close(conn)
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "names": list(self.names),
+                "mode": "per_thread" if self.per_thread else "shared",
+                "min_size": self.min_size,
+                "max_size": None if self.per_thread else self.max_size,
+                "open": self.created - self.closed if self.per_thread else self._open,
+                "idle": None if self.per_thread else len(self._idle),
+                "in_use": self.in_use,
+                "created": self.created,
+                "closed": self.closed,
+                "acquired": self.acquired,
+                "reused": self.reused,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "timeouts": self.timeouts,
+                "check_failures": self.check_failures,
+            }
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(name: str, target: str, connect: Callable[[], Any], **options: Any) -> ConnectionPool:
+    """The pool for a database ``target`` (file path or URL), created on first use.
+
+    Callers opening the same database share one pool; the first caller's
+    options apply.
+    """
+    key = hashlib.sha256(target.encode()).hexdigest()
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(name, connect, target=target, **options)
+        elif name not in pool.names:
+            pool.names.append(name)
+    return pool
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+    return [pool.stats() for pool in pools]
+
+
+_MAINTENANCE: dict[str, dict[str, Any]] = {}
+
+
+def sqlite_maintenance() -> list[dict[str, Any]]:
+    """PRAGMA optimize and a truncating WAL checkpoint on every SQLite database opened so far.
+
+    ``busy`` in a result means readers kept the checkpoint from resetting
+    the WAL; the next run tries again.
+    """
+    with _POOLS_LOCK:
+        pools = [pool for pool in _POOLS.values() if pool.target.startswith("sqlite:")]
+    results = []
+    for pool in pools:
+        started = time.monotonic()
+        result: dict[str, Any] = {"names": list(pool.names), "at": time.time()}
+        try:
+            with pool.connection() as conn:
+                conn.execute("PRAGMA optimize;")
+                busy, wal_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+            result.update(busy=bool(busy), wal_pages=wal_pages, checkpointed=checkpointed)
+        except Exception as exc:  # noqa: BLE001
+            result["error"] = str(exc)
+        result["seconds"] = round(time.monotonic() - started, 3)
+        with _POOLS_LOCK:
+            _MAINTENANCE[pool.target] = result
+        results.append(result)
+    return results
+
+
+def maintenance_stats() -> list[dict[str, Any]]:
+    """The last sqlite_maintenance result per database."""
+    with _POOLS_LOCK:
+        return list(_MAINTENANCE.values())
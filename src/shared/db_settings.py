@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from .db_pool import sqlite_pragmas
+
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+load_dotenv(ROOT_DIR / ".env")
+
+
+@dataclass(frozen=True)
+class DBSettings:
+    pool_min_size: int
+    pool_max_size: int
+    pool_timeout: float
+    pool_check_seconds: float
+    pool_max_idle_seconds: float
+    sqlite_profile: str
+    sqlite_cache_mb: int
+    sqlite_mmap_mb: int
+    sqlite_busy_timeout_ms: int
+    async_workers: int
+
+    def pool_options(self) -> dict[str, Any]:
+        """Keyword arguments of ``get_pool`` for every pool of the process."""
+        return {
+            "min_size": self.pool_min_size,
+            "max_size": self.pool_max_size,
+            "timeout": self.pool_timeout,
+            "check_after": self.pool_check_seconds,
+            "max_idle": self.pool_max_idle_seconds,
+        }
+
+    def sqlite_pragmas(self) -> list[str]:
+        """PRAGMAs of the configured SQLite profile for every SQLite connection of the process."""
+        return sqlite_pragmas(self.sqlite_profile, self.sqlite_cache_mb, self.sqlite_mmap_mb, self.sqlite_busy_timeout_ms)
+
+
+def load_db_settings() -> DBSettings:
+    return DBSettings(
+        pool_min_size=max(0, int(os.getenv("DB_POOL_MIN_SIZE", "1"))),
+        pool_max_size=max(1, int(os.getenv("DB_POOL_MAX_SIZE", "10"))),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_check_seconds=float(os.getenv("DB_POOL_CHECK_SECONDS", "30")),
+        pool_max_idle_seconds=float(os.getenv("DB_POOL_MAX_IDLE_SECONDS", "300")),
+        sqlite_profile=os.getenv("SQLITE_PROFILE", "tuned").strip().lower(),
+        sqlite_cache_mb=int(os.getenv("SQLITE_CACHE_MB", "64")),
+        sqlite_mmap_mb=int(os.getenv("SQLITE_MMAP_MB", "256")),
+        sqlite_busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        async_workers=max(0, int(os.getenv("DB_ASYNC_WORKERS", "8"))),
+    )
+
+
+db_settings = load_db_settings()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time: point every database at a scratch
+# directory before the first backend import.
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="heatmap-tests-"))
+os.environ.pop("DATABASE_URL", None)
+os.environ.update(
+    {
+        "DATA_DIR": str(_DATA_DIR),
+        "DB_PATH": str(_DATA_DIR / "app.db"),
+        "HISTORICAL_DB_PATH": str(_DATA_DIR / "historical.db"),
+        "GROUP_CONFIG_PATH": str(_DATA_DIR / "groups.json"),
+        "GROUP_CONFIG_RESOLVED_PATH": str(_DATA_DIR / "groups_resolved.json"),
+        "ENABLE_SCHEDULER": "0",
+        "YCLIENTS_CACHE": "0",
+    }
+)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
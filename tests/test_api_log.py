@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from backend.app.api_log import ApiLogWriter
+
+
+def _writer(tmp_path, compress: bool, **options) -> ApiLogWriter:
+    params = {"max_bytes": 0, "backups": 3, "rotate_seconds": 0, "queue_size": 10}
+    params.update(options)
+    return ApiLogWriter(tmp_path / "api.log", compress=compress, **params)
+
+
+def test_files_are_ordered_by_rotation_index_across_compression(tmp_path):
+    for name in ("api.log", "api.log.1.gz", "api.log.2", "api.log.3.gz"):
+        (tmp_path / name).write_text("")
+
+    files = _writer(tmp_path, compress=True).files()
+
+    assert [path.name for path in files] == ["api.log", "api.log.1.gz", "api.log.2", "api.log.3.gz"]
+
+
+def test_dropped_counts_every_rejected_entry(tmp_path):
+    writer = _writer(tmp_path, compress=False, queue_size=1)
+    writer._ensure_thread = lambda: None
+    writer.enqueue({"n": 0})
+
+    threads = [threading.Thread(target=lambda: [writer.enqueue({"n": 1}) for _ in range(500)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert writer.stats()["dropped"] == 4000
+
+
+def test_rotation_clock_survives_a_restart(tmp_path):
+    started = time.time() - 7200
+    entry = {"ts": datetime.fromtimestamp(started, timezone.utc).replace(tzinfo=None).isoformat()}
+    (tmp_path / "api.log").write_text(json.dumps(entry) + "\n")
+
+    writer = _writer(tmp_path, compress=False, rotate_seconds=3600)
+
+    assert abs(writer._period_start - started) < 1
+    assert writer._needs_rotation()
+
+
+def test_rotation_clock_falls_back_to_mtime(tmp_path):
+    path = tmp_path / "api.log"
+    path.write_text("not json\n")
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+    assert _writer(tmp_path, compress=False, rotate_seconds=3600)._needs_rotation()
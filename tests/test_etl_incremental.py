@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from backend.app import etl
+from backend.app.config import settings
+from backend.app.db import get_conn, init_db
+from backend.app.occupancy import staff_hour_rows
+from backend.app.retry import RetryStats
+
+BRANCH = 101
+STAFF = 7
+CONFIG = {"branches": [{"branch_id": BRANCH, "groups": [{"group_id": "g1", "staff_ids": [STAFF]}]}]}
+
+
+def _record(record_id: int, start: datetime, minutes: int) -> dict:
+    return {
+        "branch_id": BRANCH,
+        "staff_id": STAFF,
+        "record_id": record_id,
+        "start_dt": start,
+        "end_dt": start + timedelta(minutes=minutes),
+        "attendance": 1,
+        "updated_at": "2025-03-01T00:00:00",
+    }
+
+
+def _busy_minutes(day: date, hour: int, branch_id: int = BRANCH):
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT busy_minutes FROM staff_hour_busy WHERE branch_id = ? AND staff_id = ? AND date = ? AND hour = ?",
+            (branch_id, STAFF, day.isoformat(), hour),
+        ).fetchone()
+    return None if row is None else row["busy_minutes"]
+
+
+def test_incremental_keeps_rows_of_the_day_before_an_edited_day(monkeypatch):
+    init_db()
+    tz = ZoneInfo(settings.timezone)
+    edited = date(2025, 3, 10)
+    before = edited - timedelta(days=1)
+    # Starts two days before the edited day and runs past midnight into
+    # ``before``; a second visit shares hour 0 of ``before``.
+    overnight = _record(1, datetime(2025, 3, 8, 23, 0, tzinfo=tz), 60 + 30)
+    short = _record(2, datetime(2025, 3, 9, 0, 40, tzinfo=tz), 20)
+    edited_visit = _record(3, datetime(2025, 3, 10, 12, 0, tzinfo=tz), 60)
+    records = [overnight, short, edited_visit]
+    etl._upsert_raw_records([etl._to_raw_row(rec) for rec in records])
+    rows = staff_hour_rows(BRANCH, records)
+    etl._write_staff_hour_busy(BRANCH, date(2025, 3, 8), edited, rows)
+    assert _busy_minutes(before, 0) == 50
+
+    changed = {
+        "id": 3,
+        "staff_id": STAFF,
+        "attendance": 1,
+        "datetime": datetime(2025, 3, 10, 14, 0, tzinfo=tz).isoformat(),
+        "seance_length": 3600,
+        "last_change_date": "2025-03-11T00:00:00",
+    }
+    monkeypatch.setattr(etl, "_get_watermark", lambda branch_id: "2025-03-01T00:00:00")
+    monkeypatch.setattr(etl, "_branch_period", lambda branch_id: (date(2025, 3, 1), date(2025, 3, 31)))
+    monkeypatch.setattr(etl, "_fetch_records_for_period", lambda *args, **kwargs: [changed])
+    etl._run_incremental_for_branch(None, CONFIG, BRANCH, "test-run", etl._RunStats())
+
+    assert _busy_minutes(before, 0) == 50
+    assert _busy_minutes(edited, 14) == 60
+    assert _busy_minutes(edited, 12) is None
+
+
+class _FakeClient:
+    """get_records over an in-memory list, filtered like the API: by visit date and change time."""
+
+    def __init__(self, records: list[dict]) -> None:
+        self.records = records
+        self.retry_stats = RetryStats()
+
+    def get_records(self, branch_id, start_date, end_date, page=1, count=50, changed_after=None, **kwargs):
+        data = [
+            rec
+            for rec in self.records
+            if start_date <= rec["datetime"][:10] <= end_date
+            and (changed_after is None or rec["last_change_date"] > changed_after[:19])
+        ]
+        return {"data": data[(page - 1) * count: page * count], "meta": {"total_count": len(data)}}
+
+
+def _api_record(record_id: int, start: datetime, attendance: int = 1, changed: str = "2025-03-01T00:00:00") -> dict:
+    return {
+        "id": record_id,
+        "staff_id": STAFF,
+        "attendance": attendance,
+        "datetime": start.isoformat(),
+        "seance_length": 3600,
+        "last_change_date": changed,
+    }
+
+
+def test_cancelled_visit_stays_out_after_daily_and_incremental_runs(monkeypatch):
+    init_db()
+    branch = 102
+    config = {"branches": [{"branch_id": branch, "groups": [{"group_id": "g1", "staff_ids": [STAFF]}]}]}
+    tz = ZoneInfo(settings.timezone)
+    day = date(2025, 3, 5)
+    monkeypatch.setattr(etl, "_branch_period", lambda branch_id: (date(2025, 3, 1), date(2025, 3, 10)))
+    monkeypatch.setattr(etl, "load_group_config", lambda: config)
+    monkeypatch.setattr(etl, "resolve_staff_ids", lambda config, client, **kwargs: config)
+    monkeypatch.setattr(etl, "save_group_config", lambda config: None)
+
+    client = _FakeClient(
+        [
+            _api_record(1, datetime(2025, 3, 5, 12, 0, tzinfo=tz)),
+            _api_record(2, datetime(2025, 3, 5, 15, 0, tzinfo=tz)),
+            _api_record(3, datetime(2025, 3, 5, 18, 0, tzinfo=tz)),
+        ]
+    )
+    etl._run_full_for_branch(client, config, branch, etl._start_run("full_2025", branch_id=branch))
+    assert _busy_minutes(day, 12, branch) == 60
+
+    # Visit 1 is cancelled, visit 3 deleted upstream; the daily load sees both.
+    client.records = [
+        _api_record(1, datetime(2025, 3, 5, 12, 0, tzinfo=tz), attendance=-1, changed="2025-03-06T00:00:00"),
+        client.records[1],
+    ]
+    etl.run_daily(client, target_day=day)
+    assert _busy_minutes(day, 12, branch) is None
+    assert _busy_minutes(day, 18, branch) is None
+
+    # A later full load moves the watermark past the cancellation; then
+    # visit 2 moves and the incremental run rebuilds the day from raw_records.
+    etl._advance_watermark(branch, [], datetime(2025, 3, 7, tzinfo=tz))
+    client.records[1] = _api_record(2, datetime(2025, 3, 5, 16, 0, tzinfo=tz), changed="2025-03-08T00:00:00")
+    etl._run_incremental_for_branch(client, config, branch, "test-run", etl._RunStats())
+
+    assert _busy_minutes(day, 16, branch) == 60
+    assert _busy_minutes(day, 12, branch) is None
+    assert _busy_minutes(day, 18, branch) is None
+
+
+def test_daily_load_counts_visits_running_past_midnight(monkeypatch):
+    init_db()
+    branch = 103
+    config = {"branches": [{"branch_id": branch, "groups": [{"group_id": "g1", "staff_ids": [STAFF]}]}]}
+    tz = ZoneInfo(settings.timezone)
+    day = date(2025, 3, 5)
+    monkeypatch.setattr(etl, "load_group_config", lambda: config)
+    monkeypatch.setattr(etl, "resolve_staff_ids", lambda config, client, **kwargs: config)
+    monkeypatch.setattr(etl, "save_group_config", lambda config: None)
+    overnight = {**_record(1, datetime(2025, 3, 4, 23, 30, tzinfo=tz), 60), "branch_id": branch}
+    etl._upsert_raw_records([etl._to_raw_row(overnight)])
+
+    client = _FakeClient([_api_record(2, datetime(2025, 3, 5, 12, 0, tzinfo=tz))])
+    etl.run_daily(client, target_day=day)
+
+    assert _busy_minutes(day, 0, branch) == 30
+    assert _busy_minutes(day, 12, branch) == 60
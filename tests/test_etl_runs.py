@@ -0,0 +1,20 @@
+from backend.app import etl
+from backend.app.db import get_conn, init_db
+
+
+def _status(run_id: str) -> str:
+    with get_conn() as conn:
+        return conn.execute("SELECT status FROM etl_runs WHERE run_id = ?", (run_id,)).fetchone()["status"]
+
+
+def test_mark_interrupted_runs_spares_live_runs_of_this_process():
+    init_db()
+    live = etl._start_run("incremental")
+    # Same owner, but no longer tracked: left by an earlier process with this pid.
+    orphan = etl._start_run("incremental")
+    etl.finish_progress(orphan, "lost")
+
+    interrupted = {run["run_id"] for run in etl.mark_interrupted_runs()}
+
+    assert live not in interrupted and _status(live) == "running"
+    assert orphan in interrupted and _status(orphan) == "interrupted"
@@ -0,0 +1,33 @@
+from backend.app.groups import resolve_staff_ids_offline
+
+RESOLVED = {
+    "branches": [
+        {
+            "branch_id": 101,
+            "display_name": "Филиал",
+            "staff_directory": {"Анна": [1], "Борис": [2], "Вера": [3]},
+            "groups": [{"group_id": "g1", "staff_names": ["Анна", "Борис"], "staff_ids": [1, 2]}],
+        }
+    ]
+}
+
+
+def test_partly_resolved_group_keeps_resolved_ids():
+    config = {"branches": [{"branch_id": 101, "groups": [{"group_id": "g1", "staff_names": ["Анна", "Вера", "Глеб"]}]}]}
+    errors: dict[int, list[str]] = {}
+
+    result = resolve_staff_ids_offline(config, RESOLVED, errors=errors)
+
+    assert result["branches"][0]["groups"][0]["staff_ids"] == [1, 3]
+    assert errors == {101: ["Глеб"]}
+
+
+def test_branch_without_directory_keeps_previous_ids():
+    resolved = {"branches": [{**RESOLVED["branches"][0], "staff_directory": None}]}
+    config = {"branches": [{"branch_id": 101, "groups": [{"group_id": "g1", "staff_names": ["Анна", "Вера"]}]}]}
+    errors: dict[int, list[str]] = {}
+
+    result = resolve_staff_ids_offline(config, resolved, errors=errors)
+
+    assert result["branches"][0]["groups"][0]["staff_ids"] == [1, 2]
+    assert errors == {101: ["Анна", "Вера"]}
@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+from backend.app.db import get_conn, get_hist_conn
+from backend.bench.query_plans import CHECKS, capture_workload, check_plans
+
+
+def test_hot_queries_use_their_indexes():
+    args = SimpleNamespace(branches=2, groups=3, staff=6, visits=4, days=30, goods=200, runs=50)
+    statements = capture_workload(args, Path(os.environ["GROUP_CONFIG_PATH"]))
+
+    with get_conn() as conn, get_hist_conn() as hist_conn:
+        failures, checked = check_plans(statements, {"app": conn._conn, "historical": hist_conn._conn})
+
+    assert failures == []
+    assert [label for label, _, _ in checked] == [label for label, _, _ in CHECKS]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from backend.app.singleflight import SingleFlight
+
+
+def _collapsed_calls(flight: SingleFlight, fn, callers: int = 4) -> list:
+    started = threading.Event()
+    release = threading.Event()
+    outcomes: list = [None] * callers
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def run(index: int) -> None:
+        try:
+            outcomes[index] = flight.do("key", leader_fn if index == 0 else fn)
+        except BaseException as exc:  # noqa: BLE001
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=run, args=(0,))]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=run, args=(i,)) for i in range(1, callers)]
+    for thread in threads[1:]:
+        thread.start()
+    while flight.stats()["collapsed"] < callers - 1:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_every_caller_gets_an_independent_result():
+    original = {"data": [1, 2]}
+    results = _collapsed_calls(SingleFlight(), lambda: original)
+    assert results[0] is original
+    assert all(result == {"data": [1, 2]} for result in results)
+    assert len({id(result) for result in results}) == len(results)
+
+
+def test_lone_caller_gets_the_result_uncopied():
+    original = {"data": [1, 2]}
+    assert SingleFlight().do("key", lambda: original) is original
+
+
+def test_waiting_callers_raise_their_own_exception():
+    def fail():
+        raise ValueError("boom")
+
+    errors = _collapsed_calls(SingleFlight(), fail)
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len({id(error) for error in errors}) == len(errors)
+    assert all(error.__cause__ is errors[0] for error in errors[1:])
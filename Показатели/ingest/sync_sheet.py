@@ -43,6 +43,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--date-from", dest="date_from", help="YYYY-MM-DD")
     parser.add_argument("--date-to", dest="date_to", help="YYYY-MM-DD")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--copy-threshold",
+        type=int,
+        default=int(os.environ.get("DB_COPY_THRESHOLD", "1000")),
+        help="Postgres: load at least this many rows via COPY into a staging table",
+    )
     return parser.parse_args()
 
 
@@ -480,11 +486,42 @@ def ensure_schema(conn: DBConn) -> None:
     conn.commit()
 
 
-def upsert_records(conn: DBConn, records: Sequence[Tuple[str, str, str, float, str]]) -> int:
+def _copy_upsert_records(conn: DBConn, rows: List[Tuple]) -> None:
+    """COPY rows into a temp table and merge them with one INSERT ... SELECT.
+
+    A key repeated in the sheet keeps its last value, as with executemany.
+    """
+    cols = "branch_code, metric_code, date, value, source, updated_at"
+    cur = conn._conn.cursor()
+    cur.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS _copy_manual_sheet_daily "
+        "(LIKE manual_sheet_daily INCLUDING DEFAULTS, _seq BIGSERIAL)"
+    )
+    cur.execute("TRUNCATE _copy_manual_sheet_daily")
+    with cur.copy(f"COPY _copy_manual_sheet_daily ({cols}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+    cur.execute(
+        f"INSERT INTO manual_sheet_daily ({cols}) "
+        f"SELECT DISTINCT ON (branch_code, metric_code, date) {cols} FROM _copy_manual_sheet_daily "
+        "ORDER BY branch_code, metric_code, date, _seq DESC "
+        "ON CONFLICT(branch_code, metric_code, date) DO UPDATE SET "
+        "value=excluded.value, source=excluded.source, updated_at=excluded.updated_at"
+    )
+    cur.execute("TRUNCATE _copy_manual_sheet_daily")
+
+
+def upsert_records(
+    conn: DBConn, records: Sequence[Tuple[str, str, str, float, str]], copy_threshold: int = 1000
+) -> int:
     if not records:
         return 0
     now = dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds")
     rows = [(b, m, d, v, s, now) for (b, m, d, v, s) in records]
+    if conn._kind == "postgres" and len(rows) >= copy_threshold:
+        _copy_upsert_records(conn, rows)
+        conn.commit()
+        return len(rows)
     sql = (
         "INSERT INTO manual_sheet_daily (branch_code, metric_code, date, value, source, updated_at) "
         "VALUES (?, ?, ?, ?, ?, ?) "
@@ -571,7 +608,7 @@ def main() -> None:
         ensure_schema(conn)
         seed_dimensions(conn)
         normalize_existing_branches(conn)
-        inserted = upsert_records(conn, records)
+        inserted = upsert_records(conn, records, args.copy_threshold)
         print(f"Upserted {inserted} rows into manual_sheet_daily")
     finally:
         conn.close()